@@ -1,7 +1,9 @@
 import os
 from dotenv import load_dotenv 
-from crewai import Agent, LLM
-from crewai_tools import SerperDevTool, CodeInterpreterTool 
+from crewai import Agent
+
+# crewai_tools wird erst beim ersten Suchaufruf importiert
+from tools.lazy_tools import lazy_serper_dev_tool
 
 # Import file system tools
 from tools.file_operations_tool import (
@@ -18,15 +20,23 @@ from tools.file_operations_tool import (
 # Import web tools
 from tools.web_tools import (
     scrape_website_content_tool,
+    scrape_many_websites_tool,
     navigate_browser_tool, 
     get_page_content_tool,
+    extract_page_elements_tool,
+    page_snapshot_tool,
+    take_screenshot_tool,
     click_element_tool,      
     type_text_tool,          
+    run_browser_actions_tool,
+    check_routes_tool,
     close_browser_tool       
 )
 
 # Import execution tools
 from tools.execution_tools import secure_command_executor_tool
+# Gemeinsamer Code Interpreter mit vorgewärmtem Sandbox-Pool (statt je einer CodeInterpreterTool-Instanz pro Agent)
+from tools.code_interpreter import code_interpreter_tool
 
 # Import server tools
 from tools.server_tools import ( 
@@ -35,10 +45,19 @@ from tools.server_tools import (
 )
 
 # Import Vision Analyzer Tool
-from tools.vision_analyzer_tool import gemini_vision_analyzer_tool
+from tools.vision_analyzer_tool import gemini_vision_analyzer_tool, gemini_vision_batch_analyzer_tool
 
 # NEUER IMPORT: Import Text Summarization Tool
-from tools.text_summarization_tool import text_summarization_tool
+from tools.text_summarization_tool import text_summarization_tool, batch_text_summarization_tool
+
+# Gemeinsames LLM (auch für die Summarization-Tools), ohne Rückimport aus agents.py
+from tools.llm_config import get_default_llm
+
+# Token-/Kosten-Telemetrie: jeder Agent bekommt eine eigene instrumentierte Kopie des default_llm
+from tools.llm_telemetry import instrument_llm
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
 
 # Umgebungsvariablen laden, BEVOR sie verwendet werden
 load_dotenv() 
@@ -57,15 +76,10 @@ if not lite_llm_model_name:
         "Ensure it is set (e.g., in .env file or main.py, e.g., 'gemini/gemini-1.5-flash')."
     )
 
-try:
-    default_llm = LLM(
-        model=lite_llm_model_name, 
-        api_key=gemini_api_key
-    )
-    print(f"--- Debug (Agents): Default LLM for agents initialized with model: {lite_llm_model_name} ---")
-except Exception as e:
-    print(f"Error initializing default_llm in agents.py: {e}")
-    default_llm = None
+default_llm = get_default_llm()
+
+# Ein Serper-Tool für alle Agenten
+serper_dev_tool = lazy_serper_dev_tool()
 
 # --- Project Manager Agent ---
 project_manager_agent = Agent(
@@ -93,12 +107,15 @@ project_manager_agent = Agent(
         delete_directory_tool,
         move_path_tool,
         copy_path_tool,
-        SerperDevTool(), 
+        serper_dev_tool,
         scrape_website_content_tool,
+        scrape_many_websites_tool,
         gemini_vision_analyzer_tool,
-        text_summarization_tool # NEUES TOOL HINZUGEFÜGT
+        gemini_vision_batch_analyzer_tool,
+        text_summarization_tool, # NEUES TOOL HINZUGEFÜGT
+        batch_text_summarization_tool
     ],
-    llm=default_llm
+    llm=instrument_llm(default_llm, "Project Manager Agent")
 )
 
 # --- Developer Agent ---
@@ -122,9 +139,9 @@ developer_agent = Agent(
         move_path_tool,
         copy_path_tool,
         secure_command_executor_tool,
-        CodeInterpreterTool() 
+        code_interpreter_tool
     ],
-    llm=default_llm
+    llm=instrument_llm(default_llm, "Developer Agent")
 )
 
 # --- Researcher Agent ---
@@ -140,12 +157,14 @@ researcher_agent = Agent(
     verbose=True,
     allow_delegation=False, 
     tools=[
-        SerperDevTool(), 
+        serper_dev_tool,
         scrape_website_content_tool, 
+        scrape_many_websites_tool,
         write_file_tool,
-        text_summarization_tool # NEUES TOOL HINZUGEFÜGT
+        text_summarization_tool, # NEUES TOOL HINZUGEFÜGT
+        batch_text_summarization_tool
     ],
-    llm=default_llm
+    llm=instrument_llm(default_llm, "Researcher Agent")
 )
 
 # --- Tester Agent ---
@@ -167,16 +186,21 @@ tester_agent = Agent(
         write_file_tool,   
         list_directory_contents_tool,
         secure_command_executor_tool,
-        CodeInterpreterTool(),
+        code_interpreter_tool,
         navigate_browser_tool,      
         get_page_content_tool,    
+        extract_page_elements_tool,
+        page_snapshot_tool,
+        take_screenshot_tool,
         click_element_tool,       
         type_text_tool,           
+        run_browser_actions_tool,
+        check_routes_tool,
         close_browser_tool,
         start_local_http_server_tool, 
         stop_local_http_server_tool   
     ],
-    llm=default_llm
+    llm=instrument_llm(default_llm, "Tester Agent")
 )
 
 # --- Debug Agent ---
@@ -196,14 +220,19 @@ debug_agent = Agent(
         write_file_tool,   
         list_directory_contents_tool,
         secure_command_executor_tool,
-        CodeInterpreterTool(),
+        code_interpreter_tool,
         navigate_browser_tool,    
         get_page_content_tool,  
+        extract_page_elements_tool,
+        page_snapshot_tool,
+        take_screenshot_tool,
         click_element_tool,     
         type_text_tool,         
+        run_browser_actions_tool,
+        check_routes_tool,
         close_browser_tool      
     ],
-    llm=default_llm
+    llm=instrument_llm(default_llm, "Debug Agent")
 )
 
 if __name__ == '__main__':
@@ -0,0 +1,77 @@
+"""
+Benchmark: cold vs. warm code interpreter executions.
+
+Runs the same small script several times through CodeInterpreterService once
+without a pool (a new sandbox per call, like the former per-agent
+CodeInterpreterTool instances) and once with a pre-warmed pool, and reports
+the latency per mode. Package installs are measured separately with
+--library (first install vs. cached).
+
+Usage:
+    python -m benchmarks.bench_code_interpreter [--backend local|docker] [--runs 10] [--pool-size 2] [--library six]
+
+The 'docker' backend needs the Docker SDK and a running daemon; 'local' is
+the Docker-free stand-in and shows the pool overhead only.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.code_interpreter import CodeInterpreterService, create_sandbox_backend
+
+SCRIPT = "import json, platform\nprint(json.dumps({'python': platform.python_version(), 'sum': sum(range(10000))}))"
+
+
+def run_mode(backend, runs: int, pool_size: int):
+    service = CodeInterpreterService(backend, pool_size=pool_size, max_sandboxes=1)
+    if pool_size:
+        service.warm_up(background=False)
+    latencies = []
+    failures = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = service.execute(SCRIPT)
+        latencies.append(time.perf_counter() - start)
+        failures += 0 if result["exit_code"] == 0 and not result["error"] else 1
+    stats = service.stats()
+    service.shutdown()
+    return latencies, failures, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default=os.getenv("CODE_INTERPRETER_BACKEND", "docker"), help="'docker' or 'local'.")
+    parser.add_argument("--runs", type=int, default=10, help="Executions per mode.")
+    parser.add_argument("--pool-size", type=int, default=2, help="Pre-warmed sandboxes in the pooled mode.")
+    parser.add_argument("--library", default=None, help="Also time installing this package (first vs. cached).")
+    args = parser.parse_args()
+
+    try:
+        backend = create_sandbox_backend(args.backend)
+    except Exception as e:
+        print(f"FEHLER: Backend '{args.backend}' nicht verfügbar: {e}")
+        sys.exit(1)
+
+    header = f"{'mode':<22} | {'runs':>4} | {'median s':>9} | {'mean s':>9} | {'max s':>9} | {'failed':>6}"
+    print(header)
+    print("-" * len(header))
+    for name, pool_size in (("new sandbox per call", 0), (f"warm pool ({args.pool_size})", args.pool_size)):
+        latencies, failures, _ = run_mode(backend, args.runs, pool_size)
+        print(f"{name:<22} | {len(latencies):>4} | {statistics.median(latencies):>9.3f} | "
+              f"{statistics.mean(latencies):>9.3f} | {max(latencies):>9.3f} | {failures:>6}")
+
+    if args.library:
+        service = CodeInterpreterService(backend, pool_size=1, max_sandboxes=1)
+        for label in ("first", "cached"):
+            start = time.perf_counter()
+            result = service.execute(f"print('{args.library} ok')", [args.library])
+            print(f"install {args.library} ({label}): {time.perf_counter() - start:.2f}s {result['warnings'] or ''}")
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
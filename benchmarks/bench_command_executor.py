@@ -0,0 +1,71 @@
+"""
+Benchmark: streaming, bounded command execution vs. subprocess.run(capture_output=True).
+
+Runs a command that writes a large build-log-like output (default 100 MB) once
+through plain subprocess.run, as CommandExecutionLogic did before, and once
+through the streaming executor. It reports wall time, peak Python memory
+(tracemalloc) and how many characters would reach the agent.
+
+Usage:
+    python -m benchmarks.bench_command_executor [--megabytes 100] [--skip-baseline]
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.execution_tools import CommandExecutionLogic
+
+
+def noisy_command(megabytes: int):
+    script = ("import sys\n"
+              "line = 'npm WARN deprecated some-package@1.0.0: this line simulates a noisy build log entry ' * 8 + '\\n'\n"
+              f"for _ in range({megabytes} * 1024 * 1024 // len(line)): sys.stdout.write(line)\n"
+              "print('build finished', file=sys.stderr)\n")
+    return [sys.executable, "-c", script]
+
+
+def measure(run):
+    tracemalloc.start()
+    start = time.perf_counter()
+    chars = run()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, chars
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=int, default=100, help="Output size of the test command.")
+    parser.add_argument("--skip-baseline", action="store_true", help="Only run the streaming executor.")
+    args = parser.parse_args()
+
+    command = noisy_command(args.megabytes)
+    modes = []
+    if not args.skip_baseline:
+        def baseline():
+            process = subprocess.run(command, capture_output=True, text=True, check=False)
+            return len(process.stdout.strip()) + len(process.stderr.strip())
+        modes.append(("subprocess.run", baseline))
+
+    def streaming():
+        result = CommandExecutionLogic().execute_command(command)
+        return len(result["stdout"]) + len(result["stderr"])
+    modes.append(("streaming executor", streaming))
+
+    header = f"{'mode':<20} | {'seconds':>8} | {'peak MB':>9} | {'chars to agent':>14}"
+    print(f"Befehl schreibt ca. {args.megabytes} MB auf stdout")
+    print(header)
+    print("-" * len(header))
+    for name, run in modes:
+        elapsed, peak, chars = measure(run)
+        print(f"{name:<20} | {elapsed:>8.2f} | {peak / 1e6:>9.1f} | {chars:>14}")
+
+
+if __name__ == "__main__":
+    main()
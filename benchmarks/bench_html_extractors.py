@@ -0,0 +1,112 @@
+"""
+Benchmark: HTML text extractor backends (bs4 / lxml / selectolax).
+
+Runs every installed backend over a corpus of saved HTML pages and reports
+time per page and peak Python memory (tracemalloc) with the scraper's
+15000 character budget.
+
+Usage:
+    python -m benchmarks.bench_html_extractors [--corpus DIR] [--fetch URL [URL ...]] [--repeat 3]
+
+--fetch downloads the given URLs into the corpus directory first. If the corpus
+is empty, synthetic pages of increasing size are generated instead.
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.html_extractors import DEFAULT_MAX_CHARS, available_extractor_backends, get_extractor
+
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "html_corpus")
+
+
+def fetch_into_corpus(urls: List[str], corpus_dir: str) -> None:
+    from tools.http_client import get_http_session
+    os.makedirs(corpus_dir, exist_ok=True)
+    session = get_http_session()
+    for index, url in enumerate(urls):
+        try:
+            response = session.get(url, timeout=20)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Überspringe {url}: {e}")
+            continue
+        file_name = f"page_{index:03d}_{len(response.content) // 1024}kb.html"
+        with open(os.path.join(corpus_dir, file_name), "wb") as f:
+            f.write(response.content)
+        print(f"Gespeichert: {url} -> {file_name}")
+
+
+def synthetic_corpus() -> List[Tuple[str, bytes]]:
+    paragraph = "<p>Lorem ipsum dolor sit amet, <a href='#'>consectetur</a> adipiscing elit, sed do eiusmod tempor.</p>"
+    boilerplate = "<nav><ul>" + "<li><a href='#'>Menu item</a></li>" * 30 + "</ul></nav><script>var tracking = {};</script>"
+    pages = []
+    for paragraphs in (50, 500, 5000, 50000):
+        html = f"<html><head><style>body {{}}</style></head><body>{boilerplate}<article>{paragraph * paragraphs}</article><footer>Footer</footer></body></html>"
+        pages.append((f"synthetic_{paragraphs}_paragraphs", html.encode("utf-8")))
+    return pages
+
+
+def load_corpus(corpus_dir: str) -> List[Tuple[str, bytes]]:
+    if not os.path.isdir(corpus_dir):
+        return []
+    pages = []
+    for file_name in sorted(os.listdir(corpus_dir)):
+        if file_name.lower().endswith((".html", ".htm")):
+            with open(os.path.join(corpus_dir, file_name), "rb") as f:
+                pages.append((file_name, f.read()))
+    return pages
+
+
+def measure(backend: str, html: bytes, repeat: int) -> Dict[str, float]:
+    extractor = get_extractor(backend)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = extractor.extract(html, DEFAULT_MAX_CHARS)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    extractor.extract(html, DEFAULT_MAX_CHARS)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": min(timings) * 1000, "peak_kb": peak / 1024, "chars": len(result["text"])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS_DIR, help="Directory with saved .html pages.")
+    parser.add_argument("--fetch", nargs="*", default=[], help="URLs to download into the corpus first.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per page (best is reported).")
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_into_corpus(args.fetch, args.corpus)
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f"Kein Korpus in '{args.corpus}' gefunden, verwende synthetische Seiten.")
+        pages = synthetic_corpus()
+
+    backends = available_extractor_backends()
+    header = f"{'page':<40} | {'size KB':>8} | " + " | ".join(f"{b + ' ms':>12} | {b + ' peak KB':>15}" for b in backends)
+    print(header)
+    print("-" * len(header))
+    totals = {b: 0.0 for b in backends}
+    for name, html in pages:
+        row = f"{name[:40]:<40} | {len(html) / 1024:>8.1f} | "
+        cells = []
+        for backend in backends:
+            stats = measure(backend, html, args.repeat)
+            totals[backend] += stats["ms"]
+            cells.append(f"{stats['ms']:>12.2f} | {stats['peak_kb']:>15.0f}")
+        print(row + " | ".join(cells))
+    print("-" * len(header))
+    print("Gesamtzeit: " + ", ".join(f"{b}={totals[b]:.1f} ms" for b in backends))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: cold-start import time of agents.py (or any other module).
+
+Imports the module in a fresh interpreter with `python -X importtime` and
+summarizes the report: wall time of the process, cumulative import time of the
+module, the packages with the most import time (self time summed per top-level
+package) and the slowest individual modules. Dummy GEMINI_API_KEY and
+LITELLM_MODEL_NAME are set if missing, because agents.py refuses to load
+without them; no API calls are made.
+
+Usage:
+    python -m benchmarks.bench_startup [--module agents] [--repeat 3] [--top 15] [--history startup_history.jsonl]
+
+--history appends one JSON line per run (timestamp, module, timings, top
+packages) so cold-start time can be tracked across commits.
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+from typing import Any, Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# "import time:       123 |       4567 |     package.module"
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(\S+)\s*$")
+
+
+def run_importtime(module: str) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.setdefault("GEMINI_API_KEY", "benchmark-dummy-key")
+    env.setdefault("LITELLM_MODEL_NAME", "gemini/gemini-1.5-flash")
+    env["PYTHONPATH"] = PROJECT_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=PROJECT_ROOT,
+                             env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if process.returncode != 0:
+        tail = "\n".join([line for line in process.stderr.splitlines() if not line.startswith("import time:")][-10:])
+        raise RuntimeError(f"Import of '{module}' failed (exit code {process.returncode}):\n{tail}")
+
+    modules = []
+    for line in process.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            modules.append({"name": match.group(3), "self_us": int(match.group(1)), "cumulative_us": int(match.group(2))})
+    module_entry = next((entry for entry in reversed(modules) if entry["name"] == module), None)
+    packages: Dict[str, int] = defaultdict(int)
+    for entry in modules:
+        packages[entry["name"].split(".")[0]] += entry["self_us"]
+    return {
+        "wall_seconds": wall,
+        "import_seconds": (module_entry["cumulative_us"] if module_entry else sum(e["self_us"] for e in modules)) / 1e6,
+        "module_count": len(modules),
+        "packages": dict(packages),
+        "modules": modules,
+    }
+
+
+def _top(items: Dict[str, int], count: int) -> List[tuple]:
+    return sorted(items.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="agents", help="Module to import (default: agents).")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters to start (median is reported).")
+    parser.add_argument("--top", type=int, default=15, help="Number of packages and modules to list.")
+    parser.add_argument("--history", default=None, help="JSONL file to append the result to.")
+    args = parser.parse_args()
+
+    runs = [run_importtime(args.module) for _ in range(max(1, args.repeat))]
+    median_run = sorted(runs, key=lambda run: run["import_seconds"])[len(runs) // 2]
+    wall = statistics.median(run["wall_seconds"] for run in runs)
+    imports = statistics.median(run["import_seconds"] for run in runs)
+
+    print(f"'import {args.module}': {imports:.2f}s Importzeit, {wall:.2f}s Prozess (Median aus {len(runs)}), "
+          f"{median_run['module_count']} Module")
+    print()
+    print(f"{'package':<30} | {'self ms':>9} | {'share':>6}")
+    print("-" * 51)
+    total_self = sum(median_run["packages"].values()) or 1
+    for name, self_us in _top(median_run["packages"], args.top):
+        print(f"{name:<30} | {self_us / 1000:>9.1f} | {self_us / total_self:>6.1%}")
+    print()
+    print(f"{'module (cumulative)':<50} | {'cum ms':>9} | {'self ms':>9}")
+    print("-" * 75)
+    slowest = sorted(median_run["modules"], key=lambda entry: entry["cumulative_us"], reverse=True)
+    for entry in [entry for entry in slowest if entry["name"] != args.module][:args.top]:
+        print(f"{entry['name'][:50]:<50} | {entry['cumulative_us'] / 1000:>9.1f} | {entry['self_us'] / 1000:>9.1f}")
+
+    if args.history:
+        record = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "module": args.module,
+            "python": sys.version.split()[0],
+            "runs": len(runs),
+            "import_seconds": round(imports, 3),
+            "wall_seconds": round(wall, 3),
+            "module_count": median_run["module_count"],
+            "top_packages_ms": {name: round(self_us / 1000, 1) for name, self_us in _top(median_run["packages"], args.top)},
+        }
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\nErgebnis an {args.history} angehängt.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: TextSummarizationTool 'direct' mode vs. 'agent' mode.
+
+Measures latency and the prompt/completion tokens reported by LiteLLM for
+several input sizes. Requires GEMINI_API_KEY (and optionally LITELLM_MODEL_NAME)
+because it performs real LLM calls. The result cache is disabled for the run.
+
+Usage:
+    python -m benchmarks.bench_summarization_modes [--sizes 300 1500 6000] [--repeat 2]
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["TOOL_RESULT_CACHE_ENABLED"] = "0"  # Jede Messung soll einen echten LLM-Aufruf auslösen
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import litellm
+from tools.text_summarization_tool import TextSummarizationTool
+
+SAMPLE_TEXT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_text_summarization", "input_text.txt")
+
+_usage_lock = threading.Lock()
+_usage_records: List[Dict[str, int]] = []
+
+
+def _record_usage(kwargs, completion_response, start_time, end_time):
+    usage = getattr(completion_response, "usage", None)
+    if usage is None:
+        return
+    with _usage_lock:
+        _usage_records.append({
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        })
+
+
+def _wait_for_usage(expected_count: int, timeout: float = 5.0) -> None:
+    # LiteLLM ruft Success-Callbacks asynchron in einem Hintergrund-Thread auf
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with _usage_lock:
+            if len(_usage_records) >= expected_count:
+                return
+        time.sleep(0.05)
+
+
+def build_input(word_count: int) -> str:
+    with open(SAMPLE_TEXT_PATH, "r", encoding="utf-8") as f:
+        base_words = f.read().split()
+    words = (base_words * (word_count // max(1, len(base_words)) + 1))[:word_count]
+    # Alle 80 Wörter einen Absatz, damit der Text realistisch strukturiert ist
+    return "\n\n".join(" ".join(words[i:i + 80]) for i in range(0, len(words), 80))
+
+
+def run_mode(mode: str, text: str) -> Dict[str, float]:
+    # Großes Chunk-Budget: gemessen wird ein einzelner Aufruf, nicht die Map-Reduce-Engine
+    tool = TextSummarizationTool(summarization_mode=mode, chunk_token_budget=10 ** 9)
+    with _usage_lock:
+        before = len(_usage_records)
+    start = time.perf_counter()
+    summary = tool._run(text, max_length=120)
+    latency = time.perf_counter() - start
+    _wait_for_usage(before + 1)
+    with _usage_lock:
+        new_records = _usage_records[before:]
+    return {
+        "latency_s": latency,
+        "llm_calls": len(new_records),
+        "prompt_tokens": sum(r["prompt_tokens"] for r in new_records),
+        "completion_tokens": sum(r["completion_tokens"] for r in new_records),
+        "ok": not summary.startswith("TOOL_ERROR"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[300, 1500, 6000], help="Input sizes in words.")
+    parser.add_argument("--repeat", type=int, default=2, help="Runs per mode and size (averaged).")
+    args = parser.parse_args()
+
+    if not os.getenv("GEMINI_API_KEY"):
+        print("FEHLER: GEMINI_API_KEY nicht gesetzt. Der Benchmark benötigt echte LLM-Aufrufe.")
+        sys.exit(1)
+
+    litellm.success_callback.append(_record_usage)
+
+    header = f"{'words':>7} | {'mode':>6} | {'latency s':>9} | {'calls':>5} | {'prompt tok':>10} | {'compl. tok':>10} | ok"
+    print(header)
+    print("-" * len(header))
+    for size in args.sizes:
+        text = build_input(size)
+        for mode in ("direct", "agent"):
+            runs = [run_mode(mode, text) for _ in range(args.repeat)]
+            n = len(runs)
+            print(f"{size:>7} | {mode:>6} | "
+                  f"{sum(r['latency_s'] for r in runs) / n:>9.2f} | "
+                  f"{sum(r['llm_calls'] for r in runs) / n:>5.1f} | "
+                  f"{sum(r['prompt_tokens'] for r in runs) / n:>10.0f} | "
+                  f"{sum(r['completion_tokens'] for r in runs) / n:>10.0f} | "
+                  f"{all(r['ok'] for r in runs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: batched vision analysis vs. the serial analyze_image() loop.
+
+Asks every prompt for every image once with one analyze_image() call per
+(image, prompt) pair and once with analyze_images_batch(), and reports wall
+time, number of Gemini requests and failed answers. Requires GEMINI_API_KEY
+because it performs real API calls. The result cache is disabled for the run.
+
+Usage:
+    python -m benchmarks.bench_vision_batch [--images FILE [FILE ...]] [--copies 4] [--max-images 6] [--concurrency 3]
+
+Without --images, test_images/test_mockup.png is used. --copies repeats the
+image list to simulate a set of mockup screens.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["TOOL_RESULT_CACHE_ENABLED"] = "0"  # Jede Messung soll echte API-Aufrufe auslösen
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from tools.vision_analyzer_tool import get_vision_analyzer_logic
+
+DEFAULT_IMAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_images", "test_mockup.png")
+DEFAULT_PROMPTS = [
+    "List the main UI elements (navigation, buttons, forms) in one sentence.",
+    "Name the dominant colors as hex codes.",
+    "Describe the layout structure (columns, header, footer) in one sentence.",
+]
+
+
+def run_serial(images, prompts, tokens_per_answer):
+    logic = get_vision_analyzer_logic()
+    failures = 0
+    start = time.perf_counter()
+    for image in images:
+        for prompt in prompts:
+            result = logic.analyze_image(image, prompt, max_output_tokens=tokens_per_answer)
+            failures += 1 if result["error"] else 0
+    return {"seconds": time.perf_counter() - start, "requests": len(images) * len(prompts), "failed": failures}
+
+
+def run_batch(images, prompts, tokens_per_answer, max_images, concurrency):
+    logic = get_vision_analyzer_logic()
+    start = time.perf_counter()
+    batch = logic.analyze_images_batch(images, prompts, max_images_per_request=max_images,
+                                       max_concurrency=concurrency, tokens_per_answer=tokens_per_answer)
+    return {
+        "seconds": time.perf_counter() - start,
+        "requests": batch["stats"]["requests"],
+        "failed": sum(len(prompts) for result in batch["results"] if result["error"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", nargs="*", default=[DEFAULT_IMAGE], help="Image files or URLs.")
+    parser.add_argument("--copies", type=int, default=4, help="Repeat the image list this many times.")
+    parser.add_argument("--max-images", type=int, default=6, help="Images per batch request.")
+    parser.add_argument("--concurrency", type=int, default=3, help="Batch requests in flight at the same time.")
+    parser.add_argument("--tokens-per-answer", type=int, default=256, help="Output tokens per image and prompt.")
+    args = parser.parse_args()
+
+    if not os.getenv("GEMINI_API_KEY"):
+        print("FEHLER: GEMINI_API_KEY nicht gesetzt. Der Benchmark benötigt echte API-Aufrufe.")
+        sys.exit(1)
+
+    images = args.images * args.copies
+    print(f"{len(images)} Bilder x {len(DEFAULT_PROMPTS)} Fragen, Limit: {os.getenv('GEMINI_REQUESTS_PER_MINUTE', '15')} Requests/Minute")
+    header = f"{'mode':>7} | {'seconds':>8} | {'requests':>8} | {'failed answers':>14}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in (
+        ("serial", run_serial(images, DEFAULT_PROMPTS, args.tokens_per_answer)),
+        ("batch", run_batch(images, DEFAULT_PROMPTS, args.tokens_per_answer, args.max_images, args.concurrency)),
+    ):
+        print(f"{name:>7} | {stats['seconds']:>8.2f} | {stats['requests']:>8} | {stats['failed']:>14}")
+
+
+if __name__ == "__main__":
+    main()
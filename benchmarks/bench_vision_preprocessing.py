@@ -0,0 +1,122 @@
+"""
+Benchmark: image preprocessing before the Gemini vision upload.
+
+Runs the preprocessing pipeline (resize to max edge, mode conversion, metadata
+stripping, re-encoding, optional tiling) with several settings over sample
+mockups and reports original vs. sent bytes, sent dimensions and time per image.
+No API calls are made.
+
+Usage:
+    python -m benchmarks.bench_vision_preprocessing [--images FILE [FILE ...]] [--max-edge 1536] [--repeat 3]
+
+Without --images the PNGs in test_images/ plus synthetic mockups (large RGBA
+screen, tall full-page mockup, photo-like hero image) are used.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from io import BytesIO
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+from tools.image_preprocessing import ImagePreprocessor
+
+DEFAULT_IMAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_images")
+
+
+def _png_bytes(image: Image.Image) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _draw_mockup(width: int, height: int, mode: str = "RGBA") -> Image.Image:
+    image = Image.new(mode, (width, height), (245, 246, 250, 255) if mode == "RGBA" else (245, 246, 250))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, width, 90], fill=(33, 37, 41))
+    for index in range(6):
+        draw.text((40 + index * 160, 35), f"Menu {index}", fill=(255, 255, 255))
+    y = 140
+    while y < height - 200:
+        draw.rounded_rectangle([60, y, width - 60, y + 320], radius=16, fill=(255, 255, 255), outline=(210, 214, 220))
+        draw.rectangle([90, y + 30, 490, y + 290], fill=(120, 160, 220))
+        for line in range(8):
+            draw.text((530, y + 40 + line * 28), "Lorem ipsum dolor sit amet, consectetur adipiscing elit." * 2, fill=(50, 50, 50))
+        y += 360
+    return image
+
+
+def _photo_like(width: int, height: int) -> Image.Image:
+    rng = random.Random(42)
+    noise = bytes(rng.randrange(256) for _ in range((width // 4) * (height // 4) * 3))
+    return Image.frombytes("RGB", (width // 4, height // 4), noise).resize((width, height), Image.BICUBIC)
+
+
+def synthetic_mockups() -> List[Tuple[str, bytes]]:
+    return [
+        ("synthetic_screen_2880x1800_rgba", _png_bytes(_draw_mockup(2880, 1800))),
+        ("synthetic_fullpage_1440x7200", _png_bytes(_draw_mockup(1440, 7200, "RGB"))),
+        ("synthetic_photo_3000x2000", _png_bytes(_photo_like(3000, 2000))),
+    ]
+
+
+def load_images(paths: List[str]) -> List[Tuple[str, bytes]]:
+    images = []
+    for path in paths:
+        with open(path, "rb") as f:
+            images.append((os.path.basename(path), f.read()))
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", nargs="*", default=None, help="Image files to use instead of the default samples.")
+    parser.add_argument("--max-edge", type=int, default=1536, help="Max edge in pixels for all settings.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per image (best is reported).")
+    args = parser.parse_args()
+
+    if args.images:
+        samples = load_images(args.images)
+    else:
+        local = [os.path.join(DEFAULT_IMAGE_DIR, name) for name in sorted(os.listdir(DEFAULT_IMAGE_DIR))
+                 if name.lower().endswith((".png", ".jpg", ".jpeg", ".webp"))] if os.path.isdir(DEFAULT_IMAGE_DIR) else []
+        samples = load_images(local) + synthetic_mockups()
+
+    settings = [
+        ("jpeg q85", ImagePreprocessor(max_edge=args.max_edge, image_format="JPEG", quality=85, tile=False)),
+        ("jpeg q70", ImagePreprocessor(max_edge=args.max_edge, image_format="JPEG", quality=70, tile=False)),
+        ("webp q80", ImagePreprocessor(max_edge=args.max_edge, image_format="WEBP", quality=80, tile=False)),
+        ("png", ImagePreprocessor(max_edge=args.max_edge, image_format="PNG", tile=False)),
+        ("jpeg q85 tiled", ImagePreprocessor(max_edge=args.max_edge, image_format="JPEG", quality=85, tile=True)),
+    ]
+
+    header = f"{'image':<34} | {'setting':<15} | {'orig KB':>9} | {'sent KB':>9} | {'ratio':>6} | {'sent size':<22} | {'ms':>8}"
+    print(header)
+    print("-" * len(header))
+    totals = {name: [0, 0] for name, _ in settings}
+    for image_name, data in samples:
+        for setting_name, preprocessor in settings:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                report = preprocessor.preprocess(Image.open(BytesIO(data)), len(data))
+                timings.append(time.perf_counter() - start)
+            sizes = ", ".join(f"{w}x{h}" for w, h in report["sent_sizes"])
+            if len(sizes) > 22:
+                sizes = f"{report['tiles']} x {report['sent_sizes'][0][0]}x{report['sent_sizes'][0][1]}"
+            totals[setting_name][0] += len(data)
+            totals[setting_name][1] += report["sent_bytes"]
+            print(f"{image_name[:34]:<34} | {setting_name:<15} | {len(data) / 1024:>9.1f} | {report['sent_bytes'] / 1024:>9.1f} | "
+                  f"{report['sent_bytes'] / len(data):>6.2f} | {sizes:<22} | {min(timings) * 1000:>8.1f}")
+        print("-" * len(header))
+    print("Gesamt (gesendet / original): " + ", ".join(
+        f"{name}={sent / 1024:.0f}/{original / 1024:.0f} KB" for name, (original, sent) in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
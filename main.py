@@ -7,6 +7,11 @@ import time
 # Load environment variables FIRST
 load_dotenv()
 
+# Logging vor allen Tool-Imports konfigurieren (LOG_LEVEL, LOG_LEVELS, LOG_JSON_FILE ...)
+from tools.logging_setup import configure_logging, get_logger
+configure_logging()
+logger = get_logger(__name__)
+
 gemini_api_key = os.getenv("GEMINI_API_KEY")
 if not gemini_api_key:
     raise ValueError("GEMINI_API_KEY nicht in .env gefunden! Bitte in der .env Datei eintragen.")
@@ -23,11 +28,20 @@ serper_api_key = os.getenv("SERPER_API_KEY")
 if serper_api_key:
     os.environ["SERPER_API_KEY"] = serper_api_key
 else:
-    print("WARNUNG: SERPER_API_KEY nicht in .env gefunden!")
+    logger.warning("SERPER_API_KEY nicht in .env gefunden!")
 
 from agents import project_manager_agent, developer_agent, researcher_agent, tester_agent, debug_agent
 from tools.web_tools import close_browser_tool
+from tools.browser_pool import shutdown_browser_pool
+from tools.code_interpreter import shutdown_code_interpreter_service
 from tools.server_tools import stop_local_http_server_tool, is_port_available 
+from tools.result_cache import get_result_cache
+from tools.llm_telemetry import install_kickoff_report
+from tools.tracing import install_tracing
+
+# Nach jedem Crew.kickoff(): Token-/Kosten-Tabelle und Tool-Latenzen ausgeben, als JSONL exportieren
+install_kickoff_report()
+install_tracing()
 
 # --- Pfaddefinitionen ---
 # Basis-Projektpfad für Artefakte und generierten Code
@@ -172,20 +186,20 @@ def setup_test_environment(base_path, artifacts_subpath, app_code_subpath):
     """Stellt sicher, dass die Basisverzeichnisse für Tests existieren."""
     os.makedirs(artifacts_subpath, exist_ok=True)
     os.makedirs(app_code_subpath, exist_ok=True) 
-    print(f"Basis-Verzeichnisse für Test '{base_path}' sichergestellt/erstellt.")
+    logger.debug("Basis-Verzeichnisse für Test '%s' sichergestellt/erstellt.", base_path)
 
 def run_vision_test():
     # Setup für die Vision-Test-Crew
     setup_test_environment(base_project_path, artifacts_path, application_code_path)
 
-    print(f"\n--- Starte Vision Test Crew ---")
-    print(f"Project Manager soll Bild analysieren: '{test_image_for_pm_analysis}'")
-    print(f"Analysebericht erwartet in: '{pm_vision_analysis_report_file}'")
+    logger.info("Starte Vision Test Crew")
+    logger.info("Project Manager soll Bild analysieren: '%s'", test_image_for_pm_analysis)
+    logger.info("Analysebericht erwartet in: '%s'", pm_vision_analysis_report_file)
 
     # Überprüfen, ob das Testbild existiert, bevor die Crew gestartet wird
     if not os.path.exists(test_image_for_pm_analysis):
-        print(f"FEHLER: Das Testbild '{test_image_for_pm_analysis}' wurde nicht gefunden!")
-        print("Bitte stelle sicher, dass das Bild im Ordner 'test_images' im Projekt-Root liegt oder passe den Pfad an.")
+        logger.error("Das Testbild '%s' wurde nicht gefunden! Bitte stelle sicher, dass das Bild im Ordner "
+                     "'test_images' im Projekt-Root liegt oder passe den Pfad an.", test_image_for_pm_analysis)
         return
 
     try:
@@ -200,23 +214,21 @@ def run_vision_test():
             with open(pm_vision_analysis_report_file, "r", encoding="utf-8") as f:
                 print(f.read())
         else:
-            print(f"FEHLER: Der Analysebericht '{pm_vision_analysis_report_file}' wurde nicht erstellt.")
+            logger.error("Der Analysebericht '%s' wurde nicht erstellt.", pm_vision_analysis_report_file)
 
     except Exception as e:
-        print(f"\nEin Fehler ist während der Ausführung der Vision Test Crew aufgetreten: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Ein Fehler ist während der Ausführung der Vision Test Crew aufgetreten: %s", e)
     finally:
-        print("\n--- Vision Test Crew abgeschlossen. ---")
+        logger.info("Vision Test Crew abgeschlossen.")
 
 def run_summarization_test():
     """Führt den Test für das Text Summarization Tool durch."""
     # Stellt sicher, dass das Verzeichnis für den Summarization-Test existiert
     os.makedirs(text_summarization_test_dir, exist_ok=True)
     
-    print(f"\n--- Starte Text Summarization Test Crew ---")
-    print(f"Input-Text wird erstellt in: '{input_text_file}'")
-    print(f"Erwartete Ausgaben in: '{summary_output_file}' und '{researcher_summary_file}'")
+    logger.info("Starte Text Summarization Test Crew")
+    logger.info("Input-Text wird erstellt in: '%s'", input_text_file)
+    logger.info("Erwartete Ausgaben in: '%s' und '%s'", summary_output_file, researcher_summary_file)
     
     try:
         summarization_result = summarization_test_crew.kickoff()
@@ -235,17 +247,15 @@ def run_summarization_test():
                 with open(file_path, "r", encoding="utf-8") as f:
                     print(f.read())
             else:
-                print(f"FEHLER: Die {file_desc} '{file_path}' wurde nicht erstellt.")
+                logger.error("Die %s '%s' wurde nicht erstellt.", file_desc, file_path)
                 
     except Exception as e:
-        print(f"\nEin Fehler ist während der Ausführung der Text Summarization Test Crew aufgetreten: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Ein Fehler ist während der Ausführung der Text Summarization Test Crew aufgetreten: %s", e)
     finally:
-        print("\n--- Text Summarization Test Crew abgeschlossen. ---")
+        logger.info("Text Summarization Test Crew abgeschlossen.")
 
 if __name__ == '__main__':
-    print("Starte IMAP Agent System...")
+    logger.info("Starte IMAP Agent System...")
     
     # Wähle den Test aus, den du ausführen möchtest
     # Setze run_vision_test_flag auf True, um den Vision-Test zu starten
@@ -258,5 +268,15 @@ if __name__ == '__main__':
     
     if run_summarization_test_flag:
         run_summarization_test()
+
+    # Statistik des Ergebnis-Caches: bei einer Wiederholung desselben Workflows sollten alle Tool-Aufrufe Hits sein
+    result_cache = get_result_cache()
+    if result_cache:
+        print(f"\n--- Ergebnis-Cache (Summarization/Vision): {result_cache.get_stats()} ---")
+
+    # Gemeinsamen Chromium erst am Programmende stoppen (close_browser_tool gibt nur den Kontext frei)
+    shutdown_browser_pool()
+    # Vorgewärmte Sandbox-Container entfernen
+    shutdown_code_interpreter_service()
         
-    print("\n--- Alle Testläufe abgeschlossen. ---")
\ No newline at end of file
+    logger.info("Alle Testläufe abgeschlossen.")
\ No newline at end of file
@@ -0,0 +1,228 @@
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from tools.lazy_imports import lazy_import
+from tools.browser_pool import NAVIGATION_PROFILES, BrowserSession, default_navigation_profile, format_load_timings, navigate_page
+from tools.page_snapshot import resolve_ref_selector
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+playwright_api = lazy_import("playwright.async_api")
+
+DEFAULT_STEP_TIMEOUT_MS = 10000
+_MAX_RESULT_TEXT_CHARS = 500
+
+
+class ActionFailed(Exception):
+    """A batch step failed (assertion not met, element missing, invalid step)."""
+
+
+def locate(page: Any, selector: str) -> Any:
+    """
+    Locator for the selector syntax of the browser tools: 'text=...' (exact text), 'role=link,name=...',
+    'ref=e5' (element ref from the page snapshot) or a CSS selector. Always the first match.
+    """
+    if selector.startswith("text="):
+        return page.get_by_text(selector.split("=", 1)[1], exact=True).first
+    if selector.startswith("role=link,name="):
+        return page.get_by_role("link", name=selector.split("name=", 1)[1]).first
+    return page.locator(resolve_ref_selector(selector)).first
+
+
+def _clip(text: Optional[str]) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= _MAX_RESULT_TEXT_CHARS else text[:_MAX_RESULT_TEXT_CHARS] + "..."
+
+
+def _require(step: Dict[str, Any], *names: str) -> None:
+    missing = [name for name in names if step.get(name) in (None, "")]
+    if missing:
+        raise ActionFailed(f"Missing field(s) {missing} for action '{step.get('action')}'.")
+
+
+def _check_text(actual: str, step: Dict[str, Any], what: str) -> None:
+    if "equals" in step and actual != str(step["equals"]):
+        raise ActionFailed(f"{what} is '{_clip(actual)}', expected '{step['equals']}'.")
+    if "contains" in step and str(step["contains"]) not in actual:
+        raise ActionFailed(f"{what} '{_clip(actual)}' does not contain '{step['contains']}'.")
+
+
+# --- Aktionen: jede bekommt (Session, Schritt, Timeout in ms) und liefert ein kurzes Ergebnis oder wirft ---
+
+async def _navigate(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> str:
+    _require(step, "url")
+    profile = step.get("profile") or default_navigation_profile()
+    if profile not in NAVIGATION_PROFILES:
+        raise ActionFailed(f"Invalid profile '{profile}'. Use one of {list(NAVIGATION_PROFILES)}.")
+    response, timings = await navigate_page(session.page, step["url"], profile, step.get("wait_for_selector"),
+                                            timeout_ms=max(timeout_ms, 30000), blocker=session.blocker)
+    if response is not None and not response.ok:
+        raise ActionFailed(f"Navigation to {step['url']} returned status {response.status}.")
+    return f"'{await session.page.title()}' ({format_load_timings(timings)})"
+
+
+async def _click(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> str:
+    _require(step, "selector")
+    page = session.page
+    await locate(page, step["selector"]).click(timeout=timeout_ms)
+    if step.get("expected_url"):
+        await page.wait_for_url(f"**{step['expected_url']}**", timeout=timeout_ms)
+    else:
+        await page.wait_for_load_state("domcontentloaded", timeout=timeout_ms)
+    return page.url
+
+
+async def _type(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> None:
+    _require(step, "selector")
+    element = locate(session.page, step["selector"])
+    await element.fill(str(step.get("text", "")), timeout=timeout_ms)
+    if step.get("press_enter"):
+        await element.press("Enter", timeout=timeout_ms)
+
+
+async def _press(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> None:
+    _require(step, "key")
+    if step.get("selector"):
+        await locate(session.page, step["selector"]).press(step["key"], timeout=timeout_ms)
+    else:
+        await session.page.keyboard.press(step["key"])
+
+
+async def _select(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> str:
+    _require(step, "selector", "value")
+    selected = await locate(session.page, step["selector"]).select_option(str(step["value"]), timeout=timeout_ms)
+    return ", ".join(selected)
+
+
+async def _check(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> None:
+    _require(step, "selector")
+    await locate(session.page, step["selector"]).set_checked(step["action"] == "check", timeout=timeout_ms)
+
+
+async def _wait_for(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> None:
+    if step.get("url"):
+        await session.page.wait_for_url(f"**{step['url']}**", timeout=timeout_ms)
+        return
+    _require(step, "selector")
+    await locate(session.page, step["selector"]).wait_for(state=step.get("state", "visible"), timeout=timeout_ms)
+
+
+async def _get_text(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> str:
+    _require(step, "selector")
+    return _clip(await locate(session.page, step["selector"]).text_content(timeout=timeout_ms))
+
+
+async def _assert_text(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> str:
+    _require(step, "selector")
+    if "equals" not in step and "contains" not in step:
+        raise ActionFailed("assert_text needs 'contains' or 'equals'.")
+    element = locate(session.page, step["selector"])
+    await element.wait_for(state="visible", timeout=timeout_ms)
+    text = " ".join(((await element.text_content()) or "").split())
+    _check_text(text, step, f"Text of '{step['selector']}'")
+    return _clip(text)
+
+
+async def _assert_visible(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> None:
+    _require(step, "selector")
+    state = "visible" if step["action"] == "assert_visible" else "hidden"
+    try:
+        await locate(session.page, step["selector"]).wait_for(state=state, timeout=timeout_ms)
+    except playwright_api.TimeoutError as e:
+        raise ActionFailed(f"Element '{step['selector']}' did not become {state} within {timeout_ms} ms.") from e
+
+
+async def _assert_count(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> int:
+    _require(step, "selector", "count")
+    count = await session.page.locator(resolve_ref_selector(step["selector"])).count()
+    if count != int(step["count"]):
+        raise ActionFailed(f"Found {count} elements for '{step['selector']}', expected {step['count']}.")
+    return count
+
+
+async def _assert_url(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> str:
+    if "equals" not in step and "contains" not in step:
+        raise ActionFailed("assert_url needs 'contains' or 'equals'.")
+    _check_text(session.page.url, step, "URL")
+    return session.page.url
+
+
+async def _assert_title(session: BrowserSession, step: Dict[str, Any], timeout_ms: int) -> str:
+    if "equals" not in step and "contains" not in step:
+        raise ActionFailed("assert_title needs 'contains' or 'equals'.")
+    title = await session.page.title()
+    _check_text(title, step, "Title")
+    return title
+
+
+ACTIONS: Dict[str, Callable[[BrowserSession, Dict[str, Any], int], Awaitable[Any]]] = {
+    "navigate": _navigate,
+    "click": _click,
+    "type": _type,
+    "press": _press,
+    "select": _select,
+    "check": _check,
+    "uncheck": _check,
+    "wait_for": _wait_for,
+    "get_text": _get_text,
+    "assert_text": _assert_text,
+    "assert_visible": _assert_visible,
+    "assert_hidden": _assert_visible,
+    "assert_count": _assert_count,
+    "assert_url": _assert_url,
+    "assert_title": _assert_title,
+}
+
+
+def validate_actions(actions: Any) -> Optional[str]:
+    """Returns an error message if `actions` is not a non-empty list of known action dicts, else None."""
+    if not isinstance(actions, list) or not actions:
+        return "'actions' must be a non-empty list of action objects."
+    for index, step in enumerate(actions):
+        if not isinstance(step, dict) or step.get("action") not in ACTIONS:
+            return f"Step {index}: unknown or missing 'action' in {step!r}. Use one of {sorted(ACTIONS)}."
+    return None
+
+
+async def run_actions(session: BrowserSession, actions: List[Dict[str, Any]],
+                      step_timeout_ms: int = DEFAULT_STEP_TIMEOUT_MS) -> Dict[str, Any]:
+    """
+    Runs the steps in order on the session's page and stops at the first failure.
+
+    Returns:
+        Dict[str, Any]: 'passed', 'failed_step' (index or None), 'total_ms', 'url' and 'steps'
+        (per step: 'index', 'action', 'status' ('ok', 'failed' or 'skipped'), 'elapsed_ms', 'result', 'error').
+    """
+    start = time.perf_counter()
+    steps: List[Dict[str, Any]] = []
+    failed_step = None
+    for index, step in enumerate(actions):
+        entry: Dict[str, Any] = {"index": index, "action": step.get("action"), "status": "skipped"}
+        if step.get("selector"):
+            entry["selector"] = step["selector"]
+        steps.append(entry)
+        if failed_step is not None:
+            continue
+        step_start = time.perf_counter()
+        timeout_ms = int(step.get("timeout_ms") or step_timeout_ms)
+        try:
+            result = await ACTIONS[step["action"]](session, step, timeout_ms)
+            entry["status"] = "ok"
+            if result is not None:
+                entry["result"] = result
+        except Exception as e:
+            entry["status"] = "failed"
+            message = e.message if hasattr(e, "message") else str(e)
+            entry["error"] = f"{type(e).__name__}: {message.splitlines()[0] if message else ''}"
+            failed_step = index
+            logger.debug("Batch step %s (%s) failed: %s", index, step.get("action"), message)
+        entry["elapsed_ms"] = round((time.perf_counter() - step_start) * 1000, 1)
+    session.touch()
+    return {
+        "passed": failed_step is None,
+        "failed_step": failed_step,
+        "total_ms": round((time.perf_counter() - start) * 1000, 1),
+        "url": session.page.url,
+        "steps": steps,
+    }
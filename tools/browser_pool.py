@@ -0,0 +1,490 @@
+import os
+import time
+import asyncio
+import threading
+import concurrent.futures
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+from tools.tracing import current_agent_role
+from tools.env_config import int_from_env
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Schlüssel für Aufrufe außerhalb einer Agent-Ausführung (z.B. lokale Tests)
+DEFAULT_SESSION_KEY = "default"
+
+
+def session_key() -> str:
+    """Key of the browser session for the current call: the role of the running agent, else 'default'."""
+    return current_agent_role() or DEFAULT_SESSION_KEY
+
+
+class BrowserLaunchError(RuntimeError):
+    """Chromium or a browser context could not be started."""
+
+
+class BrowserEventLoop:
+    """
+    Dedicated daemon thread running the asyncio event loop of the async Playwright backend.
+    Synchronous callers (CrewAI tools, from any thread) submit coroutines with run().
+    """
+    def __init__(self, name: str = "playwright-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None and self._thread is not None and self._thread.is_alive():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(started.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name=self.name, daemon=True)
+            self._thread.start()
+            started.wait()
+            self._loop = loop
+            logger.debug("Browser event loop thread '%s' started.", self.name)
+            return loop
+
+    @property
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Runs `coro` on the loop thread and blocks until it finishes (cancelled after `timeout` seconds)."""
+        if self.in_loop_thread:
+            coro.close()
+            raise RuntimeError("BrowserEventLoop.run() called from the loop thread; await the coroutine instead.")
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Browser operation did not finish within {timeout} seconds.")
+
+    def stop(self) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=10)
+        if not loop.is_running():
+            loop.close()
+
+
+# --- Navigationsprofile ---
+# Ressourcentypen und Analytics-Hosts, die bei blockierenden Profilen per Request-Routing abgebrochen werden
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+ANALYTICS_HOST_MARKERS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "connect.facebook.com", "hotjar.com", "segment.io", "segment.com", "mixpanel.com",
+    "clarity.ms", "plausible.io", "matomo", "newrelic.com", "nr-data.net", "scorecardresearch.com",
+)
+NAVIGATION_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Bisheriges Verhalten: auf 'load' warten, nichts blockieren
+    "full": {"wait_until": "load", "block_resources": False},
+    # Bilder, Fonts, Medien und Analytics blockieren, sonst wie 'full'
+    "no-media": {"wait_until": "load", "block_resources": True},
+    # Nur auf das geparste DOM warten (Bilder/Skripte dürfen noch nachladen)
+    "dom": {"wait_until": "domcontentloaded", "block_resources": False},
+    # Schnellstes Profil zum Lesen von Text: blockieren + 'domcontentloaded'
+    "text": {"wait_until": "domcontentloaded", "block_resources": True},
+}
+DEFAULT_NAVIGATION_PROFILE = "full"
+
+# Navigation Timing Level 2 der zuletzt geladenen Seite (Millisekunden relativ zum Navigationsstart)
+_NAVIGATION_TIMING_JS = """() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    if (!nav) return null;
+    const ms = (value) => value > 0 ? Math.round(value) : null;
+    return {
+        ttfb_ms: ms(nav.responseStart),
+        dom_content_loaded_ms: ms(nav.domContentLoadedEventEnd),
+        load_ms: ms(nav.loadEventEnd),
+        transfer_bytes: nav.transferSize || 0,
+        resources: performance.getEntriesByType('resource').length,
+    };
+}"""
+
+
+def default_navigation_profile() -> str:
+    """Profile used when a tool gets none: BROWSER_NAVIGATION_PROFILE, else 'full'."""
+    profile = os.getenv("BROWSER_NAVIGATION_PROFILE", DEFAULT_NAVIGATION_PROFILE).strip().lower()
+    return profile if profile in NAVIGATION_PROFILES else DEFAULT_NAVIGATION_PROFILE
+
+
+def _is_analytics_url(url: str) -> bool:
+    lowered = url.lower()
+    return any(marker in lowered for marker in ANALYTICS_HOST_MARKERS)
+
+
+class ResourceBlocker:
+    """Request routing for one page that aborts images, fonts, media and analytics requests while enabled."""
+    def __init__(self, page: Any):
+        self.page = page
+        self.enabled = False
+        self.blocked = 0
+
+    async def _handle(self, route: Any) -> None:
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or _is_analytics_url(request.url):
+            self.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def set_enabled(self, enabled: bool) -> None:
+        # Routing kostet auch bei durchgelassenen Requests einen Roundtrip, daher nur bei Bedarf aktiv
+        if enabled and not self.enabled:
+            await self.page.route("**/*", self._handle)
+        elif not enabled and self.enabled:
+            await self.page.unroute("**/*", self._handle)
+        self.enabled = enabled
+
+
+async def navigate_page(page: Any, url: str, profile: str = DEFAULT_NAVIGATION_PROFILE,
+                        wait_for_selector: Optional[str] = None, timeout_ms: int = 30000,
+                        blocker: Optional[ResourceBlocker] = None) -> tuple[Any, Dict[str, Any]]:
+    """
+    Navigates `page` to `url` with a navigation profile (see NAVIGATION_PROFILES).
+    With `wait_for_selector` the navigation returns as soon as that element is visible
+    instead of waiting for the profile's load state.
+
+    Returns:
+        tuple: (Playwright response or None, load timings with 'profile', 'waited_for', 'elapsed_ms', 'blocked_requests'
+        and the page's navigation timing: 'ttfb_ms', 'dom_content_loaded_ms', 'load_ms', 'transfer_bytes', 'resources').
+    """
+    settings = NAVIGATION_PROFILES[profile]
+    blocker = blocker or ResourceBlocker(page)
+    await blocker.set_enabled(settings["block_resources"])
+    blocked_before = blocker.blocked
+    start = time.perf_counter()
+    if wait_for_selector:
+        response = await page.goto(url, timeout=timeout_ms, wait_until="commit")
+        await page.wait_for_selector(wait_for_selector, state="visible", timeout=timeout_ms)
+    else:
+        response = await page.goto(url, timeout=timeout_ms, wait_until=settings["wait_until"])
+    timings: Dict[str, Any] = {"profile": profile, "waited_for": wait_for_selector or settings["wait_until"],
+                               "elapsed_ms": round((time.perf_counter() - start) * 1000),
+                               "blocked_requests": blocker.blocked - blocked_before}
+    try:
+        timings.update(await page.evaluate(_NAVIGATION_TIMING_JS) or {})
+    except Exception as e:
+        logger.debug("Navigation timing not available for %s: %s", url, e)
+    return response, timings
+
+
+def format_load_timings(timings: Dict[str, Any]) -> str:
+    """One-line summary of navigate_page() timings for tool results."""
+    parts = [f"profile '{timings['profile']}' (waited for {timings['waited_for']})", f"total {timings['elapsed_ms']} ms"]
+    for key, label in (("ttfb_ms", "TTFB"), ("dom_content_loaded_ms", "DOMContentLoaded"), ("load_ms", "load")):
+        if timings.get(key) is not None:
+            parts.append(f"{label} {timings[key]} ms")
+    if timings.get("blocked_requests"):
+        parts.append(f"{timings['blocked_requests']} requests blocked")
+    return ", ".join(parts)
+
+
+class BrowserSession:
+    """One isolated BrowserContext (own cookies, storage and cache) with its active page."""
+    def __init__(self, key: str, context: Any, page: Any):
+        self.key = key
+        self.context = context
+        self.page = page
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+        self._blocker: Optional[ResourceBlocker] = None
+        # Letzter Seiten-Snapshot (url + Zeilen) für den Diff-Modus des Snapshot-Tools
+        self.last_snapshot: Optional[Dict[str, Any]] = None
+        # Perceptual Hash + letzte Analyse je (url, selector, full_page) für die Screenshot-Deduplizierung
+        self.screenshot_history: Dict[tuple, Dict[str, Any]] = {}
+
+    def touch(self) -> None:
+        self.last_used = time.monotonic()
+        self.uses += 1
+
+    @property
+    def blocker(self) -> ResourceBlocker:
+        """Resource blocker of the current page (a replaced page gets a new one)."""
+        if self._blocker is None or self._blocker.page is not self.page:
+            self._blocker = ResourceBlocker(self.page)
+        return self._blocker
+
+
+class BrowserPool:
+    """
+    Keeps one Chromium instance warm and hands out one BrowserContext per agent/session key,
+    so the Tester and Debug agents no longer share (and clobber) a single page.
+
+    - Contexts are reused across tool calls of the same key.
+    - Contexts idle for longer than `idle_seconds` are closed on the next acquire (idle eviction).
+    - At most `max_contexts` contexts are open; the least recently used one is evicted for a new key.
+    - Releasing a context keeps Chromium running; only shutdown() stops the browser.
+
+    The pool uses Playwright's async API on a dedicated event loop thread (BrowserEventLoop):
+    acquire(), get_page(), release(), evict_idle() and map_pages() are coroutines for that loop,
+    synchronous code submits them with run(). Several pages can therefore load concurrently.
+
+    Launch, acquire and release durations are recorded (see stats()/format_stats()).
+    """
+    def __init__(self, headless: bool = True, max_contexts: Optional[int] = None, idle_seconds: Optional[float] = None,
+                 playwright_factory: Optional[Callable[[], Awaitable[Any]]] = None, call_timeout: Optional[float] = None):
+        self.headless = headless
+        self.max_contexts = max(1, max_contexts if max_contexts is not None else int_from_env("BROWSER_POOL_MAX_CONTEXTS", 4))
+        self.idle_seconds = idle_seconds if idle_seconds is not None else int_from_env("BROWSER_POOL_IDLE_SECONDS", 300)
+        # Sicherheitsnetz für run(); die einzelnen Playwright-Aufrufe haben eigene, kürzere Timeouts
+        self.call_timeout = call_timeout if call_timeout is not None else int_from_env("BROWSER_CALL_TIMEOUT_SECONDS", 180)
+        self._playwright_factory = playwright_factory
+        self._loop = BrowserEventLoop()
+        self._playwright = None
+        self._browser = None
+        # Nur auf dem Loop-Thread verändert, daher ohne Thread-Lock
+        self._sessions: Dict[str, BrowserSession] = {}
+        self._acquire_lock: Optional[asyncio.Lock] = None
+        self._timings: Dict[str, List[float]] = {"launch": [], "acquire": [], "release": []}
+        self._counters = {"launches": 0, "contexts_created": 0, "contexts_reused": 0,
+                          "idle_evictions": 0, "lru_evictions": 0, "releases": 0}
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Runs a coroutine of this pool (or any async Playwright code) on the browser loop and returns its result."""
+        return self._loop.run(coro, timeout if timeout is not None else self.call_timeout)
+
+    # --- Browser ---
+
+    async def _start_playwright(self) -> Any:
+        if self._playwright_factory is not None:
+            return await self._playwright_factory()
+        from playwright.async_api import async_playwright
+        return await async_playwright().start()
+
+    async def _ensure_browser(self) -> Any:
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        if self._browser is not None:
+            logger.warning("Browser disconnected, relaunching Chromium.")
+            await self._discard_browser()
+        start = time.perf_counter()
+        try:
+            self._playwright = await self._start_playwright()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        except Exception as e:
+            await self._discard_browser()
+            raise BrowserLaunchError(f"Failed to launch Chromium: {e}") from e
+        elapsed = time.perf_counter() - start
+        self._timings["launch"].append(elapsed)
+        self._counters["launches"] += 1
+        logger.debug("Chromium launched (headless=%s) in %.3fs.", self.headless, elapsed)
+        return self._browser
+
+    async def _discard_browser(self) -> None:
+        # Nach einem Absturz/Fehlstart: alle Referenzen verwerfen, Schließfehler sind unkritisch
+        self._sessions.clear()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.debug("Minor error closing browser: %s", e)
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.debug("Minor error stopping playwright: %s", e)
+        self._browser, self._playwright = None, None
+
+    @property
+    def is_running(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    # --- Kontexte ---
+
+    async def acquire(self, key: str) -> BrowserSession:
+        """
+        Returns the session of `key`, creating its context and page if needed.
+        A closed page is replaced by a new page in the same context.
+        Raises BrowserLaunchError if Chromium or the context cannot be started.
+        """
+        start = time.perf_counter()
+        if self._acquire_lock is None:
+            self._acquire_lock = asyncio.Lock()
+        # Serialisiert Start und Kontext-Anlage: gleichzeitige Aufrufe teilen sich einen Chromium/Kontext
+        async with self._acquire_lock:
+            await self.evict_idle()
+            browser = await self._ensure_browser()
+            session = self._sessions.get(key)
+            if session is not None:
+                if session.page is None or session.page.is_closed():
+                    session.page = await session.context.new_page()
+                self._counters["contexts_reused"] += 1
+            else:
+                while len(self._sessions) >= self.max_contexts:
+                    lru_key = min(self._sessions, key=lambda k: self._sessions[k].last_used)
+                    logger.debug("Max contexts (%s) reached, evicting least recently used session '%s'.",
+                                 self.max_contexts, lru_key)
+                    await self._close_session(lru_key)
+                    self._counters["lru_evictions"] += 1
+                try:
+                    context = await browser.new_context()
+                    session = BrowserSession(key, context, await context.new_page())
+                except Exception as e:
+                    raise BrowserLaunchError(f"Failed to create a browser context: {e}") from e
+                self._sessions[key] = session
+                self._counters["contexts_created"] += 1
+                logger.debug("New browser context for session '%s' (%s open).", key, len(self._sessions))
+            session.touch()
+        self._timings["acquire"].append(time.perf_counter() - start)
+        return session
+
+    async def get_session(self, key: str) -> Optional[BrowserSession]:
+        """The session of `key` if it has an open page (without creating one), else None."""
+        session = self._sessions.get(key)
+        if session is None or session.page is None or session.page.is_closed():
+            return None
+        session.touch()
+        return session
+
+    async def get_page(self, key: str) -> Optional[Any]:
+        """The open page of `key` without creating one, else None."""
+        session = await self.get_session(key)
+        return session.page if session is not None else None
+
+    async def release(self, key: str) -> bool:
+        """Closes the context of `key`; Chromium keeps running. Returns False if none was open."""
+        start = time.perf_counter()
+        released = await self._close_session(key)
+        if released:
+            self._timings["release"].append(time.perf_counter() - start)
+            self._counters["releases"] += 1
+        return released
+
+    async def _close_session(self, key: str) -> bool:
+        session = self._sessions.pop(key, None)
+        if session is None:
+            return False
+        try:
+            await session.context.close()
+        except Exception as e:
+            logger.debug("Minor error closing context of session '%s': %s", key, e)
+        return True
+
+    async def evict_idle(self) -> int:
+        """Closes all contexts unused for longer than idle_seconds. Returns the number of evicted contexts."""
+        if self.idle_seconds <= 0:
+            return 0
+        now = time.monotonic()
+        idle_keys = [key for key, session in self._sessions.items() if now - session.last_used > self.idle_seconds]
+        for key in idle_keys:
+            logger.debug("Evicting browser session '%s' (idle for %.0fs).", key, now - self._sessions[key].last_used)
+            await self._close_session(key)
+        self._counters["idle_evictions"] += len(idle_keys)
+        return len(idle_keys)
+
+    async def map_pages(self, key: str, items: List[Any], handler: Callable[[Any, Any], Awaitable[T]],
+                        max_concurrency: int = 4) -> List[T]:
+        """
+        Multi-page API: calls `await handler(page, item)` for every item on its own fresh page of
+        `key`'s context, at most `max_concurrency` pages at a time. Pages are closed afterwards.
+        Results are returned in input order; exceptions of a handler are returned in its slot.
+        """
+        session = await self.acquire(key)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run_one(item: Any) -> T:
+            async with semaphore:
+                page = await session.context.new_page()
+                try:
+                    return await handler(page, item)
+                finally:
+                    try:
+                        await page.close()
+                    except Exception as e:
+                        logger.debug("Minor error closing page: %s", e)
+
+        results = await asyncio.gather(*(run_one(item) for item in items), return_exceptions=True)
+        session.touch()
+        return results
+
+    def session_keys(self) -> List[str]:
+        return list(self._sessions)
+
+    async def _shutdown(self) -> bool:
+        was_running = self._browser is not None or self._playwright is not None
+        for key in list(self._sessions):
+            await self._close_session(key)
+        await self._discard_browser()
+        # Der Lock gehört zum Loop, der nach shutdown() beendet wird
+        self._acquire_lock = None
+        return was_running
+
+    def shutdown(self) -> bool:
+        """Closes all contexts, stops Chromium, Playwright and the loop thread. Returns False if nothing was running."""
+        if self._browser is None and self._playwright is None:
+            self._loop.stop()
+            return False
+        try:
+            was_running = self.run(self._shutdown())
+        finally:
+            self._loop.stop()
+        logger.debug("Browser pool shut down.")
+        return was_running
+
+    # --- Statistik ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus count/total/mean/max seconds of launch, acquire and release."""
+        result: Dict[str, Any] = dict(self._counters, open_contexts=len(self._sessions))
+        for name, values in self._timings.items():
+            values = list(values)
+            result[f"{name}_seconds"] = {
+                "count": len(values),
+                "total": round(sum(values), 4),
+                "mean": round(sum(values) / len(values), 4) if values else 0.0,
+                "max": round(max(values), 4) if values else 0.0,
+            }
+        return result
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        lines = [f"launches={stats['launches']}, contexts created={stats['contexts_created']}, "
+                 f"reused={stats['contexts_reused']}, idle evictions={stats['idle_evictions']}, "
+                 f"LRU evictions={stats['lru_evictions']}, releases={stats['releases']}, open={stats['open_contexts']}"]
+        for name in ("launch", "acquire", "release"):
+            timing = stats[f"{name}_seconds"]
+            lines.append(f"{name:<8} count={timing['count']:>4}  mean={timing['mean']:.3f}s  max={timing['max']:.3f}s  "
+                         f"total={timing['total']:.3f}s")
+        return "\n".join(lines)
+
+
+_browser_pool: Optional[BrowserPool] = None
+_browser_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Returns the process-wide browser pool (created lazily, headless unless BROWSER_HEADLESS=false)."""
+    global _browser_pool
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            _browser_pool = BrowserPool(headless=os.getenv("BROWSER_HEADLESS", "true").strip().lower() != "false")
+        return _browser_pool
+
+
+def shutdown_browser_pool(report: bool = True) -> None:
+    """Stops the shared browser (end of the program) and prints the pool timings if it was used."""
+    if _browser_pool is None:
+        return
+    if report and _browser_pool.stats()["launches"]:
+        print("\n--- Browser-Pool (Start/Acquire/Release) ---")
+        print(_browser_pool.format_stats())
+    _browser_pool.shutdown()
@@ -0,0 +1,167 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Signatur der Funktion, die einen einzelnen (kurzen) Text zusammenfasst:
+# (text, max_length, summary_focus) -> Zusammenfassung oder "TOOL_ERROR ..."-String
+SummarizeFn = Callable[[str, Optional[int], Optional[str]], str]
+
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token estimate (~4 characters per token).
+    Good enough for chunk budgeting; avoids loading a tokenizer for every call.
+    """
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+
+class TextChunker:
+    """
+    Splits text into chunks below a token budget.
+    Paragraph boundaries are preferred, then sentence boundaries; only a single
+    sentence that exceeds the budget on its own is cut hard by characters.
+    """
+    def __init__(self, max_chunk_tokens: int = 3000):
+        if max_chunk_tokens <= 0:
+            raise ValueError("max_chunk_tokens must be a positive integer.")
+        self.max_chunk_tokens = max_chunk_tokens
+
+    def _split_oversized(self, paragraph: str) -> List[str]:
+        pieces: List[str] = []
+        for sentence in _SENTENCE_SPLIT_RE.split(paragraph):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            if estimate_tokens(sentence) <= self.max_chunk_tokens:
+                pieces.append(sentence)
+                continue
+            max_chars = self.max_chunk_tokens * 4
+            for start in range(0, len(sentence), max_chars):
+                pieces.append(sentence[start:start + max_chars])
+        return pieces
+
+    def split(self, text: str) -> List[str]:
+        units: List[str] = []
+        for paragraph in _PARAGRAPH_SPLIT_RE.split(text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if estimate_tokens(paragraph) <= self.max_chunk_tokens:
+                units.append(paragraph)
+            else:
+                units.extend(self._split_oversized(paragraph))
+
+        # Einheiten gierig zu Chunks zusammenfassen, solange das Budget reicht
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for unit in units:
+            unit_tokens = estimate_tokens(unit)
+            if current and current_tokens + unit_tokens > self.max_chunk_tokens:
+                chunks.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(unit)
+            current_tokens += unit_tokens
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+
+
+class ChunkedSummarizationEngine:
+    """
+    Map-reduce summarization for texts that do not fit into a single prompt.
+
+    Map: every chunk is summarized independently (up to `max_workers` in parallel).
+    Reduce: the partial summaries are joined and summarized again. If the joined
+    text is still above the chunk budget, it is re-chunked and mapped again,
+    at most `max_reduce_depth` times, before the final pass.
+    """
+    def __init__(self,
+                 summarize_fn: SummarizeFn,
+                 max_chunk_tokens: int = 3000,
+                 max_workers: int = 4,
+                 max_reduce_depth: int = 3):
+        if max_workers <= 0:
+            raise ValueError("max_workers must be a positive integer.")
+        if max_reduce_depth < 0:
+            raise ValueError("max_reduce_depth must not be negative.")
+        self.summarize_fn = summarize_fn
+        self.chunker = TextChunker(max_chunk_tokens)
+        self.max_workers = max_workers
+        self.max_reduce_depth = max_reduce_depth
+
+    def _map(self, chunks: List[str], summary_focus: Optional[str]) -> List[str]:
+        if len(chunks) == 1 or self.max_workers == 1:
+            return [self.summarize_fn(chunk, None, summary_focus) for chunk in chunks]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as executor:
+            # executor.map liefert die Ergebnisse in Eingabereihenfolge
+            return list(executor.map(lambda chunk: self.summarize_fn(chunk, None, summary_focus), chunks))
+
+    def summarize(self, text: str, max_length: Optional[int] = None, summary_focus: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Returns a dictionary containing:
+            'summary': The final summary (string), or None on error.
+            'error': An error message if any stage failed, or None.
+            'stats': Chunk counts, reduce levels and per-stage timings in seconds.
+        """
+        result: Dict[str, Any] = {"summary": None, "error": None, "stats": {}}
+        stats: Dict[str, Any] = {
+            "input_tokens_estimate": estimate_tokens(text),
+            "chunks": 0,
+            "map_calls": 0,
+            "reduce_levels": 0,
+            "timings": {"split": 0.0, "map": [], "reduce": 0.0, "total": 0.0},
+        }
+        result["stats"] = stats
+        total_start = time.perf_counter()
+
+        start = time.perf_counter()
+        chunks = self.chunker.split(text)
+        stats["timings"]["split"] = time.perf_counter() - start
+        stats["chunks"] = len(chunks)
+        logger.debug("Split %s estimated tokens into %s chunks (budget %s tokens/chunk).", stats['input_tokens_estimate'], len(chunks), self.chunker.max_chunk_tokens)
+
+        current_chunks = chunks
+        level = 0
+        while True:
+            start = time.perf_counter()
+            partials = self._map(current_chunks, summary_focus)
+            stats["timings"]["map"].append(time.perf_counter() - start)
+            stats["map_calls"] += len(current_chunks)
+
+            for partial in partials:
+                if not isinstance(partial, str) or partial.startswith("TOOL_ERROR"):
+                    result["error"] = partial if isinstance(partial, str) else f"TOOL_ERROR (ChunkedSummarization): Unexpected map result: {partial!r}"
+                    stats["timings"]["total"] = time.perf_counter() - total_start
+                    return result
+
+            combined = "\n\n".join(p.strip() for p in partials if p.strip())
+            if estimate_tokens(combined) <= self.chunker.max_chunk_tokens or level >= self.max_reduce_depth:
+                break
+            level += 1
+            current_chunks = self.chunker.split(combined)
+            logger.debug("Partial summaries still too long, reduce level %s with %s chunks.", level, len(current_chunks))
+        stats["reduce_levels"] = level
+
+        start = time.perf_counter()
+        final_summary = self.summarize_fn(combined, max_length, summary_focus)
+        stats["timings"]["reduce"] = time.perf_counter() - start
+        stats["timings"]["total"] = time.perf_counter() - total_start
+
+        if not isinstance(final_summary, str) or final_summary.startswith("TOOL_ERROR"):
+            result["error"] = final_summary if isinstance(final_summary, str) else f"TOOL_ERROR (ChunkedSummarization): Unexpected reduce result: {final_summary!r}"
+            return result
+
+        result["summary"] = final_summary.strip()
+        timings = stats["timings"]
+        logger.debug("Done. split=%.3fs, map=%ss, reduce=%.3fs, total=%.3fs", timings['split'], [round(t, 3) for t in timings['map']], timings['reduce'], timings['total'])
+        return result
@@ -0,0 +1,543 @@
+import io
+import os
+import re
+import sys
+import time
+import shutil
+import atexit
+import hashlib
+import tarfile
+import tempfile
+import threading
+import subprocess
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from tools.execution_tools import kill_process_tree, process_group_kwargs
+from tools.env_config import int_from_env
+from tools.lazy_imports import lazy_import
+from tools.tracing import trace_tool
+from tools.logging_setup import get_logger, truncated
+
+logger = get_logger(__name__)
+
+# Docker SDK erst beim Start des ersten Containers laden (kommt mit crewai_tools)
+docker = lazy_import("docker", optional=True)
+
+WORKSPACE_DIR = "/workspace"
+PACKAGES_DIR = "/opt/code-interpreter-packages"
+DEFAULT_IMAGE = "python:3.12-slim"
+# Exit-Code von coreutils 'timeout', wenn das Kommando per TERM beendet wurde
+_TIMEOUT_EXIT_CODE = 124
+# SIGKILL: 'timeout' nach der Nachfrist - oder der OOM-Killer bei Erreichen von mem_limit
+_SIGKILL_EXIT_CODE = 137
+
+
+def _normalize_package(spec: str) -> str:
+    """'Beautifulsoup4>=4.12' -> 'beautifulsoup4', 'scikit_learn' -> 'scikit-learn' (PEP 503 ohne Version/Extras)."""
+    name = re.split(r"[<>=!~\[;@ ]", spec.strip(), maxsplit=1)[0]
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _installed_from_listing(names: List[str]) -> Set[str]:
+    """Distribution names from the *.dist-info directories of a --target package directory."""
+    installed = set()
+    for name in names:
+        if name.endswith(".dist-info"):
+            installed.add(_normalize_package(name[:-len(".dist-info")].rsplit("-", 1)[0]))
+    return installed
+
+
+class Sandbox(ABC):
+    """One isolated execution environment (container or local directory) that can run several jobs in turn."""
+    image_key = ""
+
+    @abstractmethod
+    def install(self, packages: List[str], timeout: int) -> Tuple[int, str]:
+        """Installs packages into the shared package directory. Returns (exit code, pip output)."""
+
+    @abstractmethod
+    def installed_packages(self) -> Set[str]:
+        """Normalized names of the distributions in the shared package directory."""
+
+    @abstractmethod
+    def run(self, code: str, timeout: int) -> Tuple[int, str, bool]:
+        """Runs `code` as main.py in the workspace. Returns (exit code, combined output, timed out)."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Empties the workspace and stops leftover processes; raises if the sandbox is no longer usable."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Releases the sandbox (removes the container or the workspace directory)."""
+
+
+# --- Docker ---
+
+class DockerSandbox(Sandbox):
+    def __init__(self, container: Any, image_key: str, mem_limit: Optional[str] = None):
+        self.container = container
+        self.image_key = image_key
+        self.mem_limit = mem_limit
+
+    def install(self, packages: List[str], timeout: int) -> Tuple[int, str]:
+        exit_code, output = self.container.exec_run(
+            ["timeout", "-k", "5", str(timeout), "pip", "install", "--quiet", "--disable-pip-version-check",
+             "--target", PACKAGES_DIR, *packages])
+        return exit_code, (output or b"").decode("utf-8", errors="replace")
+
+    def installed_packages(self) -> Set[str]:
+        exit_code, output = self.container.exec_run(["ls", "-1", PACKAGES_DIR])
+        if exit_code != 0:
+            return set()
+        return _installed_from_listing((output or b"").decode("utf-8", errors="replace").split())
+
+    def run(self, code: str, timeout: int) -> Tuple[int, str, bool]:
+        data = code.encode("utf-8")
+        archive = io.BytesIO()
+        with tarfile.open(fileobj=archive, mode="w") as tar:
+            info = tarfile.TarInfo("main.py")
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(data))
+        self.container.put_archive(WORKSPACE_DIR, archive.getvalue())
+        start = time.monotonic()
+        exit_code, output = self.container.exec_run(["timeout", "-k", "2", str(timeout), "python3", "-u", "main.py"],
+                                                    workdir=WORKSPACE_DIR)
+        text = (output or b"").decode("utf-8", errors="replace")
+        # 137 allein ist kein Timeout: nur zusammen mit abgelaufener Zeit (KILL nach der Nachfrist von 'timeout')
+        timed_out = exit_code == _TIMEOUT_EXIT_CODE or (exit_code == _SIGKILL_EXIT_CODE and time.monotonic() - start >= timeout)
+        if exit_code == _SIGKILL_EXIT_CODE and not timed_out:
+            text += f"\n[Process was killed (exit code 137), most likely out of memory (limit {self.mem_limit or 'unknown'}).]"
+        return exit_code, text, timed_out
+
+    def reset(self) -> None:
+        # kill -9 -1 trifft alle Prozesse außer PID 1 (sleep) und der Shell selbst
+        exit_code, output = self.container.exec_run(
+            ["sh", "-c", f"kill -9 -1 2>/dev/null; find {WORKSPACE_DIR} /tmp -mindepth 1 -delete"])
+        if exit_code != 0:
+            raise RuntimeError(f"Workspace reset failed: {(output or b'').decode('utf-8', errors='replace')[:200]}")
+
+    def close(self) -> None:
+        try:
+            self.container.remove(force=True)
+        except Exception as e:
+            logger.debug("Minor error removing container %s: %s", getattr(self.container, "short_id", "?"), e)
+
+
+class DockerSandboxBackend:
+    """
+    Starts idle containers (`sleep infinity`) from `image`. Installed packages live in a named
+    volume per image, mounted into every container on PYTHONPATH, so a package is installed
+    once per image instead of once per container (and survives restarts).
+    """
+    name = "docker"
+
+    def __init__(self, image: Optional[str] = None, mem_limit: Optional[str] = None, network: Optional[str] = None):
+        if docker is None:
+            raise RuntimeError("The docker code interpreter backend requires the Docker SDK (pip install docker).")
+        self.image = image or os.getenv("CODE_INTERPRETER_IMAGE", DEFAULT_IMAGE)
+        self.mem_limit = mem_limit or os.getenv("CODE_INTERPRETER_MEM_LIMIT", "1g")
+        # Netzwerk wird für pip install benötigt; "none" nur mit vorinstalliertem Image sinnvoll
+        self.network = network or os.getenv("CODE_INTERPRETER_NETWORK", "bridge")
+        self.image_key = self.image
+        self.volume = f"code-interpreter-packages-{hashlib.sha1(self.image.encode('utf-8')).hexdigest()[:12]}"
+        self.client = docker.from_env()
+
+    def create(self) -> Sandbox:
+        container = self.client.containers.run(
+            self.image, command=["sleep", "infinity"], detach=True, working_dir=WORKSPACE_DIR,
+            volumes={self.volume: {"bind": PACKAGES_DIR, "mode": "rw"}},
+            environment={"PYTHONPATH": PACKAGES_DIR, "PYTHONDONTWRITEBYTECODE": "1"},
+            mem_limit=self.mem_limit, network_mode=self.network, labels={"crew.code-interpreter": "1"},
+        )
+        return DockerSandbox(container, self.image_key, self.mem_limit)
+
+
+# --- Lokaler Ersatz ohne Docker (Tests, Entwicklung) ---
+
+class LocalSandbox(Sandbox):
+    """Runs code with the current interpreter in a temporary directory. Not isolated: only for tests and trusted code."""
+    def __init__(self, packages_dir: str, image_key: str):
+        self.workspace = tempfile.mkdtemp(prefix="code-interpreter-")
+        self.packages_dir = packages_dir
+        self.image_key = image_key
+
+    def _env(self) -> Dict[str, str]:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = self.packages_dir + os.pathsep + env.get("PYTHONPATH", "")
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+        return env
+
+    def _communicate(self, command: List[str], timeout: int) -> Tuple[int, str, bool]:
+        process = subprocess.Popen(command, cwd=self.workspace, env=self._env(), stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, **process_group_kwargs())
+        try:
+            output, _ = process.communicate(timeout=timeout)
+            return process.returncode, output.decode("utf-8", errors="replace"), False
+        except subprocess.TimeoutExpired:
+            kill_process_tree(process, grace_seconds=0)
+            try:
+                output, _ = process.communicate(timeout=5)
+            except subprocess.TimeoutExpired:
+                # Ein abgekoppelter Enkelprozess hält die Pipe offen
+                process.kill()
+                process.wait()
+                output = b""
+            return process.returncode, (output or b"").decode("utf-8", errors="replace"), True
+
+    def install(self, packages: List[str], timeout: int) -> Tuple[int, str]:
+        exit_code, output, _ = self._communicate(
+            [sys.executable, "-m", "pip", "install", "--quiet", "--disable-pip-version-check",
+             "--target", self.packages_dir, *packages], timeout)
+        return exit_code, output
+
+    def installed_packages(self) -> Set[str]:
+        return _installed_from_listing(os.listdir(self.packages_dir)) if os.path.isdir(self.packages_dir) else set()
+
+    def run(self, code: str, timeout: int) -> Tuple[int, str, bool]:
+        with open(os.path.join(self.workspace, "main.py"), "w", encoding="utf-8") as f:
+            f.write(code)
+        return self._communicate([sys.executable, "-u", "main.py"], timeout)
+
+    def reset(self) -> None:
+        for name in os.listdir(self.workspace):
+            path = os.path.join(self.workspace, name)
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
+    def close(self) -> None:
+        shutil.rmtree(self.workspace, ignore_errors=True)
+
+
+class LocalSandboxBackend:
+    """Docker-free stand-in with the same pool/reset/package-cache behavior; packages go to a --target dir per interpreter."""
+    name = "local"
+
+    def __init__(self, packages_dir: Optional[str] = None):
+        self.image_key = f"local:{sys.executable}"
+        cache_root = os.getenv("CODE_INTERPRETER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "code_interpreter"))
+        self.packages_dir = packages_dir or os.path.join(
+            cache_root, hashlib.sha1(self.image_key.encode("utf-8")).hexdigest()[:12], "site-packages")
+        os.makedirs(self.packages_dir, exist_ok=True)
+
+    def create(self) -> Sandbox:
+        return LocalSandbox(self.packages_dir, self.image_key)
+
+
+def create_sandbox_backend(name: Optional[str] = None) -> Any:
+    """Backend from CODE_INTERPRETER_BACKEND: 'docker' (default) or 'local' (unsandboxed stand-in)."""
+    name = (name or os.getenv("CODE_INTERPRETER_BACKEND", "docker")).strip().lower()
+    if name == "local":
+        return LocalSandboxBackend()
+    if name == "docker":
+        return DockerSandboxBackend()
+    raise ValueError(f"Unknown code interpreter backend '{name}'. Use 'docker' or 'local'.")
+
+
+class CodeInterpreterService:
+    """
+    Shared code execution for all agents with a pool of pre-warmed sandboxes:
+
+    - `pool_size` sandboxes are started in the background (warm_up) and kept idle between jobs.
+    - A job takes an idle sandbox (warm) or starts a new one (cold), at most `max_sandboxes` at a time.
+    - After a job the workspace is reset and the sandbox goes back to the pool; sandboxes that timed
+      out or failed the reset are discarded and replaced in the background.
+    - Installed packages are remembered per image and shared via the backend's package directory,
+      so pip only runs for packages the image has not seen yet.
+
+    Latencies of cold and warm jobs, sandbox startup and installs are recorded (see stats()/format_stats()).
+    """
+    def __init__(self, backend: Any, pool_size: Optional[int] = None, max_sandboxes: Optional[int] = None,
+                 timeout: Optional[int] = None, install_timeout: Optional[int] = None):
+        self.backend = backend
+        self.pool_size = max(0, pool_size if pool_size is not None else int_from_env("CODE_INTERPRETER_POOL_SIZE", 2))
+        self.max_sandboxes = max(1, max_sandboxes if max_sandboxes is not None else int_from_env("CODE_INTERPRETER_MAX_SANDBOXES", 4))
+        self.timeout = timeout if timeout is not None else int_from_env("CODE_INTERPRETER_TIMEOUT_SECONDS", 120)
+        self.install_timeout = install_timeout if install_timeout is not None else int_from_env("CODE_INTERPRETER_INSTALL_TIMEOUT_SECONDS", 300)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_sandboxes)
+        self._idle: List[Sandbox] = []
+        self._busy = 0
+        self._warming = 0
+        self._closed = False
+        # Installierte Pakete je Image (None = Verzeichnis noch nicht eingelesen)
+        self._installed: Dict[str, Optional[Set[str]]] = {}
+        self._install_lock = threading.Lock()
+        self._timings: Dict[str, List[float]] = {"cold": [], "warm": [], "startup": [], "install": []}
+        self._counters = {"sandboxes_created": 0, "sandboxes_reused": 0, "sandboxes_discarded": 0, "timeouts": 0}
+
+    # --- Pool ---
+
+    def _create_sandbox(self) -> Sandbox:
+        start = time.perf_counter()
+        sandbox = self.backend.create()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._timings["startup"].append(elapsed)
+            self._counters["sandboxes_created"] += 1
+        logger.debug("Started %s sandbox in %.2fs.", self.backend.name, elapsed)
+        return sandbox
+
+    def warm_up(self, count: Optional[int] = None, background: bool = True) -> None:
+        """Starts sandboxes until `count` (default pool_size) are idle or warming."""
+        with self._lock:
+            missing = max(0, (self.pool_size if count is None else count) - len(self._idle) - self._warming)
+            self._warming += missing
+        if not missing:
+            return
+
+        def start_sandboxes():
+            for _ in range(missing):
+                try:
+                    sandbox = self._create_sandbox()
+                except Exception as e:
+                    logger.warning("Could not pre-warm a %s sandbox: %s", self.backend.name, e)
+                    with self._lock:
+                        self._warming -= 1
+                    continue
+                with self._lock:
+                    self._warming -= 1
+                    if self._closed:
+                        sandbox.close()
+                    else:
+                        self._idle.append(sandbox)
+
+        if background:
+            threading.Thread(target=start_sandboxes, name="code-interpreter-warmup", daemon=True).start()
+        else:
+            start_sandboxes()
+
+    def _acquire(self) -> Tuple[Sandbox, bool]:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Code interpreter service is shut down.")
+            sandbox = self._idle.pop() if self._idle else None
+            self._busy += 1
+            if sandbox is not None:
+                self._counters["sandboxes_reused"] += 1
+        if sandbox is not None:
+            return sandbox, True
+        try:
+            return self._create_sandbox(), False
+        except Exception:
+            with self._lock:
+                self._busy -= 1
+            raise
+
+    def _release(self, sandbox: Sandbox, reusable: bool) -> None:
+        if reusable:
+            try:
+                sandbox.reset()
+            except Exception as e:
+                logger.warning("Discarding sandbox after failed reset: %s", e)
+                reusable = False
+        with self._lock:
+            self._busy -= 1
+            keep = reusable and not self._closed and len(self._idle) < self.pool_size
+            if keep:
+                self._idle.append(sandbox)
+            else:
+                self._counters["sandboxes_discarded"] += 1
+        if not keep:
+            sandbox.close()
+            if not self._closed:
+                self.warm_up()
+
+    # --- Pakete ---
+
+    def _ensure_packages(self, sandbox: Sandbox, libraries: List[str]) -> List[str]:
+        """Installs missing packages (once per image). Returns warnings for packages that could not be installed."""
+        requested = {}
+        for spec in libraries or []:
+            name = _normalize_package(spec)
+            # Standardbibliothek (z.B. 'json', 'math') gibt es nicht auf PyPI
+            if name and name.replace("-", "_") not in sys.stdlib_module_names:
+                requested[name] = spec.strip()
+        if not requested:
+            return []
+        with self._install_lock:
+            installed = self._installed.get(sandbox.image_key)
+            if installed is None:
+                installed = sandbox.installed_packages()
+                self._installed[sandbox.image_key] = installed
+            missing = [spec for name, spec in requested.items() if name not in installed]
+            if not missing:
+                logger.debug("Packages already installed for %s: %s", sandbox.image_key, list(requested))
+                return []
+            start = time.perf_counter()
+            exit_code, output = sandbox.install(missing, self.install_timeout)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._timings["install"].append(elapsed)
+            if exit_code == 0:
+                installed.update(_normalize_package(spec) for spec in missing)
+                logger.info("Installed %s for %s in %.1fs.", missing, sandbox.image_key, elapsed)
+                return []
+            # Einzelne fehlerhafte Namen sollen die übrigen Pakete nicht blockieren
+            installed.update(sandbox.installed_packages())
+            failed = [spec for spec in missing if _normalize_package(spec) not in installed]
+            logger.warning("pip install %s failed (exit code %s): %s", missing, exit_code, truncated(output))
+            return [f"Warning: could not install {', '.join(failed)}."] if failed else []
+
+    # --- Ausführung ---
+
+    def execute(self, code: str, libraries_used: Optional[List[str]] = None, timeout: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Runs Python code in a pooled sandbox.
+
+        Returns:
+            Dict[str, Any]: 'output' (stdout+stderr), 'exit_code', 'timed_out', 'warm' (sandbox came from the pool),
+            'seconds' (total latency incl. acquire/install), 'warnings' and 'error' (None or a message).
+        """
+        result: Dict[str, Any] = {"output": "", "exit_code": None, "timed_out": False, "warm": False,
+                                  "seconds": 0.0, "warnings": [], "error": None}
+        start = time.perf_counter()
+        timeout = timeout or self.timeout
+        with self._slots:
+            try:
+                sandbox, warm = self._acquire()
+            except Exception as e:
+                result["error"] = f"Could not start a {self.backend.name} sandbox: {e}"
+                return result
+            result["warm"] = warm
+            reusable = True
+            try:
+                result["warnings"] = self._ensure_packages(sandbox, libraries_used or [])
+                exit_code, output, timed_out = sandbox.run(code, timeout)
+                result.update(exit_code=exit_code, output=output, timed_out=timed_out)
+                if timed_out:
+                    reusable = False
+                    with self._lock:
+                        self._counters["timeouts"] += 1
+            except Exception as e:
+                reusable = False
+                result["error"] = f"{type(e).__name__}: {e}"
+            finally:
+                self._release(sandbox, reusable)
+        result["seconds"] = time.perf_counter() - start
+        with self._lock:
+            self._timings["warm" if warm else "cold"].append(result["seconds"])
+        logger.debug("Code executed in %s sandbox (%s) in %.2fs, exit code %s.", self.backend.name,
+                     "warm" if warm else "cold", result["seconds"], result["exit_code"])
+        return result
+
+    def shutdown(self) -> None:
+        """Removes all idle sandboxes; busy ones are removed when their job ends."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for sandbox in idle:
+            sandbox.close()
+
+    # --- Statistik ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus count/total/mean/max seconds of cold and warm jobs, sandbox startup and installs."""
+        with self._lock:
+            result: Dict[str, Any] = dict(self._counters, backend=self.backend.name, idle=len(self._idle), busy=self._busy)
+            timings = {name: list(values) for name, values in self._timings.items()}
+        for name, values in timings.items():
+            result[f"{name}_seconds"] = {
+                "count": len(values),
+                "total": round(sum(values), 4),
+                "mean": round(sum(values) / len(values), 4) if values else 0.0,
+                "max": round(max(values), 4) if values else 0.0,
+            }
+        return result
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        lines = [f"backend={stats['backend']}, sandboxes created={stats['sandboxes_created']}, "
+                 f"reused={stats['sandboxes_reused']}, discarded={stats['sandboxes_discarded']}, "
+                 f"timeouts={stats['timeouts']}, idle={stats['idle']}"]
+        for name in ("cold", "warm", "startup", "install"):
+            timing = stats[f"{name}_seconds"]
+            lines.append(f"{name:<8} count={timing['count']:>4}  mean={timing['mean']:.3f}s  max={timing['max']:.3f}s  "
+                         f"total={timing['total']:.3f}s")
+        return "\n".join(lines)
+
+
+_code_interpreter_service: Optional[CodeInterpreterService] = None
+_code_interpreter_service_lock = threading.Lock()
+
+
+def get_code_interpreter_service() -> CodeInterpreterService:
+    """
+    Returns the process-wide service (created on first use, backend from CODE_INTERPRETER_BACKEND)
+    and starts warming its pool.
+
+    Raises:
+        RuntimeError: If the backend cannot be created (e.g. Docker SDK missing or daemon not reachable).
+    """
+    global _code_interpreter_service
+    with _code_interpreter_service_lock:
+        if _code_interpreter_service is None:
+            try:
+                backend = create_sandbox_backend()
+            except Exception as e:
+                raise RuntimeError(f"Code interpreter backend unavailable: {e}") from e
+            _code_interpreter_service = CodeInterpreterService(backend)
+            # Container überleben den Python-Prozess; daher auch ohne main.py-Shutdown aufräumen
+            atexit.register(_code_interpreter_service.shutdown)
+            _code_interpreter_service.warm_up()
+        return _code_interpreter_service
+
+
+def shutdown_code_interpreter_service(report: bool = True) -> None:
+    """Removes the pooled sandboxes (end of the program) and prints the cold/warm timings if code was executed."""
+    if _code_interpreter_service is None:
+        return
+    stats = _code_interpreter_service.stats()
+    if report and (stats["cold_seconds"]["count"] or stats["warm_seconds"]["count"]):
+        print("\n--- Code-Interpreter (cold/warm) ---")
+        print(_code_interpreter_service.format_stats())
+    _code_interpreter_service.shutdown()
+
+
+# --- Tool ---
+
+class CodeInterpreterToolInput(BaseModel):
+    code: str = Field(
+        ...,
+        description="Python3 code used to be interpreted in the Docker container. ALWAYS PRINT the final result and the output of the code",
+    )
+    libraries_used: List[str] = Field(
+        ...,
+        description="List of libraries used in the code with proper installing names separated by commas. Example: numpy,pandas,beautifulsoup4",
+    )
+
+
+class CodeInterpreterTool(BaseTool):
+    name: str = "Code Interpreter"
+    description: str = "Interprets Python3 code strings with a final print statement."
+    args_schema: Type[BaseModel] = CodeInterpreterToolInput
+
+    @trace_tool()
+    def _run(self, code: str, libraries_used: Optional[List[str]] = None) -> str:
+        logger.info("'%s' called (%s chars, libraries: %s)", self.name, len(code or ""), libraries_used)
+        try:
+            service = get_code_interpreter_service()
+        except RuntimeError as e:
+            return (f"TOOL_ERROR (Code Interpreter): {e} "
+                    "(CODE_INTERPRETER_BACKEND=local runs the code without Docker, not sandboxed).")
+        result = service.execute(code, libraries_used)
+        prefix = "".join(f"{warning}\n" for warning in result["warnings"])
+        if result["error"]:
+            return f"TOOL_ERROR (Code Interpreter): {result['error']}"
+        if result["timed_out"]:
+            return (f"{prefix}TOOL_ERROR (Code Interpreter): Execution timed out after {service.timeout}s. "
+                    f"Output so far:\n{result['output']}")
+        if result["exit_code"] != 0:
+            return f"{prefix}Something went wrong while running the code: \n{result['output']}"
+        return prefix + result["output"]
+
+
+# Eine Instanz für alle Agenten; der Sandbox-Pool dahinter ist prozessweit
+code_interpreter_tool = CodeInterpreterTool()
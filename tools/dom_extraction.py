@@ -0,0 +1,95 @@
+from typing import Any, Dict, List, Optional
+
+from tools.page_snapshot import resolve_ref_selector
+
+# Ein einziger page.evaluate()-Roundtrip für beliebig viele Selektoren: pro Eintrag Anzahl der Treffer,
+# Sichtbarkeit, Text und gewünschte Attribute des ersten (bzw. der ersten max_items) Treffer.
+BULK_EXTRACT_JS = """({specs, attributes, maxTextChars, maxItems}) => {
+    const isVisible = (el) => {
+        if (typeof el.checkVisibility === 'function') {
+            return el.checkVisibility({checkOpacity: true, checkVisibilityCSS: true});
+        }
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none' && el.getClientRects().length > 0;
+    };
+    const clip = (text) => {
+        const normalized = (text || '').replace(/\\s+/g, ' ').trim();
+        return normalized.length > maxTextChars ? normalized.slice(0, maxTextChars) + '...' : normalized;
+    };
+    const describe = (el) => {
+        const item = {visible: isVisible(el), text: clip(el.innerText !== undefined ? el.innerText : el.textContent)};
+        if (['INPUT', 'TEXTAREA', 'SELECT'].includes(el.tagName)) {
+            item.value = el.value;
+            if (el.type === 'checkbox' || el.type === 'radio') item.checked = el.checked;
+        }
+        if (attributes.length) {
+            item.attributes = {};
+            for (const name of attributes) {
+                const value = el.getAttribute(name);
+                if (value !== null) item.attributes[name] = value;
+            }
+        }
+        return item;
+    };
+    const result = {};
+    for (const spec of specs) {
+        let elements;
+        try {
+            elements = Array.from(document.querySelectorAll(spec.selector));
+        } catch (e) {
+            result[spec.name] = {selector: spec.selector, error: 'Invalid selector: ' + e.message};
+            continue;
+        }
+        const entry = {selector: spec.selector, count: elements.length,
+                       visible_count: elements.filter(isVisible).length};
+        if (elements.length) {
+            if (spec.all) {
+                entry.items = elements.slice(0, maxItems).map(describe);
+            } else {
+                Object.assign(entry, describe(elements[0]));
+            }
+        }
+        result[spec.name] = entry;
+    }
+    return result;
+}"""
+
+DEFAULT_MAX_TEXT_CHARS = 300
+DEFAULT_MAX_ITEMS = 20
+
+
+def build_extraction_specs(selectors: Optional[List[str]] = None, named_selectors: Optional[Dict[str, str]] = None,
+                           all_matches: bool = False) -> List[Dict[str, Any]]:
+    """
+    Turns a selector list (keys = the selectors) and/or named selectors {name: selector} into the specs
+    passed to BULK_EXTRACT_JS. A selector prefixed with 'all:' returns every match (up to max_items)
+    instead of the first one, as does `all_matches`. Snapshot refs ('ref=e5') are resolved to their CSS selector.
+
+    Raises:
+        ValueError: If neither selectors nor named_selectors contain an entry.
+    """
+    specs: List[Dict[str, Any]] = []
+    entries = [(selector, selector) for selector in (selectors or [])] + list((named_selectors or {}).items())
+    for name, selector in entries:
+        if not isinstance(name, str) or not isinstance(selector, str) or not selector.strip():
+            raise ValueError(f"Invalid selector entry {name!r}: {selector!r}")
+        selector = selector.strip()
+        select_all = all_matches
+        if selector.startswith("all:"):
+            selector, select_all = selector[4:].strip(), True
+        specs.append({"name": name, "selector": resolve_ref_selector(selector), "all": select_all})
+    if not specs:
+        raise ValueError("Provide at least one selector in 'selectors' or 'named_selectors'.")
+    return specs
+
+
+async def extract_elements(page: Any, specs: List[Dict[str, Any]], attributes: Optional[List[str]] = None,
+                           max_text_chars: int = DEFAULT_MAX_TEXT_CHARS,
+                           max_items: int = DEFAULT_MAX_ITEMS) -> Dict[str, Any]:
+    """Evaluates all specs in one page.evaluate() call and returns {name: entry} (see BULK_EXTRACT_JS)."""
+    return await page.evaluate(BULK_EXTRACT_JS, {
+        "specs": specs,
+        "attributes": list(attributes or []),
+        "maxTextChars": max_text_chars,
+        "maxItems": max_items,
+    })
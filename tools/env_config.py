@@ -0,0 +1,14 @@
+import os
+
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+def int_from_env(name: str, default: int) -> int:
+    """Integer setting from the environment; `default` if unset or not a valid integer (with a warning)."""
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        logger.warning("Invalid value for %s, using %s.", name, default)
+        return default
@@ -1,10 +1,123 @@
 import subprocess
 import os
-from typing import List, Dict, Union, Optional # Optional hinzugefügt
+import signal
+import threading
+import time
+from typing import Any, List, Dict, Optional # Optional hinzugefügt
 from crewai.tools import tool
+from tools.env_config import int_from_env
+from tools.tracing import trace_tool
+from tools.logging_setup import get_logger, truncated
+
+logger = get_logger(__name__)
+
+_READ_CHUNK_BYTES = 64 * 1024
+# Nach SIGTERM so lange warten, bevor die Prozessgruppe mit SIGKILL beendet wird
+_KILL_GRACE_SECONDS = 3.0
+# Gemeinsame Frist für beide Reader nach Prozessende (abgekoppelte Enkelprozesse können die Pipes offen halten)
+_READER_JOIN_SECONDS = 2.0
+
+
+class BoundedOutputBuffer:
+    """
+    Keeps the first `head_bytes` and the last `tail_bytes` of a stream (ring buffer) and counts
+    everything in between, so memory stays bounded no matter how much a command prints.
+    Thread-safe: a reader thread may still write while the result is read.
+    """
+    def __init__(self, head_bytes: int, tail_bytes: int):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.total_bytes = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._lock = threading.Lock()
+
+    def write(self, data: bytes) -> None:
+        with self._lock:
+            self.total_bytes += len(data)
+            if len(self._head) < self.head_bytes:
+                room = self.head_bytes - len(self._head)
+                self._head += data[:room]
+                data = data[room:]
+            if data and self.tail_bytes > 0:
+                self._tail += data
+                # Erst bei doppelter Größe kürzen, damit nicht jeder Chunk den Puffer umkopiert
+                if len(self._tail) > 2 * self.tail_bytes:
+                    del self._tail[:-self.tail_bytes]
+
+    def _omitted_bytes(self) -> int:
+        return max(0, self.total_bytes - len(self._head) - min(len(self._tail), self.tail_bytes))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Consistent view of the buffer: 'text' (head + tail with an omission marker), 'total_bytes', 'truncated'."""
+        with self._lock:
+            total_bytes = self.total_bytes
+            omitted = self._omitted_bytes()
+            head = bytes(self._head)
+            tail = bytes(self._tail[-self.tail_bytes:]) if self.tail_bytes > 0 else b""
+        if omitted:
+            text = (f"{head.decode('utf-8', errors='replace')}\n... [{omitted} bytes omitted] ...\n"
+                    f"{tail.decode('utf-8', errors='replace')}")
+        else:
+            text = (head + tail).decode("utf-8", errors="replace")
+        return {"text": text, "total_bytes": total_bytes, "truncated": omitted > 0}
+
+
+def process_group_kwargs() -> Dict[str, Any]:
+    """Popen arguments that start the command in its own process group (session on POSIX)."""
+    if os.name == "posix":
+        return {"start_new_session": True}
+    return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+
+
+def kill_process_tree(process: subprocess.Popen, grace_seconds: float = _KILL_GRACE_SECONDS) -> None:
+    """
+    Stops a command started with process_group_kwargs() including its children (npm -> node ...).
+
+    POSIX: SIGTERM to the process group, SIGKILL after `grace_seconds`.
+    Windows: `taskkill /T /F` on the process tree (process.kill() alone would leave node.exe running
+    behind npm.cmd/cmd.exe); falls back to process.kill() if taskkill is unavailable.
+    """
+    if os.name != "posix":
+        try:
+            subprocess.run(["taskkill", "/T", "/F", "/PID", str(process.pid)], stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, check=False, timeout=30)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.debug("taskkill failed (%s); killing only the direct child.", e)
+        if process.poll() is None:
+            process.kill()
+        return
+    for sig, wait_seconds in ((signal.SIGTERM, grace_seconds), (signal.SIGKILL, None)):
+        try:
+            os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            return
+        if wait_seconds is None:
+            return
+        # Auch wenn der Hauptprozess rechtzeitig endet, bekommt der Rest der Gruppe danach SIGKILL
+        try:
+            process.wait(timeout=wait_seconds)
+        except subprocess.TimeoutExpired:
+            pass
+
 
 # --- Die Logik-Klasse für die Befehlsausführung ---
 class CommandExecutionLogic:
+    """
+    Runs commands with Popen and reads stdout/stderr incrementally into bounded head/tail buffers.
+    Wall-clock and idle timeouts (no output for too long) kill the whole process group, so a hung
+    `npm install` or a dev server started by mistake cannot block the agent.
+
+    Defaults: COMMAND_TIMEOUT_SECONDS (600), COMMAND_IDLE_TIMEOUT_SECONDS (180, 0 = off),
+    COMMAND_OUTPUT_HEAD_BYTES (4000) and COMMAND_OUTPUT_TAIL_BYTES (8000) per stream.
+    """
+    def __init__(self, timeout: Optional[int] = None, idle_timeout: Optional[int] = None,
+                 head_bytes: Optional[int] = None, tail_bytes: Optional[int] = None):
+        self.timeout = timeout if timeout is not None else int_from_env("COMMAND_TIMEOUT_SECONDS", 600)
+        self.idle_timeout = idle_timeout if idle_timeout is not None else int_from_env("COMMAND_IDLE_TIMEOUT_SECONDS", 180)
+        self.head_bytes = head_bytes if head_bytes is not None else int_from_env("COMMAND_OUTPUT_HEAD_BYTES", 4000)
+        self.tail_bytes = tail_bytes if tail_bytes is not None else int_from_env("COMMAND_OUTPUT_TAIL_BYTES", 8000)
+
     def _sanitize_output(self, output: str) -> str:
         """
         A very basic and initial attempt to sanitize output.
@@ -14,27 +127,55 @@ class CommandExecutionLogic:
         # TODO: Implement robust output scrubbing (e.g., for API keys, passwords, specific paths)
         return output
 
-    def execute_command(self, command_list: List[str], working_directory: Optional[str] = None) -> Dict[str, Union[str, int, None]]: # working_directory als Optional markiert
+    @staticmethod
+    def _pump(pipe: Any, buffer: BoundedOutputBuffer, activity: List[float]) -> None:
+        """Reader thread: copies one pipe into its buffer until EOF and records the time of the last output."""
+        try:
+            for chunk in iter(lambda: pipe.read1(_READ_CHUNK_BYTES), b""):
+                buffer.write(chunk)
+                activity[0] = time.monotonic()
+        except (OSError, ValueError):
+            pass  # Pipe wurde beim Abbruch geschlossen
+        finally:
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+    def execute_command(self, command_list: List[str], working_directory: Optional[str] = None,
+                        timeout: Optional[int] = None, idle_timeout: Optional[int] = None) -> Dict[str, Any]:
         """
-        Executes a system command securely using subprocess.
+        Executes a system command securely using subprocess (streaming, bounded output).
 
         Args:
             command_list (List[str]): The command and its arguments as a list of strings.
             working_directory (str, optional): The directory in which to execute the command.
                                                Defaults to the current working directory.
+            timeout (int, optional): Wall-clock limit in seconds. Defaults to COMMAND_TIMEOUT_SECONDS.
+            idle_timeout (int, optional): Kill the command after this many seconds without any output (0 = off).
+                                          Defaults to COMMAND_IDLE_TIMEOUT_SECONDS.
 
         Returns:
-            Dict[str, Union[str, int, None]]: A dictionary containing:
-                'stdout': The standard output of the command (string, sanitized).
-                'stderr': The standard error of the command (string, sanitized).
-                'returncode': The exit code of the command (int).
-                'error': An error message if the command execution itself failed (string, or None).
+            Dict[str, Any]: A dictionary containing:
+                'stdout': The standard output of the command (string, sanitized; head and tail if truncated).
+                'stderr': The standard error of the command (string, sanitized; head and tail if truncated).
+                'returncode': The exit code of the command (int; negative signal number if it was killed).
+                'error': An error message if the command execution itself failed or timed out (string, or None).
+                'timed_out': None, 'wall' or 'idle'.
+                'truncated': True if stdout or stderr was shortened.
+                'stdout_bytes' / 'stderr_bytes': Total bytes the command wrote to each stream.
+                'duration_seconds': Run time of the command.
         """
-        result = {
+        result: Dict[str, Any] = {
             "stdout": None,
             "stderr": None,
             "returncode": None,
-            "error": None
+            "error": None,
+            "timed_out": None,
+            "truncated": False,
+            "stdout_bytes": 0,
+            "stderr_bytes": 0,
+            "duration_seconds": 0.0,
         }
         
         if not isinstance(command_list, list) or not all(isinstance(item, str) for item in command_list):
@@ -45,49 +186,112 @@ class CommandExecutionLogic:
             result["error"] = "TOOL_ERROR: Command list cannot be empty."
             return result
 
+        timeout = timeout if timeout else self.timeout
+        idle_timeout = idle_timeout if idle_timeout is not None else self.idle_timeout
         effective_cwd = working_directory if working_directory else os.getcwd()
-        print(f"--- Debug (execute_command): Executing command: {' '.join(command_list)} in directory: {effective_cwd} ---")
+        logger.info("Executing command: %s in directory: %s (timeout %ss, idle timeout %ss)",
+                    truncated(" ".join(command_list)), effective_cwd, timeout, idle_timeout or "off")
 
+        start = time.monotonic()
         try:
-            process = subprocess.run(
+            # Eigene Prozessgruppe, damit ein Abbruch auch Kindprozesse (npm -> node) erreicht
+            process = subprocess.Popen(
                 command_list,
-                capture_output=True,
-                text=True,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 cwd=working_directory, 
                 shell=False, 
-                check=False 
+                **process_group_kwargs()
             )
-            result["stdout"] = self._sanitize_output(process.stdout.strip())
-            result["stderr"] = self._sanitize_output(process.stderr.strip())
-            result["returncode"] = process.returncode
-
-            if process.returncode != 0:
-                print(f"--- Debug (execute_command): Command exited with code {process.returncode}. Stderr: {process.stderr.strip()} ---")
-            else:
-                print(f"--- Debug (execute_command): Command executed successfully. Stdout: {process.stdout.strip()} ---")
-
         except FileNotFoundError:
             error_msg = f"TOOL_ERROR: Command not found: '{command_list[0]}'. Ensure it's in PATH or provide full path."
-            print(f"--- Debug (execute_command): {error_msg} ---")
+            logger.error("%s", error_msg)
             result["error"] = error_msg
             result["returncode"] = -1 
+            return result
         except Exception as e:
             error_msg = f"TOOL_ERROR: An unexpected error occurred while trying to execute the command: {e}"
-            print(f"--- Debug (execute_command): {error_msg} ---")
+            logger.exception("%s", error_msg)
             result["error"] = error_msg
             result["returncode"] = -2 
+            return result
+
+        stdout_buffer = BoundedOutputBuffer(self.head_bytes, self.tail_bytes)
+        stderr_buffer = BoundedOutputBuffer(self.head_bytes, self.tail_bytes)
+        activity = [start]
+        readers = [threading.Thread(target=self._pump, args=(pipe, buffer, activity), daemon=True)
+                   for pipe, buffer in ((process.stdout, stdout_buffer), (process.stderr, stderr_buffer))]
+        for reader in readers:
+            reader.start()
+
+        try:
+            while True:
+                try:
+                    process.wait(timeout=0.1)
+                    break
+                except subprocess.TimeoutExpired:
+                    pass
+                now = time.monotonic()
+                if now - start > timeout:
+                    result["timed_out"] = "wall"
+                elif idle_timeout and now - activity[0] > idle_timeout:
+                    result["timed_out"] = "idle"
+                if result["timed_out"]:
+                    kill_process_tree(process)
+                    process.wait()
+                    break
+        except BaseException:
+            # z.B. KeyboardInterrupt: keinen verwaisten Prozess zurücklassen
+            kill_process_tree(process)
+            raise
+        finally:
+            result["duration_seconds"] = round(time.monotonic() - start, 3)
+            # Eine gemeinsame Frist für beide Reader, nicht eine pro Reader
+            join_deadline = time.monotonic() + _READER_JOIN_SECONDS
+            for reader in readers:
+                reader.join(timeout=max(0.0, join_deadline - time.monotonic()))
+            if any(reader.is_alive() for reader in readers):
+                logger.debug("Output pipes are still held open by a detached process; returning the output read so far.")
+
+        result["returncode"] = process.returncode
+        stdout_snapshot = stdout_buffer.snapshot()
+        stderr_snapshot = stderr_buffer.snapshot()
+        result["stdout"] = self._sanitize_output(stdout_snapshot["text"].strip())
+        result["stderr"] = self._sanitize_output(stderr_snapshot["text"].strip())
+        result["stdout_bytes"] = stdout_snapshot["total_bytes"]
+        result["stderr_bytes"] = stderr_snapshot["total_bytes"]
+        result["truncated"] = stdout_snapshot["truncated"] or stderr_snapshot["truncated"]
+
+        if result["timed_out"] == "wall":
+            result["error"] = f"TOOL_ERROR: Command exceeded the timeout of {timeout}s and was killed."
+        elif result["timed_out"] == "idle":
+            result["error"] = f"TOOL_ERROR: Command produced no output for {idle_timeout}s and was killed."
+        if result["error"]:
+            logger.warning("%s Stderr: %s", result["error"], truncated(result["stderr"]))
+        elif process.returncode != 0:
+            logger.warning("Command exited with code %d. Stderr: %s", process.returncode, truncated(result["stderr"]))
+        else:
+            logger.debug("Command executed successfully. Stdout: %s", truncated(result["stdout"]))
+        if result["truncated"]:
+            logger.debug("Command output truncated: stdout %s bytes, stderr %s bytes.",
+                         result["stdout_bytes"], result["stderr_bytes"])
         
         return result
 
 _command_execution_logic = CommandExecutionLogic()
 
 @tool("Secure Command Executor Tool")
-def secure_command_executor_tool(command: str, arguments: Optional[List[str]] = None, working_directory: Optional[str] = None) -> Dict[str, Union[str, int, None]]:
+@trace_tool("Secure Command Executor Tool")
+def secure_command_executor_tool(command: str, arguments: Optional[List[str]] = None, working_directory: Optional[str] = None,
+                                 timeout_seconds: Optional[int] = None, idle_timeout_seconds: Optional[int] = None) -> Dict[str, Any]:
     """
     Executes a system command securely. 
     The command and its arguments should be provided carefully.
     This tool should be used for tasks like running scripts, build processes, or linters.
-    It returns a dictionary with 'stdout', 'stderr', 'returncode', and 'error' (if any).
+    Do not use it for long-running servers (use 'Start Local HTTP Server Tool'): commands are killed after a timeout.
+    It returns a dictionary with 'stdout', 'stderr', 'returncode', and 'error' (if any), plus 'timed_out',
+    'truncated' (long output keeps only its beginning and end), 'stdout_bytes', 'stderr_bytes' and 'duration_seconds'.
 
     Args:
         command (str): The main command to execute (e.g., "node", "python", "npm", "git").
@@ -96,8 +300,11 @@ def secure_command_executor_tool(command: str, arguments: Optional[List[str]] =
                                            If None, uses the current working directory of the agent system.
                                            It's highly recommended to specify an absolute path within the project's
                                            application_code directory.
+        timeout_seconds (Optional[int]): Wall-clock limit in seconds. Defaults to 600.
+        idle_timeout_seconds (Optional[int]): Kill the command after this many seconds without output (0 = off). Defaults to 180.
     """
-    print(f"--- Debug (Tool Call): 'Secure Command Executor Tool' called with command: '{command}', args: {arguments}, cwd: {working_directory} ---")
+    logger.info("'Secure Command Executor Tool' called with command: '%s', args: %s, cwd: %s",
+                command, truncated(arguments), working_directory)
     
     if not command:
         return {"stdout": "", "stderr": "TOOL_ERROR: 'command' argument cannot be empty.", "returncode": -1, "error": "TOOL_ERROR: 'command' argument cannot be empty."}
@@ -110,13 +317,14 @@ def secure_command_executor_tool(command: str, arguments: Optional[List[str]] =
     
     if working_directory:
         if ".." in working_directory : # Simple check, can be improved
-             print(f"--- Debug (Tool Call): Warning - working_directory '{working_directory}' contains '..'. Ensure it's a safe, absolute path within the project sandbox. ---")
+             logger.warning("working_directory '%s' contains '..'. Ensure it's a safe, absolute path within the project sandbox.", working_directory)
         if not os.path.isabs(working_directory) and not os.path.exists(working_directory): # Check if relative path exists from CWD
-            print(f"--- Debug (Tool Call): Warning - relative working_directory '{working_directory}' does not exist from CWD. This might lead to errors. Using CWD instead if it's not found later by subprocess.")
+            logger.warning("Relative working_directory '%s' does not exist from CWD. This might lead to errors. Using CWD instead if it's not found later by subprocess.", working_directory)
             # subprocess.run will use CWD if cwd=None or if the path is invalid in some OS,
             # but it's better to be explicit or ensure the path is valid.
             # For now, we pass it as is and let subprocess handle it, but logging a warning.
 
-    execution_result = _command_execution_logic.execute_command(command_list, working_directory)
-    print(f"--- Debug (Tool Call): Execution result: {execution_result} ---")
+    execution_result = _command_execution_logic.execute_command(command_list, working_directory,
+                                                                timeout=timeout_seconds, idle_timeout=idle_timeout_seconds)
+    logger.debug("Execution result: %s", truncated(execution_result))
     return execution_result
@@ -2,6 +2,7 @@ import os
 import shutil
 from pathlib import Path
 from crewai.tools import tool
+from tools.tracing import trace_tool
 
 class FileOperationsLogic:
     """
@@ -135,6 +136,7 @@ class FileOperationsLogic:
 _file_ops_logic = FileOperationsLogic()
 
 @tool("Write File Tool")
+@trace_tool("Write File Tool")
 def write_file_tool(file_path: str, content: str, overwrite: bool = False) -> str:
     """
     Writes the given content to the specified file.
@@ -148,6 +150,7 @@ def write_file_tool(file_path: str, content: str, overwrite: bool = False) -> st
     return _file_ops_logic.write_file(file_path, content, overwrite)
 
 @tool("Read File Tool")
+@trace_tool("Read File Tool")
 def read_file_tool(file_path: str) -> str:
     """
     Reads the content of the specified file and returns it as a string.
@@ -158,6 +161,7 @@ def read_file_tool(file_path: str) -> str:
     return _file_ops_logic.read_file(file_path)
 
 @tool("Create Directory Tool")
+@trace_tool("Create Directory Tool")
 def create_directory_tool(directory_path: str, make_parents: bool = True, exist_ok: bool = True) -> str:
     """
     Creates the specified directory.
@@ -170,6 +174,7 @@ def create_directory_tool(directory_path: str, make_parents: bool = True, exist_
     return _file_ops_logic.create_directory(directory_path, make_parents, exist_ok)
 
 @tool("List Directory Contents Tool")
+@trace_tool("List Directory Contents Tool")
 def list_directory_contents_tool(directory_path: str, recursive: bool = False) -> str:
     """
     Lists the contents (files and subdirectories) of the specified directory.
@@ -181,6 +186,7 @@ def list_directory_contents_tool(directory_path: str, recursive: bool = False) -
     return _file_ops_logic.list_directory_contents(directory_path, recursive)
 
 @tool("Delete File Tool")
+@trace_tool("Delete File Tool")
 def delete_file_tool(file_path: str) -> str:
     """
     Deletes the specified file.
@@ -191,6 +197,7 @@ def delete_file_tool(file_path: str) -> str:
     return _file_ops_logic.delete_file(file_path)
 
 @tool("Delete Directory Tool")
+@trace_tool("Delete Directory Tool")
 def delete_directory_tool(directory_path: str, recursive: bool = False) -> str:
     """
     Deletes the specified directory. 
@@ -204,6 +211,7 @@ def delete_directory_tool(directory_path: str, recursive: bool = False) -> str:
     return _file_ops_logic.delete_directory(directory_path, recursive)
 
 @tool("Move/Rename Path Tool")
+@trace_tool("Move/Rename Path Tool")
 def move_path_tool(source_path: str, destination_path: str) -> str:
     """
     Moves or renames a file or directory.
@@ -217,6 +225,7 @@ def move_path_tool(source_path: str, destination_path: str) -> str:
     return _file_ops_logic.move_path(source_path, destination_path)
 
 @tool("Copy Path Tool")
+@trace_tool("Copy Path Tool")
 def copy_path_tool(source_path: str, destination_path: str) -> str:
     """
     Copies a file or a directory (recursively).
@@ -0,0 +1,298 @@
+import os
+import re
+import codecs
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Type, Union
+
+from tools.lazy_imports import lazy_import
+
+# Parser werden erst beim ersten Extrahieren geladen
+bs4 = lazy_import("bs4")
+# Optionale, schnellere Parser. Fehlen sie, bleibt der BeautifulSoup-Extractor verfügbar.
+lxml_etree = lazy_import("lxml.etree", optional=True)
+selectolax_parser = lazy_import("selectolax.parser", optional=True)
+
+# Tags, deren Inhalt nie in den extrahierten Text gelangt
+SKIPPED_TAGS = ("script", "style", "nav", "footer", "aside", "header")
+DEFAULT_MAX_CHARS = 15000
+_FEED_SLICE_CHARS = 64 * 1024
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([a-zA-Z0-9_\-]+)""", re.IGNORECASE)
+_CONTENT_TYPE_CHARSET_RE = re.compile(r"charset=([^\s;]+)", re.IGNORECASE)
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Returns the charset parameter of a Content-Type header, if any."""
+    if not content_type:
+        return None
+    match = _CONTENT_TYPE_CHARSET_RE.search(content_type)
+    return match.group(1).strip("\"'") if match else None
+
+
+def sniff_encoding(head: bytes, declared_encoding: Optional[str] = None) -> str:
+    """
+    Picks the encoding for decoding an HTML body: the declared (HTTP header) charset first,
+    then a <meta charset> in the first bytes, then UTF-8.
+    """
+    candidates = [declared_encoding]
+    match = _META_CHARSET_RE.search(head[:4096])
+    if match:
+        candidates.append(match.group(1).decode("ascii", "ignore"))
+    for candidate in candidates:
+        if not candidate:
+            continue
+        try:
+            codecs.lookup(candidate)
+            return candidate
+        except LookupError:
+            continue
+    return "utf-8"
+
+
+def _extraction_result(text: str, truncated: bool, has_body: bool) -> Dict[str, Any]:
+    return {"text": text, "truncated": truncated, "has_body": has_body}
+
+
+def _truncate(clean_text: str, max_chars: int) -> Dict[str, Any]:
+    if len(clean_text) > max_chars:
+        return _extraction_result(clean_text[:max_chars], True, True)
+    return _extraction_result(clean_text, False, True)
+
+
+class ExtractionSession(ABC):
+    """
+    Incremental extraction of one document: feed() decoded HTML chunks, then close().
+    `done` becomes True once the character budget is reached; further input is ignored,
+    so callers can stop reading the document early.
+    """
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.done = False
+
+    @abstractmethod
+    def feed(self, html_chunk: str) -> None:
+        """Parses the next decoded chunk of the document."""
+
+    @abstractmethod
+    def close(self) -> Dict[str, Any]:
+        """Returns a dictionary with 'text', 'truncated' (bool) and 'has_body' (bool)."""
+
+
+class HTMLTextExtractor(ABC):
+    """Base class of the extractor backends."""
+    name: str = ""
+
+    @abstractmethod
+    def new_session(self, max_chars: int = DEFAULT_MAX_CHARS) -> ExtractionSession:
+        """Starts the incremental extraction of one document."""
+
+    def extract(self, html: Union[bytes, str], max_chars: int = DEFAULT_MAX_CHARS,
+                encoding: Optional[str] = None) -> Dict[str, Any]:
+        """Extracts the visible body text of a complete document (see ExtractionSession.close)."""
+        if isinstance(html, bytes):
+            html = html.decode(sniff_encoding(html, encoding), errors="replace")
+        session = self.new_session(max_chars)
+        for start in range(0, len(html), _FEED_SLICE_CHARS):
+            session.feed(html[start:start + _FEED_SLICE_CHARS])
+            if session.done:
+                break
+        return session.close()
+
+
+# --- BeautifulSoup (bisheriges Verhalten) ---
+
+class _BufferingSession(ExtractionSession):
+    """Collects all chunks and extracts on close(); used by the non-streaming backends."""
+    def __init__(self, max_chars: int, extract_fn):
+        super().__init__(max_chars)
+        self._chunks: List[str] = []
+        self._extract_fn = extract_fn
+
+    def feed(self, html_chunk: str) -> None:
+        self._chunks.append(html_chunk)
+
+    def close(self) -> Dict[str, Any]:
+        return self._extract_fn("".join(self._chunks), self.max_chars)
+
+
+class BeautifulSoupExtractor(HTMLTextExtractor):
+    """The original extractor: html.parser tree, decompose() of skipped tags, get_text()."""
+    name = "bs4"
+
+    def _extract_markup(self, markup: Union[bytes, str], max_chars: int, encoding: Optional[str] = None) -> Dict[str, Any]:
+        if isinstance(markup, bytes):
+            soup = bs4.BeautifulSoup(markup, 'html.parser', from_encoding=encoding)
+        else:
+            soup = bs4.BeautifulSoup(markup, 'html.parser')
+
+        for script_or_style in soup(list(SKIPPED_TAGS)):
+            if script_or_style:
+                script_or_style.decompose()
+
+        body = soup.find('body')
+        if not body:
+            return _extraction_result("", False, False)
+        text = body.get_text(separator='\n', strip=True)
+        text_lines = [line for line in text.splitlines() if line.strip()]
+        return _truncate("\n".join(text_lines), max_chars)
+
+    def new_session(self, max_chars: int = DEFAULT_MAX_CHARS) -> ExtractionSession:
+        return _BufferingSession(max_chars, self._extract_markup)
+
+    def extract(self, html: Union[bytes, str], max_chars: int = DEFAULT_MAX_CHARS,
+                encoding: Optional[str] = None) -> Dict[str, Any]:
+        # Bytes direkt übergeben, damit BeautifulSoup die Kodierung wie bisher selbst erkennt
+        return self._extract_markup(html, max_chars, encoding)
+
+
+# --- lxml (Streaming über ein Parser-Target, ohne Baum) ---
+
+class _LxmlTextTarget:
+    """
+    lxml parser target that collects text nodes inside <body> in document order,
+    skipping SKIPPED_TAGS, and stops collecting once the budget is reached.
+    """
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.lines: List[str] = []
+        self.char_count = 0
+        self.in_body = False
+        self.has_body = False
+        self.skip_depth = 0
+        self.full = False
+        self._pending: List[str] = []
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending = []
+        if self.full or not self.in_body or self.skip_depth:
+            return
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            self.lines.append(line)
+            self.char_count += len(line) + 1
+            if self.char_count > self.max_chars:
+                self.full = True
+                return
+
+    def start(self, tag, attrib):
+        self._flush()
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag == "body":
+            self.in_body = True
+            self.has_body = True
+        elif tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def end(self, tag):
+        self._flush()
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag == "body":
+            self.in_body = False
+        elif tag in SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def data(self, data):
+        if not self.full:
+            self._pending.append(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        self._flush()
+        return None
+
+
+class _LxmlStreamingSession(ExtractionSession):
+    def __init__(self, max_chars: int):
+        super().__init__(max_chars)
+        self._target = _LxmlTextTarget(max_chars)
+        self._parser = lxml_etree.HTMLParser(target=self._target, recover=True, no_network=True)
+
+    def feed(self, html_chunk: str) -> None:
+        if self.done or not html_chunk:
+            return
+        self._parser.feed(html_chunk)
+        if self._target.full:
+            self.done = True
+
+    def close(self) -> Dict[str, Any]:
+        try:
+            self._parser.close()
+        except lxml_etree.XMLSyntaxError:
+            # Leere oder abgebrochene Dokumente: bisher gesammelter Text bleibt gültig
+            self._target.close()
+        clean_text = "\n".join(self._target.lines)
+        if not self._target.has_body:
+            return _extraction_result("", False, False)
+        result = _truncate(clean_text, self.max_chars)
+        result["truncated"] = result["truncated"] or self._target.full
+        return result
+
+
+class LxmlStreamingExtractor(HTMLTextExtractor):
+    """Streams the document through lxml's parser target API and stops at the char budget."""
+    name = "lxml"
+
+    def new_session(self, max_chars: int = DEFAULT_MAX_CHARS) -> ExtractionSession:
+        if lxml_etree is None:
+            raise ImportError("The 'lxml' extractor backend requires lxml (pip install lxml).")
+        return _LxmlStreamingSession(max_chars)
+
+
+# --- selectolax (sehr schneller C-Parser, nicht inkrementell) ---
+
+class SelectolaxExtractor(HTMLTextExtractor):
+    """Parses the whole document with selectolax/lexbor and strips skipped tags in C."""
+    name = "selectolax"
+
+    def _extract_markup(self, markup: str, max_chars: int) -> Dict[str, Any]:
+        tree = selectolax_parser.HTMLParser(markup)
+        tree.strip_tags(list(SKIPPED_TAGS))
+        if tree.body is None:
+            return _extraction_result("", False, False)
+        text = tree.body.text(separator='\n', strip=True)
+        text_lines = [line.strip() for line in text.splitlines() if line.strip()]
+        return _truncate("\n".join(text_lines), max_chars)
+
+    def new_session(self, max_chars: int = DEFAULT_MAX_CHARS) -> ExtractionSession:
+        if selectolax_parser is None:
+            raise ImportError("The 'selectolax' extractor backend requires selectolax (pip install selectolax).")
+        return _BufferingSession(max_chars, self._extract_markup)
+
+
+EXTRACTOR_BACKENDS: Dict[str, Type[HTMLTextExtractor]] = {
+    BeautifulSoupExtractor.name: BeautifulSoupExtractor,
+    LxmlStreamingExtractor.name: LxmlStreamingExtractor,
+    SelectolaxExtractor.name: SelectolaxExtractor,
+}
+
+
+def available_extractor_backends() -> List[str]:
+    """Names of the backends whose parser library is installed."""
+    available = [BeautifulSoupExtractor.name]
+    if lxml_etree is not None:
+        available.append(LxmlStreamingExtractor.name)
+    if selectolax_parser is not None:
+        available.append(SelectolaxExtractor.name)
+    return available
+
+
+def get_extractor(name: Optional[str] = None) -> HTMLTextExtractor:
+    """
+    Returns an extractor by backend name ('bs4', 'lxml', 'selectolax').
+    Without a name, HTML_EXTRACTOR_BACKEND is used, defaulting to 'lxml' when installed, else 'bs4'.
+    """
+    backend = name or os.getenv("HTML_EXTRACTOR_BACKEND")
+    if not backend:
+        backend = LxmlStreamingExtractor.name if lxml_etree is not None else BeautifulSoupExtractor.name
+    backend = backend.strip().lower()
+    if backend not in EXTRACTOR_BACKENDS:
+        raise ValueError(f"Unknown HTML extractor backend '{backend}'. Available: {list(EXTRACTOR_BACKENDS)}")
+    if backend not in available_extractor_backends():
+        raise ImportError(f"HTML extractor backend '{backend}' is not installed.")
+    return EXTRACTOR_BACKENDS[backend]()
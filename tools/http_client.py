@@ -0,0 +1,429 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.exceptions import DecodeError, MaxRetryError, ProtocolError, ReadTimeoutError, ResponseError
+from urllib3.util.retry import Retry
+from tools.env_config import int_from_env
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9,de;q=0.8',
+}
+
+# Standardablage des HTTP-Caches im Projekt-Root (per Umgebungsvariable überschreibbar)
+_DEFAULT_HTTP_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "http")
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+# Deadline (time.monotonic) des laufenden Requests pro Thread, gelesen von DeadlineRetry
+_request_deadline = threading.local()
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised when a request with a wall-clock deadline (see CachedHTTPClient.open) runs past it."""
+
+
+@contextmanager
+def request_deadline(deadline: Optional[float]):
+    """Applies a time.monotonic() deadline to the retries of requests issued by this thread."""
+    previous = getattr(_request_deadline, "value", None)
+    _request_deadline.value = deadline
+    try:
+        yield
+    finally:
+        _request_deadline.value = previous
+
+
+class DeadlineRetry(Retry):
+    """
+    Retry that treats the retries as exhausted when the backoff or Retry-After wait before
+    the next attempt would end past the deadline set with request_deadline().
+    """
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        new_retry = super().increment(method=method, url=url, response=response, error=error,
+                                      _pool=_pool, _stacktrace=_stacktrace)
+        deadline = getattr(_request_deadline, "value", None)
+        if deadline is None:
+            return new_retry
+        wait = None
+        if response is not None and self.respect_retry_after_header:
+            wait = new_retry.get_retry_after(response)
+        if wait is None:
+            wait = new_retry.get_backoff_time()
+        if time.monotonic() + wait >= deadline:
+            reason = error or ResponseError(
+                ResponseError.SPECIFIC_ERROR.format(status_code=response.status) if response is not None
+                else ResponseError.GENERIC_ERROR)
+            raise MaxRetryError(_pool, url, reason) from reason
+        return new_retry
+
+
+def create_http_session(pool_maxsize: int = 20, retries: int = 3, backoff_factor: float = 0.5) -> requests.Session:
+    """
+    Creates a requests.Session with a keep-alive connection pool and retry/backoff
+    for transient errors (connection errors, 429 and 5xx responses on GET/HEAD).
+    """
+    retry = DeadlineRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False  # Letzte Antwort zurückgeben, raise_for_status() übernimmt der Aufrufer
+    )
+    adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Returns the process-wide shared session (created on first use)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_http_session(
+                pool_maxsize=int_from_env("HTTP_POOL_MAXSIZE", 20),
+                retries=int_from_env("HTTP_MAX_RETRIES", 3)
+            )
+        return _session
+
+
+class FetchResult:
+    """Minimal response object returned by CachedHTTPClient (body already read)."""
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes,
+                 encoding: Optional[str], cache_status: str):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.encoding = encoding
+        self.cache_status = cache_status  # 'hit', 'revalidated', 'miss' oder 'bypass'
+
+
+class ContentRejectedError(requests.exceptions.RequestException):
+    """Raised when a response is not of an accepted (text) content type."""
+    def __init__(self, message: str, content_type: Optional[str] = None):
+        super().__init__(message)
+        self.content_type = content_type
+
+
+# Magic Bytes gängiger Binärformate (PDF, Bilder, Archive, Audio/Video)
+_BINARY_SIGNATURES = (b"%PDF", b"\x89PNG", b"GIF8", b"\xff\xd8\xff", b"PK\x03\x04", b"\x1f\x8b",
+                      b"ID3", b"OggS", b"RIFF", b"\x1aE\xdf\xa3", b"fLaC")
+
+
+def looks_like_text(head: bytes) -> bool:
+    """Heuristic for responses without a usable Content-Type: rejects known binary signatures and NUL bytes."""
+    if not head:
+        return True
+    if head.startswith(_BINARY_SIGNATURES) or head[4:8] == b"ftyp":
+        return False
+    return b"\x00" not in head[:1024]
+
+
+def _check_content_type(content_type: Optional[str], allowed_content_types: Optional[Tuple[str, ...]]) -> None:
+    if not allowed_content_types or not content_type:
+        return
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    # application/octet-stream sagt nichts aus -> wie fehlender Content-Type per Sniffing prüfen
+    if media_type in ("", "application/octet-stream"):
+        return
+    if media_type not in allowed_content_types:
+        raise ContentRejectedError(f"Content type '{media_type}' is not accepted.", media_type)
+
+
+class StreamedResponse:
+    """
+    Response whose body is read lazily in chunks, capped at `max_bytes`.
+    Use as a context manager so the connection is released even when reading stops early.
+    The body is handed to `on_complete` (the HTTP cache) only if it was read completely.
+    With a `deadline` (time.monotonic), iter_content() raises DeadlineExceeded once it has passed.
+    """
+    def __init__(self, url: str, status_code: int, headers, encoding: Optional[str], cache_status: str,
+                 response: Optional[requests.Response] = None, content: Optional[bytes] = None,
+                 max_bytes: Optional[int] = None, allowed_content_types: Optional[Tuple[str, ...]] = None,
+                 on_complete: Optional[Callable[[bytes], None]] = None, deadline: Optional[float] = None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.encoding = encoding
+        self.cache_status = cache_status
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.truncated = False  # True, wenn max_bytes erreicht wurde
+        self.complete = False   # True, wenn der Body vollständig gelesen wurde
+        self._response = response
+        self._content = content
+        self._allowed_content_types = allowed_content_types
+        self._on_complete = on_complete
+        self._deadline = deadline
+
+    @classmethod
+    def from_cache(cls, url: str, cached: Dict[str, Any], cache_status: str, max_bytes: Optional[int],
+                   allowed_content_types: Optional[Tuple[str, ...]]) -> "StreamedResponse":
+        _check_content_type(cached.get("content_type"), allowed_content_types)
+        return cls(url, 200, {"Content-Type": cached.get("content_type") or ""}, cached.get("encoding"), cache_status,
+                   content=cached["content"], max_bytes=max_bytes, allowed_content_types=allowed_content_types)
+
+    def _raw_chunks(self, chunk_size: int) -> Iterator[bytes]:
+        if self._response is not None:
+            if self._deadline is not None and hasattr(self._response.raw, "read1"):
+                return self._partial_chunks(chunk_size)
+            return self._response.iter_content(chunk_size=chunk_size)
+        content = self._content or b""
+        return (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+
+    def _partial_chunks(self, chunk_size: int) -> Iterator[bytes]:
+        # read1() liefert, was gerade ankommt; iter_content() würde bei einem tröpfelnden Body
+        # bis zur vollen chunk_size blockieren und die Deadline erst danach prüfen
+        raw = self._response.raw
+        try:
+            while True:
+                chunk = raw.read1(chunk_size, decode_content=True)
+                if not chunk:
+                    return
+                yield chunk
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except DecodeError as e:
+            raise requests.exceptions.ContentDecodingError(e)
+
+    def iter_content(self, chunk_size: int = 16384) -> Iterator[bytes]:
+        body = [] if self._on_complete else None
+        first_chunk = True
+        for chunk in self._raw_chunks(chunk_size):
+            if not chunk:
+                continue
+            if self._deadline is not None and time.monotonic() > self._deadline:
+                self.close()
+                raise DeadlineExceeded(f"Deadline exceeded after reading {self.bytes_read} bytes.")
+            if first_chunk:
+                first_chunk = False
+                if self._allowed_content_types and not looks_like_text(chunk):
+                    raise ContentRejectedError("Response body looks like binary data.")
+            if self.max_bytes is not None and self.bytes_read + len(chunk) > self.max_bytes:
+                chunk = chunk[:self.max_bytes - self.bytes_read]
+                self.truncated = True
+            self.bytes_read += len(chunk)
+            if body is not None:
+                body.append(chunk)
+            if chunk:
+                yield chunk
+            if self.truncated:
+                self.close()
+                return
+        self.complete = True
+        if self._on_complete and body is not None:
+            self._on_complete(b"".join(body))
+        self.close()
+
+    @property
+    def cacheable(self) -> bool:
+        """True if a completely read body will be stored in the HTTP cache."""
+        return self._on_complete is not None
+
+    def close(self) -> None:
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+
+    def __enter__(self) -> "StreamedResponse":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class HTTPCache:
+    """
+    On-disk cache for GET responses that carry validators (ETag / Last-Modified).
+    Each URL is stored as <sha256>.json (metadata) plus <sha256>.body (raw bytes).
+    """
+    def __init__(self, cache_dir: str = _DEFAULT_HTTP_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str):
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest + ".json"), os.path.join(self.cache_dir, digest + ".body")
+
+    def load(self, url: str) -> Optional[Dict[str, Any]]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                meta["content"] = f.read()
+            return meta
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Corrupt cache entry for %s: %s", url, e)
+            return None
+
+    def store(self, url: str, headers: Dict[str, str], content: bytes, encoding: Optional[str]) -> None:
+        meta_path, body_path = self._paths(url)
+        headers = CaseInsensitiveDict(headers)
+        cache_control = headers.get("Cache-Control", "")
+        max_age_match = _MAX_AGE_RE.search(cache_control)
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content_type": headers.get("Content-Type"),
+            "encoding": encoding,
+            "stored_at": time.time(),
+            "max_age": int(max_age_match.group(1)) if max_age_match and "no-cache" not in cache_control else 0,
+        }
+        with self._lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                # Erst Body, dann Metadaten schreiben: ein Eintrag ohne Metadaten wird nie gelesen
+                with open(body_path + ".tmp", "wb") as f:
+                    f.write(content)
+                os.replace(body_path + ".tmp", body_path)
+                with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+                os.replace(meta_path + ".tmp", meta_path)
+            except OSError as e:
+                logger.warning("Could not store cache entry for %s: %s", url, e)
+
+    def touch(self, url: str, meta: Dict[str, Any]) -> None:
+        """Marks a revalidated entry as fresh again."""
+        meta_path, _ = self._paths(url)
+        updated = {k: v for k, v in meta.items() if k != "content"}
+        updated["stored_at"] = time.time()
+        with self._lock:
+            try:
+                with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(updated, f)
+                os.replace(meta_path + ".tmp", meta_path)
+            except OSError as e:
+                logger.warning("Could not update cache entry for %s: %s", url, e)
+
+
+class CachedHTTPClient:
+    """
+    GET client on top of the shared session that revalidates cached pages with
+    If-None-Match / If-Modified-Since instead of downloading them again.
+    Entries still fresh according to Cache-Control max-age are served without a request.
+    """
+    def __init__(self, session: Optional[requests.Session] = None, cache: Optional[HTTPCache] = None):
+        self._session = session
+        self.cache = cache
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hit": 0, "revalidated": 0, "miss": 0, "bypass": 0}
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session if self._session is not None else get_http_session()
+
+    def _count(self, cache_status: str) -> None:
+        with self._stats_lock:
+            self.stats[cache_status] += 1
+
+    def open(self, url: str, timeout: float = 20, headers: Optional[Dict[str, str]] = None,
+             max_bytes: Optional[int] = None,
+             allowed_content_types: Optional[Tuple[str, ...]] = None,
+             deadline: Optional[float] = None) -> "StreamedResponse":
+        """
+        Opens `url` for streaming. The body is only read while iterating StreamedResponse.iter_content().
+
+        Args:
+            max_bytes: Stop reading after this many body bytes (the response is then marked truncated).
+            allowed_content_types: Accepted media types (e.g. ('text/html',)). Responses with another
+                Content-Type are rejected before the body is read. Responses without a Content-Type
+                are sniffed on the first chunk instead.
+            deadline: Wall-clock limit (time.monotonic) for the whole fetch: retries and Retry-After waits
+                stop before it and reading the body raises DeadlineExceeded after it. `timeout` still
+                bounds each socket operation.
+
+        Raises requests exceptions (Timeout, HTTPError, ...) like requests.get + raise_for_status,
+        DeadlineExceeded (a Timeout) and ContentRejectedError for unwanted content.
+        """
+        request_headers = dict(headers or {})
+        cached = self.cache.load(url) if self.cache else None
+
+        if cached:
+            age = time.time() - cached.get("stored_at", 0)
+            if cached.get("max_age") and age < cached["max_age"]:
+                self._count("hit")
+                return StreamedResponse.from_cache(url, cached, "hit", max_bytes, allowed_content_types)
+            if cached.get("etag"):
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                request_headers["If-Modified-Since"] = cached["last_modified"]
+
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded("Deadline exceeded before the request was sent.")
+            timeout = min(timeout, remaining)
+        with request_deadline(deadline):
+            response = self.session.get(url, headers=request_headers, timeout=timeout, stream=True)
+
+        if response.status_code == 304 and cached:
+            response.close()
+            self.cache.touch(url, cached)
+            self._count("revalidated")
+            return StreamedResponse.from_cache(url, cached, "revalidated", max_bytes, allowed_content_types)
+
+        try:
+            response.raise_for_status()
+            _check_content_type(response.headers.get("Content-Type"), allowed_content_types)
+        except Exception:
+            response.close()
+            raise
+
+        has_validators = bool(response.headers.get("ETag") or response.headers.get("Last-Modified"))
+        store = None
+        if self.cache and has_validators and "no-store" not in response.headers.get("Cache-Control", ""):
+            cache = self.cache
+            store = lambda content: cache.store(url, response.headers, content, response.encoding)
+        cache_status = "miss" if self.cache else "bypass"
+        self._count(cache_status)
+        return StreamedResponse(response.url, response.status_code, response.headers, response.encoding, cache_status,
+                                response=response, max_bytes=max_bytes,
+                                allowed_content_types=allowed_content_types, on_complete=store, deadline=deadline)
+
+    def get(self, url: str, timeout: float = 20, headers: Optional[Dict[str, str]] = None,
+            max_bytes: Optional[int] = None) -> FetchResult:
+        """
+        Fetches `url` completely (up to `max_bytes`). Raises requests exceptions like requests.get + raise_for_status.
+        """
+        with self.open(url, timeout=timeout, headers=headers, max_bytes=max_bytes) as response:
+            content = b"".join(response.iter_content())
+            return FetchResult(response.url, response.status_code, response.headers, content,
+                               response.encoding, response.cache_status)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+
+def create_cached_http_client() -> CachedHTTPClient:
+    """Creates a client with the on-disk cache unless HTTP_CACHE_ENABLED=0 (dir via HTTP_CACHE_DIR)."""
+    if os.getenv("HTTP_CACHE_ENABLED", "1").strip().lower() in ("0", "false", "no", "off"):
+        return CachedHTTPClient(cache=None)
+    return CachedHTTPClient(cache=HTTPCache(os.getenv("HTTP_CACHE_DIR", _DEFAULT_HTTP_CACHE_DIR)))
@@ -0,0 +1,174 @@
+import os
+import time
+from io import BytesIO
+from typing import Any, Dict, List, Optional
+
+from tools.env_config import int_from_env
+from tools.lazy_imports import lazy_import
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+Image = lazy_import("PIL.Image", optional=True)
+ImageOps = lazy_import("PIL.ImageOps", optional=True)
+if Image is None or ImageOps is None:
+    logger.warning("Für die Bildvorverarbeitung wird 'Pillow' benötigt. Bitte installieren: pip install Pillow")
+    Image = None
+    ImageOps = None
+
+_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+# Erst ab diesem Seitenverhältnis wird gekachelt (z.B. Full-Page-Mockups); normale Screens werden nur verkleinert
+_TILE_MIN_ASPECT = 2.0
+
+
+class ImagePreprocessor:
+    """
+    Prepares images for the vision model upload:
+
+    - applies the EXIF orientation, then drops EXIF/ICC/text metadata,
+    - flattens transparency onto a white background and converts exotic modes (P, CMYK, I;16 ...) to RGB,
+    - resizes so that the longer edge is at most `max_edge` pixels,
+    - optionally cuts very tall or wide images (full-page mockups) into up to `max_tiles` tiles
+      along the long side, so text stays legible instead of being shrunk with the whole page,
+    - re-encodes every part as JPEG/WebP (or PNG) at `quality`.
+
+    Defaults come from VISION_MAX_EDGE (1536), VISION_IMAGE_FORMAT (JPEG), VISION_IMAGE_QUALITY (85),
+    VISION_TILE_LARGE_IMAGES (off) and VISION_MAX_TILES (4).
+    """
+    def __init__(self, max_edge: Optional[int] = None, image_format: Optional[str] = None, quality: Optional[int] = None,
+                 tile: Optional[bool] = None, max_tiles: Optional[int] = None):
+        self.max_edge = max_edge if max_edge is not None else int_from_env("VISION_MAX_EDGE", 1536)
+        self.image_format = (image_format or os.getenv("VISION_IMAGE_FORMAT", "JPEG")).upper()
+        self.quality = quality if quality is not None else int_from_env("VISION_IMAGE_QUALITY", 85)
+        self.tile = tile if tile is not None else os.getenv("VISION_TILE_LARGE_IMAGES", "false").lower() in ("1", "true", "yes")
+        self.max_tiles = max_tiles if max_tiles is not None else int_from_env("VISION_MAX_TILES", 4)
+        if self.image_format == "JPG":
+            self.image_format = "JPEG"
+        if self.image_format not in _MIME_TYPES:
+            raise ValueError(f"Unsupported image format '{self.image_format}'. Use one of {list(_MIME_TYPES)}.")
+        if self.max_edge <= 0 or not 1 <= self.quality <= 100 or self.max_tiles <= 0:
+            raise ValueError("max_edge and max_tiles must be positive, quality between 1 and 100.")
+
+    def params(self) -> Dict[str, Any]:
+        """Settings that change the uploaded bytes (part of the result cache key)."""
+        return {"max_edge": self.max_edge, "format": self.image_format, "quality": self.quality,
+                "tile": self.tile, "max_tiles": self.max_tiles}
+
+    def _normalize_mode(self, image: "Image.Image") -> "Image.Image":
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            rgba = image.convert("RGBA")
+            background = Image.new("RGB", rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        if image.mode == "L" and self.image_format != "WEBP":
+            return image
+        return image.convert("RGB") if image.mode != "RGB" else image
+
+    def _fit(self, image: "Image.Image", width: int, height: int) -> "Image.Image":
+        if (width, height) == image.size:
+            return image
+        return image.resize((max(1, width), max(1, height)), Image.LANCZOS)
+
+    def _split(self, image: "Image.Image") -> List["Image.Image"]:
+        """Resizes (and tiles, if enabled and the image is much longer than wide) to parts of at most max_edge."""
+        width, height = image.size
+        long_side, short_side = max(width, height), min(width, height)
+        tile_count = -(-long_side * min(short_side, self.max_edge) // short_side // self.max_edge)
+        if not self.tile or tile_count <= 1 or long_side < _TILE_MIN_ASPECT * short_side:
+            scale = min(1.0, self.max_edge / long_side)
+            return [self._fit(image, round(width * scale), round(height * scale))]
+        # Kurze Seite auf max_edge (höchstens), lange Seite in gleich große Kacheln; zu viele Kacheln -> weiter verkleinern
+        scale = min(1.0, self.max_edge / short_side, self.max_tiles * self.max_edge / long_side)
+        scaled = self._fit(image, round(width * scale), round(height * scale))
+        scaled_long = max(scaled.size)
+        tile_count = min(self.max_tiles, -(-scaled_long // self.max_edge))
+        step = -(-scaled_long // tile_count)
+        tiles = []
+        for start in range(0, scaled_long, step):
+            end = min(scaled_long, start + step)
+            box = (0, start, scaled.width, end) if height >= width else (start, 0, end, scaled.height)
+            tiles.append(scaled.crop(box))
+        return tiles
+
+    def _encode(self, image: "Image.Image") -> bytes:
+        buffer = BytesIO()
+        if self.image_format == "PNG":
+            image.save(buffer, format="PNG", optimize=True)
+        elif self.image_format == "WEBP":
+            image.save(buffer, format="WEBP", quality=self.quality, method=4)
+        else:
+            image.save(buffer, format="JPEG", quality=self.quality, optimize=True, progressive=True)
+        return buffer.getvalue()
+
+    def preprocess(self, image: "Image.Image", original_bytes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Runs the pipeline on a PIL image.
+
+        Args:
+            image (Image.Image): The image as loaded (any mode, any size).
+            original_bytes (Optional[int]): Size of the source file, for the report. Defaults to the raw pixel size.
+
+        Returns:
+            Dict[str, Any]: 'parts' (list of {'mime_type', 'data'} blobs for generate_content), 'original_size',
+            'sent_sizes', 'original_bytes', 'sent_bytes', 'tiles' and 'elapsed_ms'.
+
+        Raises:
+            RuntimeError: If Pillow is not installed.
+        """
+        if Image is None:
+            raise RuntimeError("Pillow library not available.")
+        start = time.perf_counter()
+        original_size = image.size
+        if original_bytes is None:
+            original_bytes = len(image.getbands()) * image.width * image.height
+        prepared = self._normalize_mode(ImageOps.exif_transpose(image))
+        if prepared is image:
+            prepared = image.copy()
+        # EXIF, ICC-Profil und Textblöcke gehen nicht mit hoch
+        prepared.info = {}
+        parts = []
+        sent_sizes = []
+        for part in self._split(prepared):
+            parts.append({"mime_type": _MIME_TYPES[self.image_format], "data": self._encode(part)})
+            sent_sizes.append(part.size)
+        report = {
+            "parts": parts,
+            "original_size": original_size,
+            "sent_sizes": sent_sizes,
+            "original_bytes": original_bytes,
+            "sent_bytes": sum(len(part["data"]) for part in parts),
+            "tiles": len(parts),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+        logger.debug("Preprocessed image %s -> %s (%s): %s -> %s bytes in %.1f ms", original_size, sent_sizes,
+                     self.image_format, report["original_bytes"], report["sent_bytes"], report["elapsed_ms"])
+        return report
+
+
+def format_preprocessing_report(report: Dict[str, Any]) -> str:
+    """Short one-line summary, e.g. 'image 2400x1600, 1843.2 KB -> 1536x1024 JPEG, 212.4 KB (1 part)'."""
+    width, height = report["original_size"]
+    sizes = ", ".join(f"{w}x{h}" for w, h in report["sent_sizes"])
+    mime = report["parts"][0]["mime_type"].split("/")[-1].upper() if report["parts"] else "-"
+    return (f"image {width}x{height}, {report['original_bytes'] / 1024:.1f} KB -> {sizes} {mime}, "
+            f"{report['sent_bytes'] / 1024:.1f} KB ({report['tiles']} part{'s' if report['tiles'] != 1 else ''})")
+
+
+_image_preprocessor: Optional[ImagePreprocessor] = None
+
+
+def get_image_preprocessor() -> Optional[ImagePreprocessor]:
+    """
+    Shared preprocessor configured from the environment, or None if VISION_PREPROCESS=false
+    (images are then sent as loaded, as before).
+    """
+    global _image_preprocessor
+    if os.getenv("VISION_PREPROCESS", "true").lower() in ("0", "false", "no"):
+        return None
+    if _image_preprocessor is None:
+        try:
+            _image_preprocessor = ImagePreprocessor()
+        except ValueError as e:
+            logger.warning("Invalid vision preprocessing settings (%s); using defaults.", e)
+            _image_preprocessor = ImagePreprocessor(max_edge=1536, image_format="JPEG", quality=85, max_tiles=4)
+    return _image_preprocessor
@@ -0,0 +1,57 @@
+import sys
+import importlib.util
+import threading
+from types import ModuleType
+from typing import Optional
+
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+_lock = threading.Lock()
+
+
+class _LazyModule(ModuleType):
+    """
+    Placeholder for a not yet imported module. The first access to a missing attribute imports
+    the real module with importlib.import_module and copies its namespace into the placeholder.
+
+    importlib.util.LazyLoader is not used on purpose: before CPython 3.12.3 it is not thread-safe,
+    and worker threads touching a module at the same time saw half-initialized modules
+    (AttributeError) or crashed. import_module() holds the per-module import lock, so
+    concurrent first accesses wait for one complete import.
+    """
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        with _lock:
+            self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str, optional: bool = False) -> Optional[ModuleType]:
+    """
+    Returns module `name` without executing it yet: the module is imported on the first attribute
+    access (see _LazyModule). Heavy packages (Playwright, BeautifulSoup, Pillow,
+    google-generativeai ...) are thereby only loaded when a tool actually uses them.
+
+    Only the module spec is looked up now, so a missing package is still noticed at import time:
+    with `optional` the result is None (like the try/except ImportError pattern), otherwise
+    ImportError is raised. Already imported modules are returned as they are.
+
+    Raises:
+        ImportError: If the module cannot be found and `optional` is False.
+    """
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            spec = None
+    if spec is None or spec.loader is None:
+        if optional:
+            return None
+        raise ImportError(f"No module named '{name}'")
+    logger.debug("Registered lazy import of '%s'.", name)
+    return _LazyModule(name)
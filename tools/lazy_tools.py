@@ -0,0 +1,53 @@
+import threading
+from typing import Any, Callable, Optional
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+class LazyTool(BaseTool):
+    """
+    Stand-in for a tool from a heavy package (e.g. crewai_tools): name, description and
+    args_schema are declared up front so the agent can be registered without importing the
+    package; `factory` builds the real tool on the first call and every call is forwarded to it.
+    """
+    factory: Callable[[], BaseTool] = Field(exclude=True)
+    _tool: Optional[BaseTool] = PrivateAttr(default=None)
+    _tool_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def get_tool(self) -> BaseTool:
+        if self._tool is None:
+            with self._tool_lock:
+                if self._tool is None:
+                    logger.debug("Loading lazy tool '%s'.", self.name)
+                    self._tool = self.factory()
+        return self._tool
+
+    def _run(self, *args: Any, **kwargs: Any) -> Any:
+        return self.get_tool()._run(*args, **kwargs)
+
+
+# --- crewai_tools: Schema wie im Paket, damit das LLM dieselben Argumente sieht ---
+
+class SerperDevToolInput(BaseModel):
+    search_query: str = Field(..., description="Mandatory search query you want to use to search the internet")
+
+
+def _create_serper_dev_tool() -> BaseTool:
+    from crewai_tools import SerperDevTool
+    return SerperDevTool()
+
+
+def lazy_serper_dev_tool() -> LazyTool:
+    """crewai_tools.SerperDevTool, imported on the first search."""
+    return LazyTool(
+        name="Search the internet with Serper",
+        description="A tool that can be used to search the internet with a search_query.",
+        args_schema=SerperDevToolInput,
+        factory=_create_serper_dev_tool,
+    )
+
@@ -0,0 +1,51 @@
+import os
+import threading
+from typing import Optional
+
+from dotenv import load_dotenv
+from crewai import LLM
+
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+load_dotenv()
+
+DEFAULT_LITELLM_MODEL_NAME = "gemini/gemini-1.5-flash"
+
+_default_llm: Optional[LLM] = None
+_default_llm_lock = threading.Lock()
+
+
+def get_default_llm() -> Optional[LLM]:
+    """
+    Returns the LLM shared by the agents and the summarization tools, built once from
+    GEMINI_API_KEY and LITELLM_MODEL_NAME (default 'gemini/gemini-1.5-flash').
+
+    Tools used to import `default_llm` from agents.py, which imported the tools back; this module
+    has no dependency on either side, so both can load in any order.
+
+    Returns:
+        Optional[LLM]: The LLM, or None if GEMINI_API_KEY is missing or the LLM cannot be created.
+    """
+    global _default_llm
+    if _default_llm is not None:
+        return _default_llm
+    with _default_llm_lock:
+        if _default_llm is not None:
+            return _default_llm
+        gemini_api_key = os.getenv("GEMINI_API_KEY")
+        if not gemini_api_key:
+            logger.error("GEMINI_API_KEY nicht in Umgebungsvariablen gefunden. Kann kein LLM erstellen.")
+            return None
+        lite_llm_model_name = os.getenv("LITELLM_MODEL_NAME")
+        if not lite_llm_model_name:
+            lite_llm_model_name = DEFAULT_LITELLM_MODEL_NAME
+            logger.warning("LITELLM_MODEL_NAME fehlt in Umgebungsvariablen. Verwende Standardwert '%s'.", lite_llm_model_name)
+        try:
+            _default_llm = LLM(model=lite_llm_model_name, api_key=gemini_api_key)
+            logger.debug("Default LLM initialized with model: %s", lite_llm_model_name)
+        except Exception as e:
+            logger.error("Error initializing the default LLM: %s", e)
+            return None
+        return _default_llm
@@ -0,0 +1,336 @@
+import os
+import copy
+import json
+import time
+import uuid
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import litellm
+except ImportError:
+    litellm = None
+
+try:
+    from litellm.integrations.custom_logger import CustomLogger
+except ImportError:
+    CustomLogger = object
+
+from tools.chunked_summarization import estimate_tokens
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Standardablage der Telemetrie im Projekt-Root (per Umgebungsvariable überschreibbar)
+_DEFAULT_TELEMETRY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                       ".cache", "telemetry", "llm_usage.jsonl")
+
+
+class LLMTelemetry:
+    """
+    Thread-safe collector of per-call LLM usage: source (agent or tool), model,
+    prompt/completion tokens, latency and estimated cost.
+    """
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self._records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, source: str, model: str, prompt_tokens: int, completion_tokens: int,
+               latency_seconds: float, token_source: str = "usage", error: Optional[str] = None,
+               ttft_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Stores one call. `token_source` is 'usage' (reported by the API) or 'estimate'
+        (counted locally because the API response carried no usage data).
+        `ttft_seconds` (time to first token) is only known for streamed calls.
+        """
+        entry = {
+            "run_id": self.run_id,
+            "timestamp": time.time(),
+            "source": source,
+            "model": model,
+            "prompt_tokens": int(prompt_tokens or 0),
+            "completion_tokens": int(completion_tokens or 0),
+            "total_tokens": int(prompt_tokens or 0) + int(completion_tokens or 0),
+            "latency_seconds": round(latency_seconds, 4),
+            "ttft_seconds": round(ttft_seconds, 4) if ttft_seconds is not None else None,
+            "cost_usd": estimate_cost(model, prompt_tokens, completion_tokens),
+            "token_source": token_source,
+            "error": error,
+        }
+        with self._lock:
+            self._records.append(entry)
+        return entry
+
+    def records(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._records)
+
+    def aggregates(self) -> List[Dict[str, Any]]:
+        """Totals per (source, model), most expensive (by tokens) first; 'ttft_seconds' is the mean over streamed calls."""
+        groups: Dict[tuple, Dict[str, Any]] = {}
+        for entry in self.records():
+            key = (entry["source"], entry["model"])
+            group = groups.setdefault(key, {
+                "run_id": self.run_id, "source": entry["source"], "model": entry["model"], "calls": 0, "errors": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0,
+                "latency_seconds": 0.0, "cost_usd": 0.0, "estimated_calls": 0,
+                "streamed_calls": 0, "ttft_seconds": 0.0,
+            })
+            group["calls"] += 1
+            group["errors"] += 1 if entry["error"] else 0
+            group["estimated_calls"] += 1 if entry["token_source"] == "estimate" else 0
+            for field in ("prompt_tokens", "completion_tokens", "total_tokens", "latency_seconds"):
+                group[field] += entry[field]
+            if entry["cost_usd"] is not None:
+                group["cost_usd"] += entry["cost_usd"]
+            if entry.get("ttft_seconds") is not None:
+                group["streamed_calls"] += 1
+                group["ttft_seconds"] += entry["ttft_seconds"]
+        result = sorted(groups.values(), key=lambda g: g["total_tokens"], reverse=True)
+        for group in result:
+            group["latency_seconds"] = round(group["latency_seconds"], 3)
+            group["cost_usd"] = round(group["cost_usd"], 6)
+            # Mittlere Zeit bis zum ersten Token der gestreamten Aufrufe
+            group["ttft_seconds"] = round(group["ttft_seconds"] / group["streamed_calls"], 3) if group["streamed_calls"] else None
+        return result
+
+    def export_jsonl(self, path: Optional[str] = None) -> str:
+        """
+        Appends all call records ("type": "call") and the aggregates ("type": "aggregate")
+        of this run to a JSONL file. Returns the path.
+        """
+        path = path or os.getenv("LLM_TELEMETRY_PATH", _DEFAULT_TELEMETRY_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for entry in self.records():
+                f.write(json.dumps({"type": "call", **entry}, ensure_ascii=False) + "\n")
+            for group in self.aggregates():
+                f.write(json.dumps({"type": "aggregate", **group}, ensure_ascii=False) + "\n")
+        return path
+
+    def format_summary_table(self) -> str:
+        aggregates = self.aggregates()
+        if not aggregates:
+            return "No LLM calls recorded."
+        header = (f"{'source':<32} | {'model':<28} | {'calls':>5} | {'prompt tok':>10} | {'compl. tok':>10} | "
+                  f"{'latency s':>9} | {'cost USD':>9}")
+        lines = [header, "-" * len(header)]
+        totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "latency_seconds": 0.0, "cost_usd": 0.0}
+        for group in aggregates:
+            estimated = "*" if group["estimated_calls"] else " "
+            lines.append(f"{group['source'][:32]:<32} | {group['model'][:28]:<28} | {group['calls']:>5} | "
+                         f"{group['prompt_tokens']:>9}{estimated} | {group['completion_tokens']:>10} | "
+                         f"{group['latency_seconds']:>9.2f} | {group['cost_usd']:>9.4f}")
+            for field in totals:
+                totals[field] += group[field]
+        lines.append("-" * len(header))
+        lines.append(f"{'TOTAL':<32} | {'':<28} | {totals['calls']:>5} | {totals['prompt_tokens']:>10} | "
+                     f"{totals['completion_tokens']:>10} | {totals['latency_seconds']:>9.2f} | {totals['cost_usd']:>9.4f}")
+        if any(group["estimated_calls"] for group in aggregates):
+            lines.append("* contains calls without API usage data (tokens estimated locally)")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._records = []
+        self.run_id = uuid.uuid4().hex[:12]
+
+
+_telemetry = LLMTelemetry()
+
+
+def get_llm_telemetry() -> LLMTelemetry:
+    """Returns the process-wide telemetry collector."""
+    return _telemetry
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Cost in USD from LiteLLM's price table, or None if the model is unknown there."""
+    if litellm is None or not model:
+        return None
+    candidates = [model] if "/" in model else [model, f"gemini/{model}"]
+    for candidate in candidates:
+        try:
+            prompt_cost, completion_cost = litellm.cost_per_token(
+                model=candidate, prompt_tokens=int(prompt_tokens or 0), completion_tokens=int(completion_tokens or 0))
+            return round(prompt_cost + completion_cost, 8)
+        except Exception:
+            continue
+    return None
+
+
+def _count_prompt_tokens(model: str, messages: Any) -> int:
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    if litellm is not None:
+        try:
+            return litellm.token_counter(model=model, messages=messages)
+        except Exception:
+            pass
+    return sum(estimate_tokens(str(m.get("content", ""))) for m in messages if isinstance(m, dict))
+
+
+class _UsageProbe(CustomLogger):
+    """
+    Callback handed to LLM.call: CrewAI passes the response usage to every callback
+    with a log_success_event method. Only CrewAI's {"usage": ...} dict is used; the
+    later call LiteLLM makes with the full response object is ignored.
+    """
+    def __init__(self):
+        self.usage = None
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        if self.usage is None and isinstance(response_obj, dict) and response_obj.get("usage"):
+            self.usage = response_obj["usage"]
+
+
+def _usage_value(usage: Any, name: str) -> int:
+    if isinstance(usage, dict):
+        return int(usage.get(name) or 0)
+    return int(getattr(usage, name, 0) or 0)
+
+
+def instrument_llm(llm: Any, source: str, telemetry: Optional[LLMTelemetry] = None) -> Any:
+    """
+    Returns a shallow copy of a CrewAI LLM whose call() records tokens, latency and cost
+    under `source` (agent role or tool name). The original LLM stays uninstrumented,
+    so every agent/tool can get its own attributed copy of the shared default_llm.
+    """
+    if llm is None:
+        return None
+    telemetry = telemetry or get_llm_telemetry()
+    instrumented = copy.copy(llm)
+    original_call: Callable[..., Any] = llm.call
+    model = getattr(llm, "model", "unknown")
+
+    def call(messages, tools=None, callbacks=None, available_functions=None):
+        probe = _UsageProbe()
+        start = time.perf_counter()
+        error = None
+        result = None
+        try:
+            result = original_call(messages, tools=tools, callbacks=list(callbacks or []) + [probe],
+                                   available_functions=available_functions)
+            return result
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            latency = time.perf_counter() - start
+            if probe.usage is not None:
+                telemetry.record(source, model, _usage_value(probe.usage, "prompt_tokens"),
+                                 _usage_value(probe.usage, "completion_tokens"), latency, "usage", error)
+            else:
+                completion_tokens = estimate_tokens(result) if isinstance(result, str) else 0
+                telemetry.record(source, model, _count_prompt_tokens(model, messages), completion_tokens,
+                                 latency, "estimate", error)
+
+    instrumented.call = call
+    return instrumented
+
+
+class _RecordedStream:
+    """
+    Wraps a streamed generate_content() response: iterating it yields the chunks unchanged and records
+    the call (with time to first token) once the stream is exhausted or aborted. Other attributes
+    (candidates, usage_metadata, resolve() ...) are passed through to the response.
+    """
+    def __init__(self, response: Any, start: float, record: Callable[..., None]):
+        self._response = response
+        self._start = start
+        self._record = record
+
+    def __iter__(self):
+        first_chunk_at = None
+        error = None
+        try:
+            for chunk in self._response:
+                if first_chunk_at is None:
+                    first_chunk_at = time.perf_counter()
+                yield chunk
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            ttft = first_chunk_at - self._start if first_chunk_at is not None else None
+            self._record(self._response, self._start, error, ttft)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._response, name)
+
+
+def instrument_generative_model(model: Any, source: str, model_name: str,
+                                telemetry: Optional[LLMTelemetry] = None) -> Any:
+    """
+    Wraps generate_content() of a google.generativeai GenerativeModel (in place) and records
+    the usage_metadata of each response under `source`.
+    """
+    if model is None:
+        return None
+    telemetry = telemetry or get_llm_telemetry()
+    original_generate = model.generate_content
+
+    def record(response: Any, start: float, error: Optional[str], ttft_seconds: Optional[float] = None) -> None:
+        latency = time.perf_counter() - start
+        usage = getattr(response, "usage_metadata", None) if response is not None else None
+        if usage is not None:
+            telemetry.record(source, model_name, getattr(usage, "prompt_token_count", 0),
+                             getattr(usage, "candidates_token_count", 0), latency, "usage", error, ttft_seconds)
+        else:
+            telemetry.record(source, model_name, 0, 0, latency, "estimate", error, ttft_seconds)
+
+    def generate_content(*args, **kwargs):
+        start = time.perf_counter()
+        if kwargs.get("stream"):
+            # Gestreamte Antwort: erst nach dem letzten Chunk stehen Usage und Gesamtlatenz fest
+            return _RecordedStream(original_generate(*args, **kwargs), start, record)
+        response = None
+        error = None
+        try:
+            response = original_generate(*args, **kwargs)
+            return response
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            record(response, start, error)
+
+    model.generate_content = generate_content
+    return model
+
+
+def report_llm_usage(telemetry: Optional[LLMTelemetry] = None, path: Optional[str] = None) -> None:
+    """Prints the summary table and appends the run to the JSONL export."""
+    telemetry = telemetry or get_llm_telemetry()
+    print("\n--- LLM-Nutzung (Tokens/Latenz/Kosten) ---")
+    print(telemetry.format_summary_table())
+    if telemetry.records():
+        export_path = telemetry.export_jsonl(path)
+        logger.info("LLM-Telemetrie exportiert nach: %s", export_path)
+
+
+_kickoff_report_installed = False
+
+
+def install_kickoff_report() -> None:
+    """
+    Registers a handler on CrewAI's event bus that reports (and then resets) the
+    collected usage at the end of every Crew.kickoff().
+    """
+    global _kickoff_report_installed
+    if _kickoff_report_installed:
+        return
+    try:
+        from crewai.utilities.events import crewai_event_bus, CrewKickoffCompletedEvent, CrewKickoffFailedEvent
+    except ImportError:
+        logger.debug("CrewAI event bus not available, call report_llm_usage() manually.")
+        return
+
+    def on_kickoff_finished(source, event):
+        report_llm_usage()
+        get_llm_telemetry().reset()
+
+    crewai_event_bus.register_handler(CrewKickoffCompletedEvent, on_kickoff_finished)
+    crewai_event_bus.register_handler(CrewKickoffFailedEvent, on_kickoff_finished)
+    _kickoff_report_installed = True
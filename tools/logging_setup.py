@@ -0,0 +1,133 @@
+import os
+import sys
+import json
+import logging
+import logging.handlers
+from typing import Any, Optional
+
+# Wurzel-Logger aller Projektmodule; get_logger(__name__) hängt 'tools.web_tools', 'agents', 'main' ... darunter
+ROOT_LOGGER_NAME = "crewai_agents"
+DEFAULT_MAX_PAYLOAD_CHARS = 500
+
+_max_payload_chars = DEFAULT_MAX_PAYLOAD_CHARS
+_configured = False
+
+
+def get_logger(module_name: str) -> logging.Logger:
+    """
+    Returns the logger for a project module, e.g. get_logger(__name__).
+    Configures logging from the environment on first use (see configure_logging).
+    """
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{module_name}")
+
+
+class Truncated:
+    """
+    Lazy log argument: the value is converted and shortened only if the record is actually
+    emitted, so large payloads (command output, page text) cost nothing at disabled levels.
+    """
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: Optional[int] = None):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = self.value if isinstance(self.value, str) else str(self.value)
+        limit = self.limit if self.limit is not None else _max_payload_chars
+        if limit <= 0 or len(text) <= limit:
+            return text
+        return f"{text[:limit]}... [{len(text) - limit} more chars]"
+
+    __repr__ = __str__
+
+
+def truncated(value: Any, limit: Optional[int] = None) -> Truncated:
+    """Shortcut for Truncated(value, limit) in log calls: logger.debug("Output: %s", truncated(stdout))."""
+    return Truncated(value, limit)
+
+
+class _ConsoleFormatter(logging.Formatter):
+    """Keeps the familiar '--- Debug (module): message ---' console format."""
+    _LEVEL_NAMES = {"DEBUG": "Debug", "INFO": "Info", "WARNING": "WARNUNG", "ERROR": "TOOL_ERROR", "CRITICAL": "CRITICAL"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        level = self._LEVEL_NAMES.get(record.levelname, record.levelname)
+        module = record.name.rsplit(".", 1)[-1]
+        message = f"--- {level} ({module}): {record.getMessage()} ---"
+        if record.exc_info:
+            message += "\n" + self.formatException(record.exc_info)
+        return message
+
+
+class JSONLineFormatter(logging.Formatter):
+    """One JSON object per record (timestamp, level, logger, message, exception)."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _parse_level(value: str, default: int) -> int:
+    level = logging.getLevelName(value.strip().upper()) if value else default
+    return level if isinstance(level, int) else default
+
+
+def configure_logging(level: Optional[str] = None, force: bool = False) -> None:
+    """
+    Configures the project loggers from the environment (only once unless `force`):
+
+    LOG_LEVEL            Console/root level (DEBUG, INFO, WARNING, ...). Default INFO; WARNING is the quiet mode.
+    LOG_LEVELS           Per-module overrides, e.g. "tools.web_tools=DEBUG,tools.http_client=WARNING".
+    LOG_MAX_PAYLOAD_CHARS  Truncation of logged payloads (default 500, 0 = no truncation).
+    LOG_JSON_FILE        Optional path of a rotating JSON-lines log file
+                         (LOG_JSON_FILE_MAX_MB, default 10; LOG_JSON_FILE_BACKUPS, default 3).
+    """
+    global _configured, _max_payload_chars
+    if _configured and not force:
+        return
+
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.setLevel(_parse_level(level or os.getenv("LOG_LEVEL", "INFO"), logging.INFO))
+    root.propagate = False
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(_ConsoleFormatter())
+    root.addHandler(console)
+
+    json_file = os.getenv("LOG_JSON_FILE")
+    if json_file:
+        try:
+            max_bytes = int(float(os.getenv("LOG_JSON_FILE_MAX_MB", "10")) * 1024 * 1024)
+            backups = int(os.getenv("LOG_JSON_FILE_BACKUPS", "3"))
+        except ValueError:
+            max_bytes, backups = 10 * 1024 * 1024, 3
+        os.makedirs(os.path.dirname(os.path.abspath(json_file)), exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(json_file, maxBytes=max_bytes, backupCount=backups,
+                                                            encoding="utf-8")
+        file_handler.setFormatter(JSONLineFormatter())
+        root.addHandler(file_handler)
+
+    for override in os.getenv("LOG_LEVELS", "").split(","):
+        if "=" not in override:
+            continue
+        module_name, module_level = override.split("=", 1)
+        module_name = module_name.strip()
+        if not module_name.startswith(ROOT_LOGGER_NAME):
+            module_name = f"{ROOT_LOGGER_NAME}.{module_name}"
+        logging.getLogger(module_name).setLevel(_parse_level(module_level, logging.NOTSET))
+
+    try:
+        _max_payload_chars = int(os.getenv("LOG_MAX_PAYLOAD_CHARS", str(DEFAULT_MAX_PAYLOAD_CHARS)))
+    except ValueError:
+        _max_payload_chars = DEFAULT_MAX_PAYLOAD_CHARS
+    _configured = True
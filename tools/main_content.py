@@ -0,0 +1,202 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from tools.chunked_summarization import estimate_tokens
+from tools.html_extractors import DEFAULT_MAX_CHARS, SKIPPED_TAGS, ExtractionSession, bs4, lxml_etree
+
+# Readability-artige Hauptinhalt-Erkennung: Absätze werden nach Textmenge bewertet,
+# die Punkte an Eltern-/Großelternknoten weitergereicht und mit der Linkdichte gewichtet.
+# Der bestbewertete Container (plus passende Geschwister) ist der Hauptinhalt.
+
+_EXTRA_SKIPPED_TAGS = ("form", "iframe", "noscript", "svg", "button", "select", "input", "template")
+_UNLIKELY_RE = re.compile(
+    r"cookie|consent|gdpr|banner|related|share|social|sidebar|comment|promo|advert|sponsor|newsletter|"
+    r"subscribe|breadcrumb|menu|popup|modal|pagination|footer|masthead|widget|teaser|recommend",
+    re.IGNORECASE,
+)
+_POSITIVE_RE = re.compile(r"article|content|main|post|entry|story|text|body|blog", re.IGNORECASE)
+_NEGATIVE_RE = re.compile(r"comment|meta|footer|sidebar|share|related|promo|ad-|ads|tag|widget|author", re.IGNORECASE)
+_SCORED_TAGS = ("p", "pre", "td", "blockquote", "li", "h2", "h3", "dd")
+_BLOCK_TAGS = {"p", "div", "section", "article", "main", "ul", "ol", "table", "pre", "blockquote", "h1", "h2",
+               "h3", "h4", "h5", "h6", "figure", "dl", "header", "footer", "nav", "aside", "form"}
+_TAG_BASE_SCORES = {"article": 10, "main": 10, "div": 5, "section": 3, "pre": 3, "td": 3, "blockquote": 3,
+                    "ol": -3, "ul": -3, "dl": -3, "form": -3, "th": -5, "h1": -5, "h2": -5, "h3": -5}
+_MIN_PARAGRAPH_CHARS = 25
+_MIN_MAIN_CONTENT_CHARS = 200
+
+
+def _class_weight(element: "bs4.Tag") -> int:
+    weight = 0
+    for value in (" ".join(element.get("class") or []), element.get("id") or ""):
+        if not value:
+            continue
+        if _NEGATIVE_RE.search(value):
+            weight -= 25
+        if _POSITIVE_RE.search(value):
+            weight += 25
+    return weight
+
+
+def _text_of(element: "bs4.Tag") -> str:
+    return element.get_text(" ", strip=True)
+
+
+def _link_density(element: "bs4.Tag", text_length: int) -> float:
+    if not text_length:
+        return 0.0
+    link_length = sum(len(a.get_text(" ", strip=True)) for a in element.find_all("a"))
+    return min(1.0, link_length / text_length)
+
+
+def _lines_of(element: "bs4.Tag") -> List[str]:
+    return [line.strip() for line in element.get_text(separator="\n", strip=True).splitlines() if line.strip()]
+
+
+def _remove_boilerplate(body: "bs4.Tag") -> None:
+    for element in body.find_all(list(SKIPPED_TAGS) + list(_EXTRA_SKIPPED_TAGS)):
+        element.decompose()
+    unlikely = []
+    for element in body.find_all(True):
+        if element.name in ("article", "main", "body"):
+            continue
+        match_string = " ".join(element.get("class") or []) + " " + (element.get("id") or "") + " " + (element.get("role") or "")
+        if _UNLIKELY_RE.search(match_string) and not _POSITIVE_RE.search(match_string):
+            unlikely.append(element)
+    for element in unlikely:
+        # Knoten, die schon mit einem Vorfahren entfernt wurden, überspringen
+        if not element.decomposed:
+            element.decompose()
+
+
+def _score_candidates(body: "bs4.Tag") -> Dict[int, Dict[str, Any]]:
+    candidates: Dict[int, Dict[str, Any]] = {}
+
+    def candidate(element: "bs4.Tag") -> Dict[str, Any]:
+        entry = candidates.get(id(element))
+        if entry is None:
+            entry = {"element": element, "score": float(_TAG_BASE_SCORES.get(element.name, 0) + _class_weight(element))}
+            candidates[id(element)] = entry
+        return entry
+
+    paragraphs = list(body.find_all(_SCORED_TAGS))
+    # <div>s ohne Block-Kinder werden wie Absätze behandelt (viele Seiten nutzen keine <p>)
+    paragraphs += [div for div in body.find_all("div") if not any(
+        isinstance(child, bs4.Tag) and child.name in _BLOCK_TAGS for child in div.children)]
+
+    for paragraph in paragraphs:
+        text = _text_of(paragraph)
+        if len(text) < _MIN_PARAGRAPH_CHARS:
+            continue
+        parent = paragraph.parent
+        if not isinstance(parent, bs4.Tag):
+            continue
+        content_score = 1 + text.count(",") + min(len(text) // 100, 3)
+        candidate(parent)["score"] += content_score
+        grandparent = parent.parent
+        if isinstance(grandparent, bs4.Tag) and grandparent.name != "[document]":
+            candidate(grandparent)["score"] += content_score / 2
+
+    for entry in candidates.values():
+        text_length = len(_text_of(entry["element"]))
+        entry["score"] *= 1 - _link_density(entry["element"], text_length)
+    return candidates
+
+
+def _select_main_elements(candidates: Dict[int, Dict[str, Any]]) -> List["bs4.Tag"]:
+    if not candidates:
+        return []
+    top = max(candidates.values(), key=lambda entry: entry["score"])
+    top_element: "bs4.Tag" = top["element"]
+    parent = top_element.parent
+    if not isinstance(parent, bs4.Tag):
+        return [top_element]
+    threshold = max(10.0, top["score"] * 0.2)
+    selected = []
+    for sibling in parent.children:
+        if not isinstance(sibling, bs4.Tag):
+            continue
+        if sibling is top_element:
+            selected.append(sibling)
+            continue
+        entry = candidates.get(id(sibling))
+        if entry and entry["score"] >= threshold:
+            selected.append(sibling)
+        elif sibling.name == "p":
+            text = _text_of(sibling)
+            if len(text) > 80 and _link_density(sibling, len(text)) < 0.25:
+                selected.append(sibling)
+    return selected
+
+
+def _apply_token_budget(lines: List[str], max_tokens: Optional[int]) -> tuple[List[str], bool]:
+    if not max_tokens:
+        return lines, False
+    kept: List[str] = []
+    used = 0
+    for line in lines:
+        line_tokens = estimate_tokens(line) + 1
+        if used + line_tokens > max_tokens:
+            remaining_chars = (max_tokens - used) * 4
+            if remaining_chars > 40:
+                kept.append(line[:remaining_chars])
+            return kept, True
+        kept.append(line)
+        used += line_tokens
+    return kept, False
+
+
+def extract_main_content(html: str, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Extracts the main article text of an HTML document using content density
+    (text length, commas, link density, class/id hints) instead of a fixed tag list.
+
+    Args:
+        html (str): The decoded HTML document.
+        max_tokens (Optional[int]): Optional token budget (~4 characters per token) for the returned text.
+
+    Returns:
+        Dict[str, Any]: 'text', 'truncated', 'has_body', 'fallback' (True if no main content was found
+        and the full visible text is returned), 'page_chars' (visible text of the whole page),
+        'main_chars' and 'reduction' (share of the page text that was dropped, 0..1).
+    """
+    soup = bs4.BeautifulSoup(html, "lxml" if lxml_etree is not None else "html.parser")
+    body = soup.find("body")
+    if not body:
+        return {"text": "", "truncated": False, "has_body": False, "fallback": False,
+                "page_chars": 0, "main_chars": 0, "reduction": 0.0}
+
+    for element in body.find_all(list(SKIPPED_TAGS)):
+        element.decompose()
+    page_lines = _lines_of(body)
+    page_chars = len("\n".join(page_lines))
+
+    _remove_boilerplate(body)
+    main_elements = _select_main_elements(_score_candidates(body))
+    lines = [line for element in main_elements for line in _lines_of(element)]
+    fallback = len("\n".join(lines)) < _MIN_MAIN_CONTENT_CHARS
+    if fallback:
+        lines = page_lines
+
+    lines, truncated = _apply_token_budget(lines, max_tokens)
+    text = "\n".join(lines)
+    reduction = 1 - len(text) / page_chars if page_chars else 0.0
+    return {"text": text, "truncated": truncated, "has_body": True, "fallback": fallback,
+            "page_chars": page_chars, "main_chars": len(text), "reduction": max(0.0, reduction)}
+
+
+class MainContentSession(ExtractionSession):
+    """
+    ExtractionSession for the main-content mode. Scoring needs the whole document,
+    so chunks are buffered (bounded by the scraper's byte cap) and scored on close().
+    Without `max_tokens` the character budget is converted to tokens (~4 characters per token).
+    """
+    def __init__(self, max_chars: int = DEFAULT_MAX_CHARS, max_tokens: Optional[int] = None):
+        super().__init__(max_chars)
+        self.max_tokens = max_tokens or max(1, max_chars // 4)
+        self._chunks: List[str] = []
+
+    def feed(self, html_chunk: str) -> None:
+        self._chunks.append(html_chunk)
+
+    def close(self) -> Dict[str, Any]:
+        return extract_main_content("".join(self._chunks), self.max_tokens)
@@ -0,0 +1,196 @@
+import difflib
+from typing import Any, Dict, List, Optional
+
+from tools.chunked_summarization import estimate_tokens
+
+# Elemente im Snapshot bekommen ein dauerhaftes Attribut; 'ref=e12' in den Browser-Tools zielt genau darauf
+REF_ATTRIBUTE = "data-agent-ref"
+DEFAULT_SNAPSHOT_MAX_TOKENS = 1500
+_MAX_SNAPSHOT_NODES = 3000
+
+# Läuft in einem page.evaluate(): sammelt sichtbare Landmarks, Überschriften, Bedienelemente, Bilder und
+# (optional) Textblöcke in Dokumentreihenfolge. Generische Container (div, span, ul ...) werden übersprungen,
+# ihre Kinder rücken eine Ebene nach oben. Bereits vergebene Refs bleiben über Snapshots hinweg erhalten.
+SNAPSHOT_JS = """({rootSelector, includeText, refAttribute, maxNodes}) => {
+    const INPUT_ROLES = {checkbox: 'checkbox', radio: 'radio', submit: 'button', button: 'button', reset: 'button',
+                         image: 'button', range: 'slider', search: 'searchbox', number: 'spinbutton'};
+    const LANDMARKS = {nav: 'navigation', main: 'main', header: 'banner', footer: 'contentinfo',
+                       aside: 'complementary', form: 'form', dialog: 'dialog'};
+    const INTERACTIVE = new Set(['link', 'button', 'textbox', 'searchbox', 'checkbox', 'radio', 'combobox', 'listbox',
+                                 'slider', 'spinbutton', 'switch', 'tab', 'menuitem', 'option']);
+    // Rein strukturelle Rollen erzeugen keine eigene Zeile (wie generische Container)
+    const IGNORED_ROLES = new Set(['presentation', 'none', 'generic', 'group', 'list', 'listitem', 'row', 'rowgroup',
+                                   'cell', 'gridcell', 'paragraph', 'document', 'article', 'region', 'separator']);
+    const TEXT_TAGS = new Set(['P', 'LI', 'DD', 'DT', 'TD', 'TH', 'BLOCKQUOTE', 'PRE', 'FIGCAPTION']);
+    const INTERACTIVE_SELECTOR = 'a[href], button, input, select, textarea, [role=button], [role=link], [role=checkbox], ' +
+        '[role=tab], [role=menuitem], [role=switch], [contenteditable=""], [contenteditable="true"]';
+    const clip = (text, limit) => {
+        const normalized = (text || '').replace(/\\s+/g, ' ').trim();
+        return normalized.length > limit ? normalized.slice(0, limit) + '...' : normalized;
+    };
+    const isVisible = (el) => {
+        if (typeof el.checkVisibility === 'function') return el.checkVisibility({checkOpacity: true, checkVisibilityCSS: true});
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none' && el.getClientRects().length > 0;
+    };
+    const roleOf = (el) => {
+        const explicit = (el.getAttribute('role') || '').split(' ')[0];
+        if (explicit && !IGNORED_ROLES.has(explicit)) return explicit;
+        const tag = el.tagName.toLowerCase();
+        if (tag === 'a') return el.hasAttribute('href') ? 'link' : null;
+        if (tag === 'button' || tag === 'summary') return 'button';
+        if (tag === 'input') {
+            const type = (el.getAttribute('type') || 'text').toLowerCase();
+            return type === 'hidden' ? null : (INPUT_ROLES[type] || 'textbox');
+        }
+        if (tag === 'textarea') return 'textbox';
+        if (tag === 'select') return el.multiple ? 'listbox' : 'combobox';
+        if (tag === 'img') return el.getAttribute('alt') ? 'img' : null;
+        if (/^h[1-6]$/.test(tag)) return 'heading';
+        if (tag === 'table') return 'table';
+        if (el.isContentEditable && el.getAttribute('contenteditable') !== null) return 'textbox';
+        return LANDMARKS[tag] || null;
+    };
+    const nameOf = (el, role) => {
+        const label = el.getAttribute('aria-label');
+        if (label) return label;
+        const labelledBy = el.getAttribute('aria-labelledby');
+        if (labelledBy) {
+            const text = labelledBy.split(' ').map(id => document.getElementById(id)).filter(Boolean)
+                .map(node => node.innerText || node.textContent).join(' ');
+            if (text.trim()) return text;
+        }
+        if (el.labels && el.labels.length) return Array.from(el.labels).map(node => node.innerText).join(' ');
+        if (el.getAttribute('alt')) return el.getAttribute('alt');
+        if (['textbox', 'searchbox', 'combobox', 'listbox', 'spinbutton', 'slider'].includes(role)) {
+            return el.getAttribute('placeholder') || el.getAttribute('title') || el.getAttribute('name') || '';
+        }
+        if (['navigation', 'main', 'banner', 'contentinfo', 'complementary', 'form', 'table'].includes(role)) {
+            return el.getAttribute('title') || '';
+        }
+        return el.innerText || el.value || el.getAttribute('title') || '';
+    };
+    const directText = (el) => Array.from(el.childNodes)
+        .filter(node => node.nodeType === Node.TEXT_NODE).map(node => node.textContent).join(' ');
+    if (window.__agentRefSeq === undefined) window.__agentRefSeq = 0;
+    const refOf = (el) => {
+        let ref = el.getAttribute(refAttribute);
+        if (!ref) {
+            ref = 'e' + (++window.__agentRefSeq);
+            el.setAttribute(refAttribute, ref);
+        }
+        return ref;
+    };
+    const nodes = [];
+    let truncated = false;
+    const visit = (el, depth) => {
+        if (nodes.length >= maxNodes) { truncated = true; return; }
+        if (['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'SVG', 'IFRAME'].includes(el.tagName.toUpperCase())) return;
+        if (!isVisible(el)) return;
+        const role = roleOf(el);
+        let childDepth = depth;
+        if (role) {
+            const node = {depth, role, name: clip(nameOf(el, role), 80), ref: refOf(el)};
+            if (role === 'heading') node.level = Number(el.tagName[1]) || Number(el.getAttribute('aria-level')) || undefined;
+            if (role === 'link') node.href = clip(el.getAttribute('href'), 80);
+            if (role === 'table') node.size = el.rows ? el.rows.length + ' rows' : undefined;
+            if (['textbox', 'searchbox', 'spinbutton', 'combobox', 'slider'].includes(role) && el.value !== undefined) {
+                node.value = el.type === 'password' ? (el.value ? '***' : '') : clip(el.value, 40);
+            }
+            if (el.checked !== undefined && ['checkbox', 'radio', 'switch'].includes(role)) node.checked = el.checked;
+            if (el.disabled || el.getAttribute('aria-disabled') === 'true') node.disabled = true;
+            if (el.getAttribute('aria-expanded')) node.expanded = el.getAttribute('aria-expanded') === 'true';
+            if (el.required) node.required = true;
+            nodes.push(node);
+            if (INTERACTIVE.has(role) || role === 'heading' || role === 'img') return;
+            childDepth = depth + 1;
+        } else if (includeText) {
+            // Textblöcke ohne Bedienelemente als eine Zeile; sonst nur der eigene Text, Kinder folgen einzeln
+            const whole = TEXT_TAGS.has(el.tagName) && !el.querySelector(INTERACTIVE_SELECTOR);
+            const text = clip(whole ? el.innerText : directText(el), 160);
+            if (text.length > 1) nodes.push({depth, role: 'text', name: text});
+            if (whole) return;
+        }
+        for (const child of el.children) visit(child, childDepth);
+        if (el.shadowRoot) for (const child of el.shadowRoot.children) visit(child, childDepth);
+    };
+    const root = rootSelector ? document.querySelector(rootSelector) : document.body;
+    if (!root) return {error: 'Root selector matched no element: ' + rootSelector};
+    visit(root, 0);
+    return {url: location.href, title: document.title, nodes, truncated};
+}"""
+
+
+def resolve_ref_selector(selector: str) -> str:
+    """Translates 'ref=e12' (an element ref from the page snapshot) into its CSS selector; other selectors pass through."""
+    if selector and selector.startswith("ref="):
+        return f'[{REF_ATTRIBUTE}="{selector[4:].strip()}"]'
+    return selector
+
+
+def format_snapshot_line(node: Dict[str, Any]) -> str:
+    """One outline line, e.g. '  button "Sign in" [ref=e5] disabled' (two spaces of indent per level)."""
+    if node["role"] == "text":
+        return f"{'  ' * node['depth']}text: {node['name']}"
+    parts = [node["role"]]
+    if node.get("name"):
+        parts.append(f'"{node["name"]}"')
+    if node.get("ref"):
+        parts.append(f"[ref={node['ref']}]")
+    if node.get("level"):
+        parts.append(f"level={node['level']}")
+    if node.get("href"):
+        parts.append(f"-> {node['href']}")
+    if node.get("value") not in (None, ""):
+        parts.append(f'value="{node["value"]}"')
+    for flag in ("checked", "expanded"):
+        if flag in node:
+            parts.append(f"{flag}={'true' if node[flag] else 'false'}")
+    for flag in ("disabled", "required"):
+        if node.get(flag):
+            parts.append(flag)
+    if node.get("size"):
+        parts.append(f"({node['size']})")
+    return "  " * node["depth"] + " ".join(parts)
+
+
+def apply_token_budget(lines: List[str], max_tokens: int) -> tuple[List[str], int]:
+    """Keeps lines until the token budget is used up. Returns (kept lines, number of dropped lines)."""
+    kept: List[str] = []
+    used = 0
+    for index, line in enumerate(lines):
+        line_tokens = estimate_tokens(line) + 1
+        if used + line_tokens > max_tokens:
+            return kept, len(lines) - index
+        kept.append(line)
+        used += line_tokens
+    return kept, 0
+
+
+def diff_snapshot_lines(previous: List[str], current: List[str]) -> List[str]:
+    """Changed outline lines only: '+ line' for new or changed lines, '- line' for removed ones."""
+    changes: List[str] = []
+    matcher = difflib.SequenceMatcher(a=previous, b=current, autojunk=False)
+    for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        changes.extend(f"- {line.strip()}" for line in previous[a_start:a_end])
+        changes.extend(f"+ {line.strip()}" for line in current[b_start:b_end])
+    return changes
+
+
+async def take_snapshot(page: Any, root_selector: Optional[str] = None, include_text: bool = True) -> Dict[str, Any]:
+    """
+    Runs SNAPSHOT_JS on `page`. Returns 'url', 'title', 'lines' (full outline, not yet budgeted),
+    'node_count', 'truncated' (node cap reached) or 'error'.
+    """
+    raw = await page.evaluate(SNAPSHOT_JS, {
+        "rootSelector": resolve_ref_selector(root_selector) if root_selector else None,
+        "includeText": include_text,
+        "refAttribute": REF_ATTRIBUTE,
+        "maxNodes": _MAX_SNAPSHOT_NODES,
+    })
+    if raw.get("error"):
+        return {"error": raw["error"]}
+    lines = [format_snapshot_line(node) for node in raw["nodes"]]
+    return {"url": raw["url"], "title": raw["title"], "lines": lines, "node_count": len(lines), "truncated": raw["truncated"]}
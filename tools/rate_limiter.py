@@ -0,0 +1,75 @@
+import os
+import time
+import threading
+from typing import Dict, Optional
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting calls per minute.
+
+    `burst` tokens are available immediately; afterwards tokens refill at
+    `requests_per_minute / 60` per second. `acquire()` blocks until a token is free.
+    """
+    def __init__(self, requests_per_minute: float, burst: Optional[int] = None):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive.")
+        self.requests_per_minute = requests_per_minute
+        self.capacity = float(burst if burst is not None else max(1, int(requests_per_minute // 4)))
+        self._tokens = self.capacity
+        self._refill_per_second = requests_per_minute / 60.0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self.total_wait_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self._refill_per_second)
+        self._last_refill = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Takes one token. Returns False if no token became available within `timeout` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.total_wait_seconds += waited
+                    return True
+                sleep_for = (1 - self._tokens) / self._refill_per_second
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                sleep_for = min(sleep_for, remaining)
+            time.sleep(sleep_for)
+            waited += sleep_for
+
+
+# Gemeinsame Limiter pro Ziel (z.B. 'gemini'), damit alle Tools dasselbe Kontingent teilen
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str = "gemini") -> RateLimiter:
+    """
+    Returns the shared limiter for `name`.
+    The rate is read from <NAME>_REQUESTS_PER_MINUTE (default 15, the Gemini 1.5 Flash free-tier quota).
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            env_name = f"{name.upper()}_REQUESTS_PER_MINUTE"
+            try:
+                rpm = float(os.getenv(env_name, "15"))
+            except ValueError:
+                logger.warning("Invalid value for %s, using 15 requests/minute.", env_name)
+                rpm = 15.0
+            limiter = RateLimiter(rpm)
+            _limiters[name] = limiter
+        return limiter
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Standardablage des Caches im Projekt-Root (per Umgebungsvariable überschreibbar)
+_DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "tool_results.sqlite3")
+
+
+def make_cache_key(model: str, prompt: str, input_bytes: bytes = b"", params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Builds a content-addressed key from (model name, prompt, input bytes, generation params).
+    Params are serialized with sorted keys so that dict ordering does not change the key.
+    """
+    hasher = hashlib.sha256()
+    for part in (model or "", prompt or ""):
+        encoded = part.encode("utf-8")
+        # Längenpräfix verhindert Kollisionen durch verschobene Feldgrenzen
+        hasher.update(len(encoded).to_bytes(8, "big"))
+        hasher.update(encoded)
+    hasher.update(len(input_bytes).to_bytes(8, "big"))
+    hasher.update(input_bytes)
+    hasher.update(json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent on-disk cache for results of LLM-backed tools, stored in a single SQLite file.
+
+    Entries are evicted least-recently-used first once `max_entries` or `max_bytes` is exceeded.
+    Entries older than their TTL are treated as misses and removed on access.
+    """
+    def __init__(self,
+                 db_path: str = _DEFAULT_CACHE_PATH,
+                 max_entries: int = 5000,
+                 max_bytes: int = 200 * 1024 * 1024,
+                 default_ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl_seconds = default_ttl_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " namespace TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL,"
+                " expires_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached value for `key`, or None on a miss (or expired entry)."""
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+                now = time.time()
+                if row is None:
+                    self.stats["misses"] += 1
+                    return None
+                value, expires_at = row
+                if expires_at is not None and expires_at <= now:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    conn.commit()
+                    self.stats["expired"] += 1
+                    self.stats["misses"] += 1
+                    return None
+                conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+                conn.commit()
+                self.stats["hits"] += 1
+                return value
+            except sqlite3.Error as e:
+                # Ein defekter Cache darf das Tool nicht blockieren -> wie ein Miss behandeln
+                logger.warning("Error reading cache '%s': %s", self.db_path, e)
+                self.stats["misses"] += 1
+                return None
+
+    def set(self, key: str, value: str, namespace: str = "default", ttl_seconds: Optional[float] = None) -> None:
+        """Stores `value` under `key`. `ttl_seconds` overrides the default TTL (0 or None = default)."""
+        ttl = ttl_seconds if ttl_seconds else self.default_ttl_seconds
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, namespace, value, size, created_at, last_access, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, namespace, value, size, now, now, expires_at)
+                )
+                self.stats["writes"] += 1
+                self._evict(conn, now)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("Error writing cache '%s': %s", self.db_path, e)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        count, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+        # Älteste Zugriffe zuerst entfernen, bis beide Grenzen wieder eingehalten sind
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall():
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            count -= 1
+            total_bytes -= size
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters plus the current number of entries and bytes on disk."""
+        with self._lock:
+            count, total_bytes = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            stats: Dict[str, Any] = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = count
+        stats["bytes"] = total_bytes
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+# Globale Instanz, damit alle Tools denselben Cache (und dieselben Zähler) verwenden
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Returns the shared result cache, or None if caching is disabled via TOOL_RESULT_CACHE_ENABLED=0.
+    Location, size bounds and TTL can be configured with TOOL_RESULT_CACHE_PATH,
+    TOOL_RESULT_CACHE_MAX_ENTRIES, TOOL_RESULT_CACHE_MAX_MB and TOOL_RESULT_CACHE_TTL_SECONDS.
+    """
+    global _result_cache
+    if os.getenv("TOOL_RESULT_CACHE_ENABLED", "1").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    with _result_cache_lock:
+        if _result_cache is None:
+            try:
+                ttl_env = os.getenv("TOOL_RESULT_CACHE_TTL_SECONDS")
+                _result_cache = ResultCache(
+                    db_path=os.getenv("TOOL_RESULT_CACHE_PATH", _DEFAULT_CACHE_PATH),
+                    max_entries=int(os.getenv("TOOL_RESULT_CACHE_MAX_ENTRIES", "5000")),
+                    max_bytes=int(float(os.getenv("TOOL_RESULT_CACHE_MAX_MB", "200")) * 1024 * 1024),
+                    default_ttl_seconds=float(ttl_env) if ttl_env else 7 * 24 * 3600
+                )
+            except ValueError as e:
+                logger.warning("Invalid cache configuration (%s). Caching disabled.", e)
+                return None
+        return _result_cache
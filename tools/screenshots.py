@@ -0,0 +1,82 @@
+import hashlib
+from io import BytesIO
+from typing import Any, Optional
+
+from tools.env_config import int_from_env
+from tools.lazy_imports import lazy_import
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+Image = lazy_import("PIL.Image", optional=True)
+if Image is None:
+    logger.warning("Für Screenshots wird 'Pillow' benötigt. Bitte installieren: pip install Pillow")
+
+DEFAULT_SCREENSHOT_MAX_WIDTH = 1024
+# dHash mit 8x8 Bit = 64 Bit
+HASH_SIZE = 8
+# Bis zu dieser Hamming-Distanz (von 64 Bit) meldet das Tool einen Screenshot als kaum verändert;
+# eine Analyse wird nur bei identischen Pixeln (content_digest) wiederverwendet
+SCREENSHOT_DEDUP_DISTANCE = max(0, int_from_env("SCREENSHOT_DEDUP_DISTANCE", 4))
+
+
+def decode_png(png_bytes: bytes) -> "Image.Image":
+    """
+    Opens screenshot bytes as a fully loaded RGB PIL image.
+
+    Raises:
+        RuntimeError: If Pillow is not installed.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow library not available.")
+    image = Image.open(BytesIO(png_bytes))
+    image.load()
+    return image.convert("RGB") if image.mode != "RGB" else image
+
+
+def downscale(image: "Image.Image", max_width: Optional[int]) -> "Image.Image":
+    """Shrinks the image to at most `max_width` pixels wide (aspect ratio kept); smaller images are returned as is."""
+    if not max_width or image.width <= max_width:
+        return image
+    height = max(1, round(image.height * max_width / image.width))
+    return image.resize((max_width, height), Image.LANCZOS)
+
+
+def dhash(image: "Image.Image", hash_size: int = HASH_SIZE) -> int:
+    """
+    Difference hash: grayscale, resized to (hash_size + 1) x hash_size, one bit per horizontally adjacent
+    pixel pair (left brighter than right). Small rendering noise (anti-aliasing, a blinking cursor)
+    changes only a few bits, a changed layout changes many.
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def content_digest(image: "Image.Image") -> str:
+    """SHA-256 over mode, size and raw pixels: equal only for pixel-identical images."""
+    digest = hashlib.sha256(f"{image.mode}:{image.width}x{image.height}:".encode("ascii"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def hamming_distance(first: int, second: int) -> int:
+    return bin(first ^ second).count("1")
+
+
+def encode_png(image: "Image.Image") -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+async def capture_png(page: Any, locator: Any = None, full_page: bool = False, timeout_ms: int = 30000) -> bytes:
+    """PNG bytes of the page (viewport or full page) or, given a locator, of that element only."""
+    if locator is not None:
+        return await locator.screenshot(type="png", timeout=timeout_ms, animations="disabled")
+    return await page.screenshot(type="png", full_page=full_page, timeout=timeout_ms, animations="disabled")
@@ -5,9 +5,13 @@ import os
 import socket
 from typing import Optional
 from crewai.tools import tool
+from tools.tracing import trace_tool
+from tools.logging_setup import get_logger
 import functools # NEUER IMPORT
 import time # NEUER IMPORT
 
+logger = get_logger(__name__)
+
 _http_server_thread: Optional[threading.Thread] = None
 _http_server_instance: Optional[socketserver.TCPServer] = None
 _current_hosting_port: Optional[int] = None
@@ -31,6 +35,7 @@ class QuietHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         pass
 
 @tool("Start Local HTTP Server Tool")
+@trace_tool("Start Local HTTP Server Tool")
 def start_local_http_server_tool(directory: str, port: int = 8088) -> str:
     """
     Starts a simple local HTTP server in a separate thread to serve files from the specified directory.
@@ -69,13 +74,14 @@ def start_local_http_server_tool(directory: str, port: int = 8088) -> str:
 
         _current_hosting_port = port
         _current_hosting_directory = abs_directory # Speichere den absoluten Pfad
-        print(f"--- Debug (HTTP Server): Server started on http://localhost:{port} serving '{abs_directory}' ---")
+        logger.info("Server started on http://localhost:%s serving '%s'", port, abs_directory)
         return f"Local HTTP server started successfully on http://localhost:{port} serving files from '{abs_directory}'."
     except Exception as e:
-        print(f"--- Debug (HTTP Server): Error starting server: {e} ---")
+        logger.error("Error starting server: %s", e)
         return f"TOOL_ERROR: Could not start local HTTP server on port {port} for directory '{abs_directory}': {e}"
 
 @tool("Stop Local HTTP Server Tool")
+@trace_tool("Stop Local HTTP Server Tool")
 def stop_local_http_server_tool() -> str:
     """
     Stops the currently running simple local HTTP server if one was started by this tool.
@@ -83,24 +89,24 @@ def stop_local_http_server_tool() -> str:
     global _http_server_thread, _http_server_instance, _current_hosting_port, _current_hosting_directory
     
     if _http_server_instance and _http_server_thread and _http_server_thread.is_alive():
-        print(f"--- Debug (HTTP Server): Attempting to stop HTTP server on port {_current_hosting_port}... ---")
+        logger.debug("Attempting to stop HTTP server on port %s...", _current_hosting_port)
         try:
             _http_server_instance.shutdown() 
             _http_server_instance.server_close() 
             _http_server_thread.join(timeout=5) 
             
             if _http_server_thread.is_alive():
-                print("--- Debug (HTTP Server): Server thread did not stop in time. ---")
+                logger.warning("Server thread did not stop in time.")
             
             message = f"Local HTTP server on port {_current_hosting_port} serving '{_current_hosting_directory}' stopped successfully."
             _http_server_thread = None
             _http_server_instance = None
             _current_hosting_port = None
             _current_hosting_directory = None
-            print(f"--- Debug (HTTP Server): {message} ---")
+            logger.info("%s", message)
             return message
         except Exception as e:
-            print(f"--- Debug (HTTP Server): Error stopping server: {e} ---")
+            logger.error("Error stopping server: %s", e)
             return f"TOOL_ERROR: Error stopping local HTTP server: {e}"
     else:
         return "TOOL_INFO: No local HTTP server (started by this tool) is currently running."
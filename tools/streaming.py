@@ -0,0 +1,147 @@
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from tools.chunked_summarization import estimate_tokens
+from tools.llm_telemetry import get_llm_telemetry
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import litellm
+except ImportError:
+    litellm = None
+
+# Empfängt (Quelle, neues Textstück), z.B. ("Gemini Vision Analyzer Tool", "The header shows ...")
+StreamCallback = Callable[[str, str], None]
+
+_stream_callback: Optional[StreamCallback] = None
+_LOG_LINE_CHARS = 200
+
+
+def streaming_enabled() -> bool:
+    """Opt-in via LLM_STREAMING=true (default off): the vision and summarization tools then stream their completions."""
+    return os.getenv("LLM_STREAMING", "false").lower() in ("1", "true", "yes")
+
+
+def set_stream_callback(callback: Optional[StreamCallback]) -> None:
+    """
+    Registers a process-wide callback for streamed text (e.g. a UI). Without one, partial text
+    goes to the incremental log. Setting a callback does not enable streaming by itself.
+    """
+    global _stream_callback
+    _stream_callback = callback
+
+
+class StreamProgress:
+    """
+    Collects the text deltas of one streamed completion: forwards each delta to the callback
+    (or logs complete lines incrementally) and measures time to first token and total latency.
+    """
+    def __init__(self, source: str, callback: Optional[StreamCallback] = None):
+        self.source = source
+        self.callback = callback if callback is not None else _stream_callback
+        self.start = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.chunks = 0
+        self._parts: List[str] = []
+        self._pending_log = ""
+        self._callback_failed = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    @property
+    def ttft_seconds(self) -> Optional[float]:
+        return None if self.first_token_at is None else round(self.first_token_at - self.start, 4)
+
+    @property
+    def total_seconds(self) -> float:
+        return round((self.finished_at or time.perf_counter()) - self.start, 4)
+
+    def on_text(self, delta: str) -> None:
+        if not delta:
+            return
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            logger.debug("[%s] First token after %.2fs.", self.source, self.first_token_at - self.start)
+        self.chunks += 1
+        self._parts.append(delta)
+        if self.callback is None:
+            self._log_lines(delta)
+        elif not self._callback_failed:
+            try:
+                self.callback(self.source, delta)
+            except Exception as e:
+                # Ein defekter Callback darf die eigentliche Antwort nicht verlieren
+                self._callback_failed = True
+                logger.warning("[%s] Stream callback failed (%s); continuing without it.", self.source, e)
+
+    def _log_lines(self, delta: str) -> None:
+        self._pending_log += delta
+        while "\n" in self._pending_log or len(self._pending_log) >= _LOG_LINE_CHARS:
+            cut = self._pending_log.find("\n")
+            if cut == -1 or cut > _LOG_LINE_CHARS:
+                cut = _LOG_LINE_CHARS
+            line, self._pending_log = self._pending_log[:cut], self._pending_log[cut:].lstrip("\n")
+            if line.strip():
+                logger.info("[%s] %s", self.source, line)
+
+    def finish(self) -> str:
+        """Flushes the incremental log and returns the full text."""
+        self.finished_at = time.perf_counter()
+        if self.callback is None and self._pending_log.strip():
+            logger.info("[%s] %s", self.source, self._pending_log)
+        self._pending_log = ""
+        logger.debug("[%s] Stream finished: %s chunks, ttft %ss, total %ss.", self.source, self.chunks,
+                     self.ttft_seconds, self.total_seconds)
+        return self.text
+
+
+def stream_llm_completion(llm: Any, messages: List[Dict[str, str]], source: str,
+                          callback: Optional[StreamCallback] = None) -> Dict[str, Any]:
+    """
+    Streams a chat completion for the model configured on a CrewAI LLM through LiteLLM and records
+    tokens, latency and time to first token in the LLM telemetry under `source`.
+
+    Returns:
+        Dict[str, Any]: 'text', 'ttft_seconds' and 'total_seconds'.
+
+    Raises:
+        RuntimeError: If LiteLLM is not installed. API errors are passed through.
+    """
+    if litellm is None:
+        raise RuntimeError("litellm is not installed.")
+    model = getattr(llm, "model", None)
+    params = {name: getattr(llm, name, None) for name in ("api_key", "base_url", "api_base", "temperature", "max_tokens")}
+    params = {name: value for name, value in params.items() if value is not None}
+    progress = StreamProgress(source, callback)
+    usage = None
+    error = None
+    try:
+        response = litellm.completion(model=model, messages=messages, stream=True,
+                                      stream_options={"include_usage": True}, **params)
+        for chunk in response:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            choices = getattr(chunk, "choices", None) or []
+            if choices and getattr(choices[0], "delta", None) is not None:
+                progress.on_text(choices[0].delta.content or "")
+        return {"text": progress.finish(), "ttft_seconds": progress.ttft_seconds, "total_seconds": progress.total_seconds}
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        if progress.finished_at is None:
+            progress.finish()
+        telemetry = get_llm_telemetry()
+        if usage is not None:
+            telemetry.record(source, model, getattr(usage, "prompt_tokens", 0), getattr(usage, "completion_tokens", 0),
+                             progress.total_seconds, "usage", error, ttft_seconds=progress.ttft_seconds)
+        else:
+            prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+            telemetry.record(source, model, prompt_tokens, estimate_tokens(progress.text), progress.total_seconds,
+                             "estimate", error, ttft_seconds=progress.ttft_seconds)
@@ -1,136 +1,121 @@
 import os
-from typing import Type, Optional
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Type, Optional, Dict, Any, List, Tuple
 from pydantic import BaseModel, Field
 from crewai.tools import BaseTool
 from crewai import Agent, Task, LLM  # Wird benötigt, um dynamisch einen Summarizer-Agenten zu erstellen
+from tools.chunked_summarization import ChunkedSummarizationEngine, estimate_tokens
+from tools.result_cache import get_result_cache, make_cache_key
+from tools.rate_limiter import get_rate_limiter
+from tools.llm_config import get_default_llm
+from tools.llm_telemetry import instrument_llm
+from tools.streaming import stream_llm_completion, streaming_enabled
+from tools.tracing import trace_tool
+from tools.logging_setup import get_logger, truncated
 
-# Umgebungsvariablen für den Fall laden, dass wir ein eigenes LLM erstellen müssen
-from dotenv import load_dotenv
-load_dotenv()
-
-# Versuche, das default_llm aus agents.py zu importieren.
-try:
-    # Wir fangen hier spezifischer die möglichen Fehler ab
-    try:
-        from agents import default_llm
-    except ValueError as ve:
-        # Dies fängt den "LITELLM_MODEL_NAME not found" Fehler ab
-        print(f"WARNUNG (TextSummarizationTool): Fehler beim Laden von agents.py: {ve}")
-        default_llm = None
-    except ImportError:
-        default_llm = None
-        print("WARNUNG (TextSummarizationTool): Konnte default_llm nicht aus agents.py importieren. Das Tool wird möglicherweise nicht funktionieren.")
-        print("Stelle sicher, dass agents.py im PYTHONPATH ist oder die LLM-Konfiguration anders bereitgestellt wird.")
-except Exception as e:
-    default_llm = None
-    print(f"WARNUNG (TextSummarizationTool): Unerwarteter Fehler beim Importieren von default_llm: {e}")
+logger = get_logger(__name__)
 
 # Globale Variable für den Summarizer Agenten, um ihn nicht bei jedem Aufruf neu zu erstellen
 _summarizer_agent: Optional[Agent] = None
+_summarizer_llm: Optional[LLM] = None
+# Worker-Threads der Map-Phase bekommen eigene Agenten, da der Agent-Executor nicht thread-sicher ist
+_thread_local_agents = threading.local()
+
+def _create_summarizer_agent(llm_to_use) -> Agent:
+    """Baut einen neuen Summarizer-Agenten mit dem übergebenen LLM."""
+    return Agent(
+        role="Expert Text Summarizer",
+        goal="Summarize the given text concisely and accurately, extracting the most important information. "
+             "The summary should be significantly shorter than the original text while retaining key insights.",
+        backstory="You are a highly skilled AI assistant specialized in reading and summarizing long texts. "
+                  "You are adept at identifying core arguments, key facts, and main themes, "
+                  "and presenting them in a brief and easy-to-understand format.",
+        llm=llm_to_use,
+        verbose=False,  # Kann für Debugging auf True gesetzt werden
+        allow_delegation=False
+    )
+
+def get_summarizer_llm() -> Optional[LLM]:
+    """
+    Ermittelt das LLM für die Zusammenfassung (einmalig, danach gecacht).
+    Verwendet das gemeinsame LLM aus tools.llm_config (dasselbe wie die Agenten in agents.py).
+    """
+    global _summarizer_llm
+    if _summarizer_llm is not None:
+        return _summarizer_llm
+
+    llm_to_use = get_default_llm()
+    if llm_to_use is None:
+        logger.error("Kein LLM für den Summarizer verfügbar. Abbruch der Agenten-Erstellung.")
+        return None
+
+    # Eigene instrumentierte Kopie: Token/Latenz/Kosten werden dem Tool zugeordnet, nicht dem aufrufenden Agenten
+    _summarizer_llm = instrument_llm(llm_to_use, "Text Summarization Tool")
+    return _summarizer_llm
 
 def get_summarizer_agent() -> Optional[Agent]:
     """
     Erstellt oder gibt den globalen Summarizer-Agenten zurück.
-    Verwendet das default_llm, das in agents.py konfiguriert wurde.
-    Falls dies nicht verfügbar ist, wird versucht, ein eigenes LLM zu erstellen.
+    Das LLM wird über get_summarizer_llm() ermittelt.
     """
     global _summarizer_agent
     if _summarizer_agent is None:
-        llm_to_use = None
-        if default_llm is None:
-            # Versuche erneut, das LLM zu laden, falls es beim ersten Mal nicht verfügbar war
-            try:
-                from agents import default_llm as reloaded_llm
-                if reloaded_llm is None:
-                    print("TOOL_ERROR (TextSummarizationTool): default_llm ist immer noch None nach erneutem Laden.")
-                    
-                    # Wir versuchen, ein eigenes LLM zu erstellen als Fallback
-                    gemini_api_key = os.getenv("GEMINI_API_KEY")
-                    lite_llm_model_name = os.getenv("LITELLM_MODEL_NAME")
-                    
-                    if not gemini_api_key:
-                        print("TOOL_ERROR (TextSummarizationTool): GEMINI_API_KEY nicht in Umgebungsvariablen gefunden.")
-                        if lite_llm_model_name:
-                            print(f"TOOL_ERROR (TextSummarizationTool): LITELLM_MODEL_NAME ist auf '{lite_llm_model_name}' gesetzt.")
-                        else:
-                            print("TOOL_ERROR (TextSummarizationTool): LITELLM_MODEL_NAME fehlt in Umgebungsvariablen.")
-                            # Setzen wir einen Standard-Wert, damit wir weitermachen können
-                            lite_llm_model_name = "gemini/gemini-1.5-flash"
-                            print(f"TOOL_ERROR (TextSummarizationTool): LITELLM_MODEL_NAME auf Standardwert '{lite_llm_model_name}' gesetzt.")
-                        
-                        return None
-                    
-                    if not lite_llm_model_name:
-                        # Setzen wir einen Standard-Wert, damit wir weitermachen können
-                        lite_llm_model_name = "gemini/gemini-1.5-flash"
-                        print(f"TOOL_ERROR (TextSummarizationTool): LITELLM_MODEL_NAME fehlt in Umgebungsvariablen. Verwende Standardwert '{lite_llm_model_name}'.")
-                    
-                    try:
-                        # Erstelle ein eigenes LLM als Fallback
-                        print(f"--- Debug (TextSummarizationTool): Erstelle eigenes LLM mit Modell '{lite_llm_model_name}' ---")
-                        llm_to_use = LLM(
-                            model=lite_llm_model_name,
-                            api_key=gemini_api_key
-                        )
-                        print("--- Debug (TextSummarizationTool): Eigenes LLM erfolgreich erstellt ---")
-                    except Exception as llm_error:
-                        print(f"TOOL_ERROR (TextSummarizationTool): Fehler beim Erstellen des eigenen LLM: {llm_error}")
-                        return None
-                else:
-                    llm_to_use = reloaded_llm
-                    print("--- Debug (TextSummarizationTool): default_llm erfolgreich nachgeladen. ---")
-            except ImportError:
-                print("TOOL_ERROR (TextSummarizationTool): default_llm konnte auch beim erneuten Versuch nicht importiert werden.")
-                
-                # Wir versuchen, ein eigenes LLM zu erstellen als Fallback
-                gemini_api_key = os.getenv("GEMINI_API_KEY")
-                if not gemini_api_key:
-                    print("TOOL_ERROR (TextSummarizationTool): GEMINI_API_KEY nicht in Umgebungsvariablen gefunden. Kann Summarizer Agent nicht erstellen.")
-                    return None
-                
-                # Setzen wir einen Standard-Wert für das Modell
-                lite_llm_model_name = "gemini/gemini-1.5-flash"
-                print(f"TOOL_ERROR (TextSummarizationTool): Verwende Standardwert '{lite_llm_model_name}' für LITELLM_MODEL_NAME")
-                
-                try:
-                    # Erstelle ein eigenes LLM als Fallback
-                    print(f"--- Debug (TextSummarizationTool): Erstelle eigenes LLM mit Modell '{lite_llm_model_name}' ---")
-                    llm_to_use = LLM(
-                        model=lite_llm_model_name,
-                        api_key=gemini_api_key
-                    )
-                    print("--- Debug (TextSummarizationTool): Eigenes LLM erfolgreich erstellt ---")
-                except Exception as llm_error:
-                    print(f"TOOL_ERROR (TextSummarizationTool): Fehler beim Erstellen des eigenen LLM: {llm_error}")
-                    return None
-        else:
-            llm_to_use = default_llm
-            print("--- Debug (TextSummarizationTool): Verwende bereits importiertes default_llm. ---")
-        
-        if llm_to_use is None:  # Zusätzliche Sicherheitsüberprüfung
-             print("TOOL_ERROR (TextSummarizationTool): llm_to_use ist None. Abbruch der Agenten-Erstellung.")
-             return None
+        llm_to_use = get_summarizer_llm()
+        if llm_to_use is None:
+            return None
 
         try:
-            _summarizer_agent = Agent(
-                role="Expert Text Summarizer",
-                goal="Summarize the given text concisely and accurately, extracting the most important information. "
-                     "The summary should be significantly shorter than the original text while retaining key insights.",
-                backstory="You are a highly skilled AI assistant specialized in reading and summarizing long texts. "
-                          "You are adept at identifying core arguments, key facts, and main themes, "
-                          "and presenting them in a brief and easy-to-understand format.",
-                llm=llm_to_use,
-                verbose=False,  # Kann für Debugging auf True gesetzt werden
-                allow_delegation=False
-            )
-            print("--- Debug (TextSummarizationTool): Summarizer Agent initialized. ---")
+            _summarizer_agent = _create_summarizer_agent(llm_to_use)
+            logger.debug("Summarizer Agent initialized.")
         except Exception as e:
-            print(f"TOOL_ERROR (TextSummarizationTool): Fehler beim Initialisieren des Summarizer Agent: {e}")
+            logger.error("Fehler beim Initialisieren des Summarizer Agent: %s", e)
             _summarizer_agent = None  # Sicherstellen, dass es None bleibt bei Fehler
             return None
             
     return _summarizer_agent
 
+def get_thread_summarizer_agent() -> Optional[Agent]:
+    """
+    Gibt den Summarizer-Agenten für den aktuellen Thread zurück.
+    Der Hauptthread verwendet den globalen Agenten, Worker-Threads (Map-Phase) je einen eigenen
+    mit demselben LLM.
+    """
+    if threading.current_thread() is threading.main_thread():
+        return get_summarizer_agent()
+    agent = getattr(_thread_local_agents, "agent", None)
+    if agent is None:
+        base_agent = get_summarizer_agent()
+        if base_agent is None:
+            return None
+        try:
+            agent = _create_summarizer_agent(base_agent.llm)
+        except Exception as e:
+            logger.error("Fehler beim Initialisieren des Worker-Summarizer-Agenten: %s", e)
+            return None
+        _thread_local_agents.agent = agent
+    return agent
+
+SUMMARIZATION_MODES = ("direct", "agent")
+
+def build_direct_summary_messages(text_to_summarize: str, max_length: Optional[int] = None, summary_focus: Optional[str] = None) -> List[Dict[str, str]]:
+    """Compact chat messages for the direct completion path."""
+    instructions = "Summarize the text below concisely and accurately, keeping the key facts and conclusions."
+    if summary_focus:
+        instructions += f" Focus on: {summary_focus}."
+    if max_length:
+        instructions += f" Aim for about {max_length} words."
+    return [
+        {"role": "system", "content": "You are an expert text summarizer. Reply with the summary text only."},
+        {"role": "user", "content": f"{instructions}\n\n---\n{text_to_summarize}\n---"}
+    ]
+
+def _summary_result(summary: Optional[str] = None, error: Optional[str] = None,
+                    stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {"summary": summary, "error": error, "stats": stats}
+
 class TextSummarizationToolInput(BaseModel):
     """Input schema for TextSummarizationTool."""
     text_to_summarize: str = Field(..., description="The text content that needs to be summarized.")
@@ -148,26 +133,83 @@ class TextSummarizationToolInput(BaseModel):
 class TextSummarizationTool(BaseTool):
     name: str = "Text Summarization Tool"
     description: str = """
-    Summarizes a given text using an AI model by delegating to a specialized Summarizer Agent. 
+    Summarizes a given text using an AI model (a direct completion call, or a specialized Summarizer Agent as fallback). 
     Useful for condensing long documents, articles, or scraped web content into a shorter, digestible format.
+    Long texts are split into chunks that are summarized in parallel and then combined.
     You can optionally specify a maximum length for the summary and a specific focus.
     """
     args_schema: Type[BaseModel] = TextSummarizationToolInput
 
-    def _run(self, text_to_summarize: str, max_length: Optional[int] = None, summary_focus: Optional[str] = None) -> str:
+    # Konfiguration der Map-Reduce-Zusammenfassung für lange Texte
+    chunk_token_budget: int = 3000  # Texte bis zu diesem (geschätzten) Token-Umfang werden in einem Aufruf zusammengefasst
+    max_parallel_chunks: int = 4    # Maximale Anzahl gleichzeitig zusammengefasster Chunks (Fan-out)
+    max_reduce_depth: int = 3       # Maximale Anzahl zusätzlicher Reduce-Ebenen
+    # 'direct': ein einzelner LLM-Aufruf mit kompaktem Prompt; 'agent': Task über den Summarizer-Agenten
+    summarization_mode: str = os.getenv("TEXT_SUMMARIZATION_MODE", "direct")
+    # Opt-in (LLM_STREAMING): der direkte Aufruf wird gestreamt, Teiltexte gehen an den Stream-Callback bzw. ins Log
+    streaming: bool = streaming_enabled()
+
+    def _summarize_single(self, text_to_summarize: str, max_length: Optional[int] = None, summary_focus: Optional[str] = None) -> str:
         """
-        Summarizes the provided text by creating a task for the specialized Summarizer Agent.
+        Summarizes one text (that fits into a single prompt) with the configured mode.
+        In 'direct' mode, the agent path is used as a fallback if the direct call fails.
         """
-        print(f"--- Debug (Tool Call): 'Text Summarization Tool' called. Text length: {len(text_to_summarize)}, Max length: {max_length}, Focus: {summary_focus} ---")
+        if self.summarization_mode == "direct":
+            summary = self._summarize_direct(text_to_summarize, max_length, summary_focus)
+            if not summary.startswith("TOOL_ERROR"):
+                return summary
+            logger.warning("Direct mode failed (%s). Falling back to Summarizer Agent.", summary[:200])
+        return self._summarize_with_agent(text_to_summarize, max_length, summary_focus)
 
-        # Fehlerbehandlung für leeren Text
-        if not text_to_summarize or not isinstance(text_to_summarize, str):
-            return "TOOL_ERROR (TextSummarizationTool): 'text_to_summarize' argument must be a non-empty string."
+    def _summarize_direct(self, text_to_summarize: str, max_length: Optional[int] = None, summary_focus: Optional[str] = None) -> str:
+        """
+        Summarizes one text with a single completion call on the configured LLM,
+        without the agent's ReAct scaffolding.
+        """
+        llm = get_summarizer_llm()
+        if llm is None:
+            return "TOOL_ERROR (TextSummarizationTool): LLM could not be initialized. Check LLM configuration (GEMINI_API_KEY, LITELLM_MODEL_NAME)."
+
+        messages = build_direct_summary_messages(text_to_summarize, max_length, summary_focus)
+
+        result_cache = get_result_cache()
+        cache_key = None
+        if result_cache:
+            model_name = getattr(llm, 'model', str(llm))
+            cache_key = make_cache_key(model_name, messages[0]["content"] + "\n" + messages[1]["content"], params={"tool": "text_summarization", "mode": "direct"})
+            cached_summary = result_cache.get(cache_key)
+            if cached_summary is not None:
+                logger.debug("Cache hit, skipping LLM call. Summary length: %s", len(cached_summary))
+                return cached_summary
 
-        # Hole oder initialisiere den Summarizer Agenten
-        summarizer_agent = get_summarizer_agent()
+        try:
+            logger.debug("Direct completion call. Prompt length: %s, streaming: %s", len(messages[1]['content']), self.streaming)
+            get_rate_limiter("gemini").acquire()
+            if self.streaming:
+                streamed = stream_llm_completion(llm, messages, "Text Summarization Tool")
+                logger.debug("Streamed summary: ttft %ss, total %ss.", streamed["ttft_seconds"], streamed["total_seconds"])
+                response = streamed["text"]
+            else:
+                response = llm.call(messages)
+        except Exception as e:
+            return f"TOOL_ERROR (TextSummarizationTool): Direct LLM call failed: {e}"
+
+        summary = response.strip() if isinstance(response, str) else str(response or "").strip()
+        if not summary:
+            return "TOOL_ERROR (TextSummarizationTool): Direct LLM call returned an empty response."
+        logger.debug("Direct summarization successful. Summary length: %s", len(summary))
+        if result_cache and cache_key:
+            result_cache.set(cache_key, summary, namespace="text_summarization")
+        return summary
+
+    def _summarize_with_agent(self, text_to_summarize: str, max_length: Optional[int] = None, summary_focus: Optional[str] = None) -> str:
+        """
+        Summarizes one text by creating a task for the specialized Summarizer Agent.
+        """
+        # Hole oder initialisiere den Summarizer Agenten (pro Worker-Thread ein eigener)
+        summarizer_agent = get_thread_summarizer_agent()
         if not summarizer_agent:
-            return "TOOL_ERROR (TextSummarizationTool): Summarizer agent could not be initialized. Check LLM configuration and 'agents.py' import."
+            return "TOOL_ERROR (TextSummarizationTool): Summarizer agent could not be initialized. Check LLM configuration (GEMINI_API_KEY, LITELLM_MODEL_NAME)."
 
         # Erstelle den Prompt für den Summarizer Agenten
         task_description = f"Please summarize the following text:\n\n---\n{text_to_summarize}\n---\n\n"
@@ -178,6 +220,17 @@ class TextSummarizationTool(BaseTool):
         
         task_description += "Provide only the summary itself, without any introductory phrases like 'Here is the summary:' or any of your own conversational text."
 
+        # Identische Anfragen (gleiches Modell, gleicher Prompt) werden aus dem Ergebnis-Cache bedient
+        result_cache = get_result_cache()
+        cache_key = None
+        if result_cache:
+            model_name = getattr(summarizer_agent.llm, 'model', str(summarizer_agent.llm))
+            cache_key = make_cache_key(model_name, task_description, params={"tool": "text_summarization", "mode": "agent"})
+            cached_summary = result_cache.get(cache_key)
+            if cached_summary is not None:
+                logger.debug("Cache hit, skipping LLM call. Summary length: %s", len(cached_summary))
+                return cached_summary
+
         # Erstelle die Task für den Summarizer Agenten
         summarization_task = Task(
             description=task_description,
@@ -186,8 +239,9 @@ class TextSummarizationTool(BaseTool):
         )
 
         try:
-            print(f"--- Debug (TextSummarizationTool): Starting summarization task for Summarizer Agent. Task description preview: '{task_description[:250]}...' ---")
+            logger.debug("Starting summarization task for Summarizer Agent. Task description preview: '%s...'", task_description[:250])
             # Führe die Task aus. Die execute_sync Methode wird hier verwendet, da _run synchron ist.
+            get_rate_limiter("gemini").acquire()
             task_output = summarization_task.execute_sync() 
             
             # Verarbeitung des TaskOutput-Objekts
@@ -209,11 +263,14 @@ class TextSummarizationTool(BaseTool):
                 # Wenn wir nicht wissen, wie wir das Objekt verarbeiten sollen, versuchen wir, es als String zu konvertieren
                 summary = str(task_output)
             
-            print(f"--- Debug (TextSummarizationTool): Summarization successful. Summary type: {type(summary)}, content: '{summary[:100]}...' ---")
-            return summary.strip() if isinstance(summary, str) else str(summary).strip()
+            logger.debug("Summarization successful. Summary type: %s, content: '%s...'", type(summary), str(summary)[:100])
+            summary = summary.strip() if isinstance(summary, str) else str(summary).strip()
+            if result_cache and cache_key and summary:
+                result_cache.set(cache_key, summary, namespace="text_summarization")
+            return summary
         except Exception as e:
             error_msg = f"TOOL_ERROR (TextSummarizationTool): An error occurred during text summarization task execution: {e}"
-            print(f"--- Debug (TextSummarizationTool): {error_msg} ---")
+            logger.exception("%s", error_msg)
             # Versuche, spezifischere Fehler von LiteLLM oder dem LLM-Aufruf zu bekommen, falls möglich
             if hasattr(e, 'message'):  # Typisch für manche Exception-Objekte
                 error_msg += f" Details: {e.message}"
@@ -221,9 +278,128 @@ class TextSummarizationTool(BaseTool):
                 error_msg += f" Details: {e.args[0] if e.args else ''}"
             return error_msg
 
+    def summarize(self, text_to_summarize: str, max_length: Optional[int] = None,
+                  summary_focus: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Summarizes the provided text. Short texts are summarized in a single task,
+        longer texts go through the chunked map-reduce engine.
+
+        Returns:
+            Dict[str, Any]: 'summary', 'error' (TOOL_ERROR message or None) and 'stats' (chunk counts and
+            per-stage timings of a chunked run, None for single-pass runs). The stats belong to this call
+            only, so parallel callers (BatchTextSummarizationTool) do not overwrite each other's.
+        """
+        logger.info("'Text Summarization Tool' called. Text length: %s, Max length: %s, Focus: %s", len(text_to_summarize) if isinstance(text_to_summarize, str) else 'N/A', max_length, truncated(summary_focus))
+
+        # Fehlerbehandlung für leeren Text
+        if not text_to_summarize or not isinstance(text_to_summarize, str):
+            return _summary_result(error="TOOL_ERROR (TextSummarizationTool): 'text_to_summarize' argument must be a non-empty string.")
+
+        if self.summarization_mode not in SUMMARIZATION_MODES:
+            return _summary_result(error=f"TOOL_ERROR (TextSummarizationTool): Unknown summarization_mode '{self.summarization_mode}'. Use one of {SUMMARIZATION_MODES}.")
+
+        if estimate_tokens(text_to_summarize) <= self.chunk_token_budget:
+            summary = self._summarize_single(text_to_summarize, max_length, summary_focus)
+            if summary.startswith("TOOL_ERROR"):
+                return _summary_result(error=summary)
+            return _summary_result(summary=summary)
+
+        try:
+            engine = ChunkedSummarizationEngine(
+                summarize_fn=self._summarize_single,
+                max_chunk_tokens=self.chunk_token_budget,
+                max_workers=self.max_parallel_chunks,
+                max_reduce_depth=self.max_reduce_depth
+            )
+        except ValueError as e:
+            return _summary_result(error=f"TOOL_ERROR (TextSummarizationTool): Invalid chunking configuration: {e}")
+
+        chunked_result = engine.summarize(text_to_summarize, max_length, summary_focus)
+        return _summary_result(chunked_result["summary"], chunked_result["error"], chunked_result["stats"])
+
+    @trace_tool()
+    def _run(self, text_to_summarize: str, max_length: Optional[int] = None, summary_focus: Optional[str] = None) -> str:
+        result = self.summarize(text_to_summarize, max_length, summary_focus)
+        return result["error"] or result["summary"]
+
 # Instanz des Tools erstellen, damit es von Agenten importiert und verwendet werden kann
 text_summarization_tool = TextSummarizationTool()
 
+class BatchTextSummarizationToolInput(BaseModel):
+    """Input schema for BatchTextSummarizationTool."""
+    texts_or_file_paths: List[str] = Field(
+        ...,
+        description="List of texts to summarize. An entry that is the path of an existing local file is read from disk instead."
+    )
+    max_length: Optional[int] = Field(
+        None,
+        description="Optional: Desired maximum length of each summary in words or tokens (model dependent)."
+    )
+    summary_focus: Optional[str] = Field(
+        None,
+        description="Optional: Specific aspects or questions every summary should focus on."
+    )
+
+class BatchTextSummarizationTool(BaseTool):
+    name: str = "Batch Text Summarization Tool"
+    description: str = """
+    Summarizes several texts or local files in one call. The summaries run in parallel (rate limited to the LLM quota).
+    Use this instead of calling the 'Text Summarization Tool' once per document, e.g. after scraping several web pages.
+    Returns a JSON list in input order with 'index', 'source', 'summary', 'error' and 'stats'
+    (chunk counts and timings of long texts, otherwise null) for every entry.
+    """
+    args_schema: Type[BaseModel] = BatchTextSummarizationToolInput
+
+    max_concurrency: int = 4  # Maximale Anzahl gleichzeitig laufender Zusammenfassungen
+
+    def _load_item(self, item: str) -> Tuple[Optional[str], Optional[str], str]:
+        """Returns (text, error, source label) for one batch entry."""
+        if not isinstance(item, str) or not item.strip():
+            return None, "TOOL_ERROR (BatchTextSummarizationTool): Entry must be a non-empty string.", "<invalid>"
+        # Nur kurze, einzeilige Einträge können Dateipfade sein
+        if len(item) < 1024 and "\n" not in item and os.path.isfile(item):
+            try:
+                with open(item, "r", encoding="utf-8") as f:
+                    return f.read(), None, item
+            except Exception as e:
+                return None, f"TOOL_ERROR (BatchTextSummarizationTool): Could not read file '{item}': {e}", item
+        return item, None, f"text ({len(item)} chars)"
+
+    def _summarize_item(self, index: int, item: str, max_length: Optional[int], summary_focus: Optional[str]) -> Dict[str, Any]:
+        text, error, source = self._load_item(item)
+        entry: Dict[str, Any] = {"index": index, "source": source, "summary": None, "error": error, "stats": None}
+        if error:
+            return entry
+        try:
+            # summarize() statt _run(): die Statistiken gehören zu diesem Eintrag, nicht zum geteilten Tool
+            result = text_summarization_tool.summarize(text, max_length=max_length, summary_focus=summary_focus)
+        except Exception as e:
+            result = _summary_result(error=f"TOOL_ERROR (BatchTextSummarizationTool): Unexpected error: {e}")
+        entry.update(result)
+        return entry
+
+    @trace_tool()
+    def _run(self, texts_or_file_paths: List[str], max_length: Optional[int] = None, summary_focus: Optional[str] = None) -> str:
+        logger.info("'Batch Text Summarization Tool' called with %s entries, Max length: %s, Focus: %s", len(texts_or_file_paths) if isinstance(texts_or_file_paths, list) else 'N/A', max_length, truncated(summary_focus))
+        if not isinstance(texts_or_file_paths, list) or not texts_or_file_paths:
+            return "TOOL_ERROR (BatchTextSummarizationTool): 'texts_or_file_paths' must be a non-empty list of strings."
+        if self.max_concurrency <= 0:
+            return "TOOL_ERROR (BatchTextSummarizationTool): 'max_concurrency' must be a positive integer."
+
+        start = time.perf_counter()
+        workers = min(self.max_concurrency, len(texts_or_file_paths))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # executor.map liefert die Ergebnisse in Eingabereihenfolge
+            results = list(executor.map(
+                lambda indexed: self._summarize_item(indexed[0], indexed[1], max_length, summary_focus),
+                enumerate(texts_or_file_paths)
+            ))
+        failed = sum(1 for r in results if r["error"])
+        logger.info("%s entries summarized in %.2fs with %s workers, %s failed.", len(results), time.perf_counter() - start, workers, failed)
+        return json.dumps(results, ensure_ascii=False, indent=2)
+
+batch_text_summarization_tool = BatchTextSummarizationTool()
+
 if __name__ == '__main__':
     """
     Test-Block für das TextSummarizationTool.
@@ -240,7 +416,7 @@ if __name__ == '__main__':
     lite_llm_model_name = os.getenv("LITELLM_MODEL_NAME")
     
     if not gemini_api_key:
-        print("WARNUNG: GEMINI_API_KEY nicht gefunden. Tests werden nicht funktionieren.")
+        logger.warning("GEMINI_API_KEY nicht gefunden. Tests werden nicht funktionieren.")
     else:
         print(f"GEMINI_API_KEY gefunden: {gemini_api_key[:5]}..." if gemini_api_key else "GEMINI_API_KEY fehlt")
     
@@ -249,7 +425,7 @@ if __name__ == '__main__':
         lite_llm_model_name = "gemini/gemini-1.5-flash"
         # Explizit setzen, so dass andere Module es auch sehen können
         os.environ["LITELLM_MODEL_NAME"] = lite_llm_model_name
-        print(f"WARNUNG: LITELLM_MODEL_NAME nicht gefunden. Setze Standardwert: {lite_llm_model_name}")
+        logger.warning("LITELLM_MODEL_NAME nicht gefunden. Setze Standardwert: %s", lite_llm_model_name)
     else:
         print(f"LITELLM_MODEL_NAME: {lite_llm_model_name}")
     
@@ -257,7 +433,7 @@ if __name__ == '__main__':
     summarizer_agent_instance = get_summarizer_agent()
 
     if not summarizer_agent_instance:
-        print("FEHLER: Summarizer Agent konnte für den Test nicht initialisiert werden. Überprüfe die LLM-Konfiguration und den Import von 'agents.default_llm'.")
+        print("FEHLER: Summarizer Agent konnte für den Test nicht initialisiert werden. Überprüfe die LLM-Konfiguration (GEMINI_API_KEY, LITELLM_MODEL_NAME).")
     else:
         print("Summarizer Agent für Test erfolgreich initialisiert.")
         
@@ -338,28 +514,24 @@ if __name__ == '__main__':
         # Optional: Test mit nicht verfügbarem LLM
         print("\n=== Test 7: Simulation eines fehlenden LLM (optional) ===")
         original_agent = _summarizer_agent
+        original_llm = _summarizer_llm
+        original_get_default_llm = get_default_llm
         try:
             # LLM temporär als nicht verfügbar markieren
             _summarizer_agent = None
-            
-            # Den default_llm temporär umgehen
-            import sys
-            if 'agents' in sys.modules:
-                original_default_llm = sys.modules['agents'].default_llm
-                sys.modules['agents'].default_llm = None
+            _summarizer_llm = None
+            get_default_llm = lambda: None
             
             # Test ausführen
             result_no_llm = text_summarization_tool._run(example_text_short)
             print(f"Ergebnis bei fehlendem LLM: {result_no_llm}")
             
-            # Zurücksetzen
-            if 'agents' in sys.modules:
-                sys.modules['agents'].default_llm = original_default_llm
-            _summarizer_agent = original_agent
-            
         except Exception as e:
             print(f"Test 7 fehlgeschlagen: {e}")
+        finally:
             # Sicherstellen, dass wir den originalen Agenten wiederherstellen
+            get_default_llm = original_get_default_llm
+            _summarizer_llm = original_llm
             _summarizer_agent = original_agent
             
     print("\n=== Tests abgeschlossen ===")
\ No newline at end of file
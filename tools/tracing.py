@@ -0,0 +1,341 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import functools
+import threading
+import contextvars
+from typing import Any, Callable, Dict, List, Optional
+from tools.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# Standardablage der Spans im Projekt-Root (per Umgebungsvariable überschreibbar)
+_DEFAULT_TRACE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   ".cache", "telemetry", "spans.jsonl")
+_MAX_FINISHED_SPANS = 20000
+_SERVICE_NAME = "crewai-agent-system"
+
+
+def _new_id(length: int) -> str:
+    return uuid.uuid4().hex[:length]
+
+
+class Span:
+    """One timed operation (crew run, task, agent execution or tool call) with OTel-style ids."""
+    def __init__(self, name: str, kind: str, trace_id: str, parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = _new_id(16)
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.duration_seconds: Optional[float] = None
+        self.status = "OK"
+        self._start_perf = time.perf_counter()
+
+    def end(self, error_type: Optional[str] = None) -> None:
+        if self.end_time_ns is not None:
+            return
+        self.end_time_ns = time.time_ns()
+        self.duration_seconds = time.perf_counter() - self._start_perf
+        if error_type:
+            self.status = "ERROR"
+            self.attributes["error.type"] = error_type
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Span in the OTLP/JSON encoding (as written by the OpenTelemetry collector's file exporter)."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns or self.start_time_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in
+                           {"span.kind": self.kind, **self.attributes}.items()],
+            "status": {"code": 2 if self.status == "ERROR" else 1},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    # Nearest-Rank-Verfahren
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(percentile / 100.0 * len(sorted_values) + 0.4999)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Tracer:
+    """
+    In-process span collector.
+
+    Crew, task and agent spans are opened/closed from CrewAI's event bus (see install_tracing);
+    tool spans come from the @trace_tool decorator and nest under the innermost open
+    tool span of the current context, else under the most recently started agent/task span.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._finished: List[Span] = []
+        self._scope_stack: List[Span] = []
+        self._scopes_by_key: Dict[Any, Span] = {}
+        self._current_tool_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+            "current_tool_span", default=None)
+        self._durations: Dict[str, List[float]] = {}
+
+    # --- Agent-/Task-/Crew-Scopes (vom Event-Bus) ---
+
+    def start_scope(self, key: Any, name: str, kind: str, attributes: Optional[Dict[str, Any]] = None,
+                    parent_key: Any = None) -> Span:
+        with self._lock:
+            parent = self._scopes_by_key.get(parent_key) if parent_key is not None else None
+            if parent is None and self._scope_stack:
+                parent = self._scope_stack[-1]
+            span = Span(name, kind, parent.trace_id if parent else _new_id(32), parent, attributes)
+            self._scope_stack.append(span)
+            self._scopes_by_key[key] = span
+            return span
+
+    def end_scope(self, key: Any, error_type: Optional[str] = None) -> Optional[Span]:
+        with self._lock:
+            span = self._scopes_by_key.pop(key, None)
+            if span is None:
+                return None
+            if span in self._scope_stack:
+                self._scope_stack.remove(span)
+        span.end(error_type)
+        self._finish(span)
+        return span
+
+    def current_scope_attribute(self, name: str) -> Optional[Any]:
+        """Looks up an attribute (e.g. 'agent.role') on the open scopes, innermost first."""
+        with self._lock:
+            for span in reversed(self._scope_stack):
+                if name in span.attributes:
+                    return span.attributes[name]
+        return None
+
+    # --- Tool-Spans ---
+
+    def start_tool_span(self, name: str, attributes: Dict[str, Any]) -> Span:
+        parent = self._current_tool_span.get()
+        if parent is None:
+            with self._lock:
+                parent = self._scope_stack[-1] if self._scope_stack else None
+        return Span(name, "tool", parent.trace_id if parent else _new_id(32), parent, attributes)
+
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            self._finished.append(span)
+            if len(self._finished) > _MAX_FINISHED_SPANS:
+                del self._finished[:len(self._finished) - _MAX_FINISHED_SPANS]
+            if span.kind == "tool":
+                self._durations.setdefault(span.name, []).append(span.duration_seconds or 0.0)
+
+    def finished_spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._finished)
+
+    # --- Auswertung und Export ---
+
+    def tool_latency_histograms(self) -> List[Dict[str, Any]]:
+        """Count, total and p50/p95/p99 latency (seconds) per tool, slowest total first."""
+        with self._lock:
+            durations = {name: sorted(values) for name, values in self._durations.items()}
+        result = []
+        for name, values in durations.items():
+            result.append({
+                "tool": name, "calls": len(values), "total_seconds": round(sum(values), 3),
+                "p50": round(_percentile(values, 50), 4), "p95": round(_percentile(values, 95), 4),
+                "p99": round(_percentile(values, 99), 4), "max": round(values[-1], 4),
+            })
+        return sorted(result, key=lambda entry: entry["total_seconds"], reverse=True)
+
+    def format_latency_table(self) -> str:
+        histograms = self.tool_latency_histograms()
+        if not histograms:
+            return "No tool calls recorded."
+        header = f"{'tool':<36} | {'calls':>5} | {'total s':>9} | {'p50 s':>8} | {'p95 s':>8} | {'p99 s':>8} | {'max s':>8}"
+        lines = [header, "-" * len(header)]
+        for entry in histograms:
+            lines.append(f"{entry['tool'][:36]:<36} | {entry['calls']:>5} | {entry['total_seconds']:>9.2f} | "
+                         f"{entry['p50']:>8.3f} | {entry['p95']:>8.3f} | {entry['p99']:>8.3f} | {entry['max']:>8.3f}")
+        return "\n".join(lines)
+
+    def export_otlp_jsonl(self, path: Optional[str] = None) -> str:
+        """
+        Appends all finished spans as one OTLP/JSON ExportTraceServiceRequest line
+        (readable by the OpenTelemetry collector's otlpjsonfile receiver). Returns the path.
+        """
+        path = path or os.getenv("TOOL_TRACE_PATH", _DEFAULT_TRACE_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        request = {"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", _SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": "tools.tracing"},
+                            "spans": [span.to_otlp() for span in self.finished_spans()]}],
+        }]}
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+        return path
+
+    def reset(self) -> None:
+        with self._lock:
+            self._finished = []
+            self._durations = {}
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Returns the process-wide tracer."""
+    return _tracer
+
+
+def current_agent_role() -> Optional[str]:
+    """Role of the agent whose execution is currently open, if any."""
+    return _tracer.current_scope_attribute("agent.role")
+
+
+def _args_digest(args: tuple, kwargs: Dict[str, Any]) -> str:
+    payload = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _result_size(result: Any) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, (str, bytes)):
+        return len(result)
+    return len(json.dumps(result, default=str, ensure_ascii=False))
+
+
+def trace_tool(name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorator that records a span per tool call: tool name, digest of the arguments
+    (the argument values themselves are not stored), duration, result size and error class.
+    Exceptions are re-raised; results starting with 'TOOL_ERROR' mark the span as failed.
+
+    For @tool functions pass the tool name and place the decorator below @tool.
+    Without a name the decorator is meant for BaseTool._run: the name is read from `self.name`.
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if name is None and args:
+                tool_name = getattr(args[0], "name", func.__qualname__)
+                call_args = args[1:]
+            else:
+                tool_name = name or func.__name__
+                call_args = args
+            span = _tracer.start_tool_span(tool_name, {
+                "tool.name": tool_name,
+                "tool.args_digest": _args_digest(call_args, kwargs),
+                "tool.arg_names": ",".join(sorted(kwargs)) if kwargs else "",
+            })
+            token = _tracer._current_tool_span.set(span)
+            error_type = None
+            try:
+                result = func(*args, **kwargs)
+                span.attributes["tool.result_size"] = _result_size(result)
+                if isinstance(result, str) and result.startswith("TOOL_ERROR"):
+                    error_type = "TOOL_ERROR"
+                return result
+            except Exception as e:
+                error_type = type(e).__name__
+                raise
+            finally:
+                _tracer._current_tool_span.reset(token)
+                span.end(error_type)
+                _tracer._finish(span)
+        return wrapper
+    return decorator
+
+
+def report_tool_latencies(tracer: Optional[Tracer] = None, path: Optional[str] = None) -> None:
+    """Prints the per-tool latency table and appends the spans to the OTLP JSONL export."""
+    tracer = tracer or get_tracer()
+    print("\n--- Tool-Latenzen (p50/p95/p99) ---")
+    print(tracer.format_latency_table())
+    if tracer.finished_spans():
+        export_path = tracer.export_otlp_jsonl(path)
+        logger.info("Spans exportiert nach: %s", export_path)
+
+
+_tracing_installed = False
+
+
+def install_tracing() -> None:
+    """
+    Registers handlers on CrewAI's event bus that open/close crew, task and agent spans
+    (so tool spans nest under them) and report tool latencies at the end of every Crew.kickoff().
+    """
+    global _tracing_installed
+    if _tracing_installed:
+        return
+    try:
+        from crewai.utilities.events import (
+            crewai_event_bus,
+            CrewKickoffStartedEvent, CrewKickoffCompletedEvent, CrewKickoffFailedEvent,
+            TaskStartedEvent, TaskCompletedEvent, TaskFailedEvent,
+            AgentExecutionStartedEvent, AgentExecutionCompletedEvent, AgentExecutionErrorEvent,
+        )
+    except ImportError:
+        logger.debug("CrewAI event bus not available, only tool spans are recorded.")
+        return
+
+    def task_name(task: Any) -> str:
+        name = getattr(task, "name", None) or getattr(task, "description", "") or "task"
+        return name if len(name) <= 80 else name[:77] + "..."
+
+    def on_crew_started(source, event):
+        _tracer.start_scope(("crew", id(source)), f"crew {event.crew_name or 'crew'}", "crew",
+                            {"crew.name": event.crew_name or ""})
+
+    def on_crew_finished(source, event):
+        _tracer.end_scope(("crew", id(source)), "CrewKickoffFailed" if isinstance(event, CrewKickoffFailedEvent) else None)
+        report_tool_latencies()
+        _tracer.reset()
+
+    def on_task_started(source, event):
+        _tracer.start_scope(("task", id(source)), f"task {task_name(source)}", "task", {"task.name": task_name(source)})
+
+    def on_task_finished(source, event):
+        _tracer.end_scope(("task", id(source)), "TaskFailed" if isinstance(event, TaskFailedEvent) else None)
+
+    def on_agent_started(source, event):
+        role = getattr(event.agent, "role", "agent")
+        _tracer.start_scope(("agent", id(event.agent), id(event.task)), f"agent {role}", "agent",
+                            {"agent.role": role}, parent_key=("task", id(event.task)))
+
+    def on_agent_finished(source, event):
+        _tracer.end_scope(("agent", id(event.agent), id(event.task)),
+                          "AgentExecutionError" if isinstance(event, AgentExecutionErrorEvent) else None)
+
+    crewai_event_bus.register_handler(CrewKickoffStartedEvent, on_crew_started)
+    crewai_event_bus.register_handler(CrewKickoffCompletedEvent, on_crew_finished)
+    crewai_event_bus.register_handler(CrewKickoffFailedEvent, on_crew_finished)
+    crewai_event_bus.register_handler(TaskStartedEvent, on_task_started)
+    crewai_event_bus.register_handler(TaskCompletedEvent, on_task_finished)
+    crewai_event_bus.register_handler(TaskFailedEvent, on_task_finished)
+    crewai_event_bus.register_handler(AgentExecutionStartedEvent, on_agent_started)
+    crewai_event_bus.register_handler(AgentExecutionCompletedEvent, on_agent_finished)
+    crewai_event_bus.register_handler(AgentExecutionErrorEvent, on_agent_finished)
+    _tracing_installed = True
@@ -1,26 +1,41 @@
 import os
-from typing import Dict, Optional, List, Type
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, List, Type
 # BaseTool für stabilere Implementierung verwenden
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
+# requests nicht lazy: tools.http_client (Web-Tools) lädt es beim Start ohnehin
+import requests
+from tools.result_cache import get_result_cache, make_cache_key
+from tools.image_preprocessing import format_preprocessing_report, get_image_preprocessor
+from tools.llm_telemetry import instrument_generative_model
+from tools.rate_limiter import get_rate_limiter
+from tools.streaming import StreamCallback, StreamProgress, streaming_enabled
+from tools.env_config import int_from_env
+from tools.tracing import trace_tool
+from tools.logging_setup import get_logger
 
-# Imports für Google Generative AI (Gemini)
-try:
-    import google.generativeai as genai
-    from PIL import Image
-    import requests
-    from io import BytesIO
-except ImportError:
-    print("Hinweis: Für das GeminiVisionAnalyzerTool werden 'google-generativeai', 'Pillow' und 'requests' benötigt. Bitte installieren: pip install google-generativeai Pillow requests")
+logger = get_logger(__name__)
+
+# Imports für Google Generative AI (Gemini); die Pakete werden erst beim ersten Tool-Aufruf geladen
+from io import BytesIO
+from tools.lazy_imports import lazy_import
+
+genai = lazy_import("google.generativeai", optional=True)
+Image = lazy_import("PIL.Image", optional=True)
+if genai is None or Image is None:
+    logger.warning("Für das GeminiVisionAnalyzerTool werden 'google-generativeai' und 'Pillow' benötigt. Bitte installieren: pip install google-generativeai Pillow")
     # Erlaube dem Rest des Systems zu laden, auch wenn diese fehlen. Das Tool wird dann nicht funktionieren.
     genai = None 
     Image = None
-    requests = None
     BytesIO = None
 
 
 # Globale Variable, um den Gemini Client zu halten, damit er nicht bei jedem Tool-Aufruf neu initialisiert wird.
 _gemini_vision_model = None
+GEMINI_VISION_MODEL_NAME = 'gemini-1.5-flash-latest'
 
 def ensure_gemini_vision_model():
     """
@@ -35,58 +50,108 @@ def ensure_gemini_vision_model():
     if _gemini_vision_model is None:
         gemini_api_key = os.getenv("GEMINI_API_KEY")
         if not gemini_api_key:
-            print("TOOL_ERROR (GeminiVision): GEMINI_API_KEY not found in environment variables.")
+            logger.error("GEMINI_API_KEY not found in environment variables.")
             return False
         try:
             genai.configure(api_key=gemini_api_key)
-            _gemini_vision_model = genai.GenerativeModel('gemini-1.5-flash-latest')
-            print("--- Debug (GeminiVision): Gemini Vision Model 'gemini-1.5-flash-latest' initialized. ---")
+            _gemini_vision_model = instrument_generative_model(
+                genai.GenerativeModel(GEMINI_VISION_MODEL_NAME), "Gemini Vision Analyzer Tool", GEMINI_VISION_MODEL_NAME
+            )
+            logger.debug("Gemini Vision Model '%s' initialized.", GEMINI_VISION_MODEL_NAME)
             return True
         except Exception as e:
-            print(f"TOOL_ERROR (GeminiVision): Could not initialize Gemini Vision model: {e}")
+            logger.error("Could not initialize Gemini Vision model: %s", e)
             _gemini_vision_model = None # Sicherstellen, dass es None bleibt bei Fehler
             return False
     return True
 
 
+def _candidate_text(response) -> str:
+    """Text of the first candidate of a response (or of one streamed chunk); '' if it has none."""
+    if not getattr(response, "candidates", None) or not response.candidates[0].content.parts:
+        return ""
+    return "".join(part.text for part in response.candidates[0].content.parts if hasattr(part, 'text'))
+
+
 class GeminiVisionAnalyzerToolLogic:
-    def _load_image_from_path_or_url(self, image_source: str) -> Optional[Image.Image]:
+    def _load_image_bytes(self, image_source: str) -> Optional[bytes]:
         """
-        Loads an image from a local file path or a URL.
+        Loads the raw bytes of an image from a local file path or a URL.
+        The raw bytes are also used as part of the result cache key.
         """
-        if not Image or not requests or not BytesIO: # Überprüfen, ob die Importe erfolgreich waren
-            print("TOOL_ERROR (GeminiVision): Pillow or requests library not available.")
-            return None
         try:
             if image_source.startswith(('http://', 'https://')):
-                print(f"--- Debug (GeminiVision): Loading image from URL: {image_source} ---")
+                logger.debug("Loading image from URL: %s", image_source)
                 response = requests.get(image_source, stream=True, timeout=20)
                 response.raise_for_status()
-                img = Image.open(BytesIO(response.content))
-                print(f"--- Debug (GeminiVision): Image loaded successfully from URL. Format: {img.format}, Mode: {img.mode}, Size: {img.size} ---")
-                return img
+                return response.content
             elif os.path.exists(image_source):
-                print(f"--- Debug (GeminiVision): Loading image from local path: {image_source} ---")
-                img = Image.open(image_source)
-                print(f"--- Debug (GeminiVision): Image loaded successfully from path. Format: {img.format}, Mode: {img.mode}, Size: {img.size} ---")
-                return img
+                logger.debug("Loading image from local path: %s", image_source)
+                with open(image_source, "rb") as f:
+                    return f.read()
             else:
-                print(f"--- Debug (GeminiVision): Image source '{image_source}' is not a valid URL or local file path. ---")
+                logger.warning("Image source '%s' is not a valid URL or local file path.", image_source)
                 return None
         except requests.exceptions.RequestException as e:
-            print(f"--- Debug (GeminiVision): Error loading image from URL '{image_source}': {e} ---")
+            logger.warning("Error loading image from URL '%s': %s", image_source, e)
             return None
         except FileNotFoundError:
-            print(f"--- Debug (GeminiVision): Image file not found at path '{image_source}'. ---")
+            logger.warning("Image file not found at path '%s'.", image_source)
+            return None
+        except IOError as e:
+            logger.error("Error reading image '%s': %s", image_source, e)
+            return None
+        except Exception as e:
+            logger.error("Unexpected error loading image '%s': %s", image_source, e)
+            return None
+
+    def _open_image(self, image_bytes: bytes, image_source: str) -> Optional["Image.Image"]:
+        """Opens already loaded image bytes as a PIL image."""
+        if not Image or not BytesIO: # Überprüfen, ob die Importe erfolgreich waren
+            logger.error("Pillow library not available.")
             return None
+        try:
+            img = Image.open(BytesIO(image_bytes))
+            logger.debug("Image loaded successfully. Format: %s, Mode: %s, Size: %s", img.format, img.mode, img.size)
+            return img
         except IOError as e: # Deckt Probleme mit dem Öffnen/Lesen des Bildes ab
-            print(f"--- Debug (GeminiVision): Error opening or reading image '{image_source}': {e} ---")
+            logger.error("Error opening or reading image '%s': %s", image_source, e)
             return None
         except Exception as e:
-            print(f"--- Debug (GeminiVision): Unexpected error loading image '{image_source}': {e} ---")
+            logger.error("Unexpected error opening image '%s': %s", image_source, e)
+            return None
+
+    def _load_image_from_path_or_url(self, image_source: str) -> Optional["Image.Image"]:
+        """
+        Loads an image from a local file path or a URL.
+        """
+        image_bytes = self._load_image_bytes(image_source)
+        if image_bytes is None:
             return None
+        return self._open_image(image_bytes, image_source)
+
+    def _preprocessing_params(self) -> Dict[str, object]:
+        preprocessor = get_image_preprocessor()
+        return preprocessor.params() if preprocessor else {}
+
+    def _image_parts(self, pil_image: "Image.Image", original_bytes: Optional[int], reports: List[str]) -> List:
+        """
+        Content parts for one image: the preprocessed (resized, re-encoded, possibly tiled) blobs,
+        or the PIL image itself if preprocessing is disabled or fails.
+        """
+        preprocessor = get_image_preprocessor()
+        if preprocessor is None:
+            return [pil_image]
+        try:
+            report = preprocessor.preprocess(pil_image, original_bytes)
+        except Exception as e:
+            logger.warning("Image preprocessing failed (%s); sending the image unchanged.", e)
+            return [pil_image]
+        reports.append(format_preprocessing_report(report))
+        return report["parts"]
 
-    def analyze_image(self, image_path_or_url: str, prompt: str, max_output_tokens: int = 2048) -> Dict[str, Optional[str]]:
+    def analyze_image(self, image_path_or_url: str, prompt: str, max_output_tokens: int = 2048,
+                      stream: Optional[bool] = None, stream_callback: Optional[StreamCallback] = None) -> Dict[str, Optional[str]]:
         """
         Analyzes an image using the Gemini Vision model with a specific prompt.
 
@@ -94,11 +159,16 @@ class GeminiVisionAnalyzerToolLogic:
             image_path_or_url (str): The local file path or URL of the image to analyze.
             prompt (str): The prompt to guide the vision model's analysis.
             max_output_tokens (int): The maximum number of tokens for the response.
+            stream (Optional[bool]): Stream the answer (partial text to `stream_callback` or the log).
+                Defaults to LLM_STREAMING.
+            stream_callback (Optional[StreamCallback]): Receives (source, text delta) while streaming.
 
         Returns:
             Dict[str, Optional[str]]: A dictionary containing:
                 'analysis_text': The textual analysis from the model, or None on error.
                 'error': An error message if the analysis failed, or None on success.
+                'preprocessing': Original and sent image sizes, if the image was preprocessed.
+                'ttft_seconds', 'total_seconds': Time to first token and total latency of streamed calls.
         """
         global _gemini_vision_model
         result = {"analysis_text": None, "error": None}
@@ -111,28 +181,139 @@ class GeminiVisionAnalyzerToolLogic:
             result["error"] = "TOOL_ERROR (GeminiVision): Gemini Vision model is not initialized. Check API key and dependencies."
             return result
 
-        pil_image = self._load_image_from_path_or_url(image_path_or_url)
+        image_bytes = self._load_image_bytes(image_path_or_url)
+        if image_bytes is None:
+            result["error"] = f"TOOL_ERROR (GeminiVision): Could not load image from '{image_path_or_url}'."
+            return result
+
+        # Gleiches Bild + gleicher Prompt + gleiche Parameter -> Ergebnis aus dem Cache, kein API-Aufruf
+        result_cache = get_result_cache()
+        cache_key = None
+        if result_cache:
+            cache_key = make_cache_key(GEMINI_VISION_MODEL_NAME, prompt, image_bytes,
+                                       {"max_output_tokens": max_output_tokens, **self._preprocessing_params()})
+            cached_analysis = result_cache.get(cache_key)
+            if cached_analysis is not None:
+                logger.debug("Cache hit for '%s', skipping API call.", image_path_or_url)
+                result["analysis_text"] = cached_analysis
+                return result
+
+        pil_image = self._open_image(image_bytes, image_path_or_url)
         if pil_image is None:
             result["error"] = f"TOOL_ERROR (GeminiVision): Could not load image from '{image_path_or_url}'."
             return result
 
+        # Die Reihenfolge [Text, Bild] ist wichtig
+        reports: List[str] = []
+        contents = [prompt] + self._image_parts(pil_image, len(image_bytes), reports)
+        return self._generate_analysis(contents, max_output_tokens, cache_key, reports,
+                                       stream=streaming_enabled() if stream is None else stream, stream_callback=stream_callback)
+
+    def analyze_pil_image(self, pil_image: "Image.Image", prompt: str, max_output_tokens: int = 2048,
+                          reference_image_source: Optional[str] = None,
+                          original_bytes: Optional[int] = None, stream: Optional[bool] = None,
+                          stream_callback: Optional[StreamCallback] = None) -> Dict[str, Optional[str]]:
+        """
+        Analyzes an in-memory PIL image (e.g. a browser screenshot) without writing it to disk.
+
+        Args:
+            pil_image (Image.Image): The image to analyze.
+            prompt (str): The prompt to guide the vision model's analysis.
+            max_output_tokens (int): The maximum number of tokens for the response.
+            reference_image_source (Optional[str]): Local path or URL of a second image (e.g. the design mockup)
+                that is sent before `pil_image`, so the prompt can compare both.
+            original_bytes (Optional[int]): Encoded size of `pil_image` (e.g. the PNG screenshot), for the size report.
+            stream (Optional[bool]), stream_callback (Optional[StreamCallback]): As in analyze_image().
+
+        Returns:
+            Dict[str, Optional[str]]: Same structure as analyze_image().
+        """
+        result = {"analysis_text": None, "error": None}
+
+        if not genai:
+            result["error"] = "TOOL_ERROR (GeminiVision): 'google-generativeai' library is not installed or failed to import."
+            return result
+
+        if not ensure_gemini_vision_model() or _gemini_vision_model is None:
+            result["error"] = "TOOL_ERROR (GeminiVision): Gemini Vision model is not initialized. Check API key and dependencies."
+            return result
+
+        reference_bytes = b""
+        if reference_image_source:
+            reference_bytes = self._load_image_bytes(reference_image_source) or b""
+            if not reference_bytes:
+                result["error"] = f"TOOL_ERROR (GeminiVision): Could not load reference image from '{reference_image_source}'."
+                return result
+
+        # Schlüssel aus den Rohpixeln (+ Modus/Größe), damit kein PNG-Encoding nur für den Cache nötig ist
+        result_cache = get_result_cache()
+        cache_key = None
+        if result_cache:
+            cache_key = make_cache_key(GEMINI_VISION_MODEL_NAME, prompt, reference_bytes + pil_image.tobytes(), {
+                "max_output_tokens": max_output_tokens, "mode": pil_image.mode, "size": list(pil_image.size),
+                "reference_bytes": len(reference_bytes), **self._preprocessing_params(),
+            })
+            cached_analysis = result_cache.get(cache_key)
+            if cached_analysis is not None:
+                logger.debug("Cache hit for in-memory image %s, skipping API call.", pil_image.size)
+                result["analysis_text"] = cached_analysis
+                return result
+
+        contents = [prompt]
+        reports: List[str] = []
+        if reference_image_source:
+            reference_image = self._open_image(reference_bytes, reference_image_source)
+            if reference_image is None:
+                result["error"] = f"TOOL_ERROR (GeminiVision): Could not load reference image from '{reference_image_source}'."
+                return result
+            contents += self._image_parts(reference_image, len(reference_bytes), reports)
+        contents += self._image_parts(pil_image, original_bytes, reports)
+
+        return self._generate_analysis(contents, max_output_tokens, cache_key, reports,
+                                       stream=streaming_enabled() if stream is None else stream, stream_callback=stream_callback)
+
+    def _generate_analysis(self, contents: List, max_output_tokens: int, cache_key: Optional[str],
+                           preprocessing_reports: Optional[List[str]] = None, stream: bool = False,
+                           stream_callback: Optional[StreamCallback] = None) -> Dict[str, Optional[str]]:
+        """
+        Sends prompt and image(s) to the Gemini Vision model and caches a successful analysis under `cache_key`.
+        Every request takes a token from the shared Gemini rate limiter (same quota as batch and summarization).
+        With `stream`, partial text goes to `stream_callback` (or the incremental log) while the answer is
+        generated, and 'ttft_seconds'/'total_seconds' are added to the result; the analysis text is the same.
+        """
+        result = {"analysis_text": None, "error": None}
+        if preprocessing_reports:
+            result["preprocessing"] = "; ".join(preprocessing_reports)
+            logger.debug("Vision upload: %s", result["preprocessing"])
+        result_cache = get_result_cache()
         try:
-            print(f"--- Debug (GeminiVision): Sending image and prompt to Gemini Vision model. Prompt: '{prompt[:100]}...' ---")
+            logger.debug("Sending image and prompt to Gemini Vision model. Prompt: '%s...'", contents[0][:100])
             # Die GenerationConfig wird direkt in generate_content verwendet oder global gesetzt
             generation_config = genai.types.GenerationConfig(
                 max_output_tokens=max_output_tokens
             )
+            get_rate_limiter("gemini").acquire()
             response = _gemini_vision_model.generate_content(
-                contents=[prompt, pil_image], # Die Reihenfolge [Text, Bild] ist wichtig
+                contents=contents,
                 generation_config=generation_config,
-                stream=False # Für dieses Tool ist kein Streaming notwendig
+                stream=stream
             )
-            
+            streamed_text = None
+            if stream:
+                progress = StreamProgress("Gemini Vision Analyzer Tool", stream_callback)
+                for chunk in response:
+                    progress.on_text(_candidate_text(chunk))
+                streamed_text = progress.finish()
+                result["ttft_seconds"] = progress.ttft_seconds
+                result["total_seconds"] = progress.total_seconds
+
             # Zugriff auf den Text der Antwort
-            if response.candidates and response.candidates[0].content.parts:
-                analysis_text = "".join(part.text for part in response.candidates[0].content.parts if hasattr(part, 'text'))
+            if streamed_text or (response.candidates and response.candidates[0].content.parts):
+                analysis_text = streamed_text if streamed_text else _candidate_text(response)
                 result["analysis_text"] = analysis_text.strip()
-                print(f"--- Debug (GeminiVision): Analysis successful. Output length: {len(result['analysis_text'])} ---")
+                logger.debug("Analysis successful. Output length: %s", len(result['analysis_text']))
+                if result_cache and cache_key and result["analysis_text"]:
+                    result_cache.set(cache_key, result["analysis_text"], namespace="gemini_vision")
             else:
                 # Versuche, genauere Fehlerinformationen zu bekommen, falls vorhanden
                 error_detail = "No content in response or unexpected response structure."
@@ -142,17 +323,173 @@ class GeminiVisionAnalyzerToolLogic:
                     error_detail = "No candidates returned in the response."
                 
                 result["error"] = f"TOOL_ERROR (GeminiVision): {error_detail}"
-                print(f"--- Debug (GeminiVision): {result['error']} ---")
+                logger.warning("%s", result['error'])
 
         except Exception as e:
             error_msg = f"TOOL_ERROR (GeminiVision): An unexpected error occurred during analysis: {e}"
-            print(f"--- Debug (GeminiVision): {error_msg} ---")
+            logger.exception("%s", error_msg)
             result["error"] = error_msg
         
         return result
 
+    def _batch_prompt(self, prompts: List[str], image_count: int) -> str:
+        questions = "\n".join(f"{number}. {prompt}" for number, prompt in enumerate(prompts, 1))
+        return (
+            f"You receive {image_count} image(s), each preceded by its label ('Image 1', 'Image 2', ...).\n"
+            f"Answer every question below separately for every image.\n\nQuestions:\n{questions}\n\n"
+            "Reply with JSON only, without Markdown: a list with one object per image, "
+            '[{"image": <image number>, "answers": ["<answer to question 1>", "<answer to question 2>", ...]}, ...].'
+        )
+
+    def _parse_batch_response(self, text: str, image_count: int, prompt_count: int) -> Optional[Dict[int, List[str]]]:
+        """Answers per image number (1-based) from the model's JSON reply, or None if the reply is not usable."""
+        start, end = text.find("["), text.rfind("]")
+        if start == -1 or end <= start:
+            return None
+        try:
+            entries = json.loads(text[start:end + 1])
+        except ValueError:
+            return None
+        answers: Dict[int, List[str]] = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict) or not isinstance(entry.get("answers"), list):
+                continue
+            try:
+                number = int(entry.get("image"))
+            except (TypeError, ValueError):
+                continue
+            if 1 <= number <= image_count and len(entry["answers"]) == prompt_count:
+                answers[number] = [str(answer).strip() for answer in entry["answers"]]
+        return answers or None
+
+    def _run_batch_request(self, items: List[Dict[str, Any]], prompts: List[str], tokens_per_answer: int) -> int:
+        """
+        One generate_content call for all `items` (images with their content parts); writes 'answers' or 'error'
+        into each item. If a multi-image reply cannot be parsed, the images are retried one request each.
+        Returns the number of requests made, including those retries.
+        """
+        contents: List[Any] = [self._batch_prompt(prompts, len(items))]
+        for number, item in enumerate(items, 1):
+            contents.append(f"Image {number}:")
+            contents.extend(item["parts"])
+        # Obergrenze der Gemini-1.5-Modelle für die Antwortlänge
+        max_output_tokens = min(8192, tokens_per_answer * len(prompts) * len(items) + 64)
+        response = self._generate_analysis(contents, max_output_tokens, None)
+        if response["error"]:
+            for item in items:
+                item["error"] = response["error"]
+            return 1
+        parsed = self._parse_batch_response(response["analysis_text"], len(items), len(prompts))
+        if parsed is None and len(items) == 1 and len(prompts) == 1:
+            parsed = {1: [response["analysis_text"]]}
+        if parsed is None and len(items) > 1:
+            logger.warning("Batch reply for %s images was not valid JSON; retrying them one by one.", len(items))
+            return 1 + sum(self._run_batch_request([item], prompts, tokens_per_answer) for item in items)
+        for number, item in enumerate(items, 1):
+            if parsed and number in parsed:
+                item["answers"] = parsed[number]
+            else:
+                item["error"] = "TOOL_ERROR (GeminiVision): The batch reply contained no (complete) answer for this image."
+        return 1
+
+    def analyze_images_batch(self, image_sources: List[str], prompts: List[str],
+                             max_images_per_request: Optional[int] = None, max_concurrency: Optional[int] = None,
+                             tokens_per_answer: int = 512) -> Dict[str, Any]:
+        """
+        Answers several prompts for several images with as few generate_content calls as possible.
+
+        Images are packed into requests of at most `max_images_per_request` images (VISION_BATCH_MAX_IMAGES,
+        default 6; fewer if the answers would not fit into the output limit), each request asks all prompts
+        for all of its images and expects a JSON reply. Requests run concurrently on `max_concurrency`
+        threads (VISION_BATCH_CONCURRENCY, default 3), each one takes a token from the shared Gemini rate limiter
+        (see _generate_analysis).
+        Results are cached per image and prompt list.
+
+        Args:
+            image_sources (List[str]): Local file paths or URLs of the images.
+            prompts (List[str]): Questions asked for every image.
+            max_images_per_request (Optional[int]): Upper bound of images per request.
+            max_concurrency (Optional[int]): Number of requests in flight at the same time.
+            tokens_per_answer (int): Output token budget per image and prompt.
+
+        Returns:
+            Dict[str, Any]: 'results' with one entry per image, in input order: 'image', 'answers'
+            ({prompt: answer} or None), 'error' (or None) and 'cached'; 'stats' of this run ('images',
+            'cached', 'requests', 'elapsed_seconds'). The stats belong to the call, so concurrent batches
+            on the shared instance do not overwrite each other's.
+        """
+        start = time.monotonic()
+        max_images_per_request = max_images_per_request or int_from_env("VISION_BATCH_MAX_IMAGES", 6)
+        max_concurrency = max_concurrency or int_from_env("VISION_BATCH_CONCURRENCY", 3)
+        max_images_per_request = max(1, min(max_images_per_request, 8192 // max(1, tokens_per_answer * len(prompts))))
+        items = [{"image": source, "answers": None, "error": None, "cached": False} for source in image_sources]
+        stats = {"images": len(items), "cached": 0, "requests": 0, "elapsed_seconds": 0.0}
+
+        error = None
+        if not genai:
+            error = "TOOL_ERROR (GeminiVision): 'google-generativeai' library is not installed or failed to import."
+        elif not ensure_gemini_vision_model() or _gemini_vision_model is None:
+            error = "TOOL_ERROR (GeminiVision): Gemini Vision model is not initialized. Check API key and dependencies."
+        if error:
+            for item in items:
+                item["error"] = error
+            return {"results": [{key: item[key] for key in ("image", "answers", "error", "cached")} for item in items],
+                    "stats": stats}
+
+        def prepare(item: Dict[str, Any]) -> None:
+            image_bytes = self._load_image_bytes(item["image"])
+            pil_image = self._open_image(image_bytes, item["image"]) if image_bytes else None
+            if pil_image is None:
+                item["error"] = f"TOOL_ERROR (GeminiVision): Could not load image from '{item['image']}'."
+                return
+            item["bytes"] = image_bytes
+            item["parts"] = self._image_parts(pil_image, len(image_bytes), [])
+
+        result_cache = get_result_cache()
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            # Bilder parallel laden (URLs!) und vorverarbeiten
+            list(executor.map(prepare, items))
+            pending = []
+            for item in items:
+                if item["error"]:
+                    continue
+                if result_cache:
+                    item["cache_key"] = make_cache_key(GEMINI_VISION_MODEL_NAME, "\n".join(prompts), item["bytes"], {
+                        "mode": "batch", "tokens_per_answer": tokens_per_answer, **self._preprocessing_params()})
+                    cached = result_cache.get(item["cache_key"])
+                    if cached is not None:
+                        item["answers"], item["cached"] = json.loads(cached), True
+                        stats["cached"] += 1
+                        continue
+                pending.append(item)
+            groups = [pending[i:i + max_images_per_request] for i in range(0, len(pending), max_images_per_request)]
+            logger.debug("Vision batch: %s images, %s cached, %s request(s) with up to %s images each.",
+                         len(items), stats["cached"], len(groups), max_images_per_request)
+            futures = [executor.submit(self._run_batch_request, group, prompts, tokens_per_answer) for group in groups]
+            stats["requests"] = sum(future.result() for future in futures)
+
+        results = []
+        for item in items:
+            answers = item["answers"]
+            if answers is not None and not item["cached"] and result_cache and item.get("cache_key"):
+                result_cache.set(item["cache_key"], json.dumps(answers), namespace="gemini_vision")
+            results.append({
+                "image": item["image"],
+                "answers": dict(zip(prompts, answers)) if answers is not None else None,
+                "error": item["error"] if answers is None else None,
+                "cached": item["cached"],
+            })
+        stats["elapsed_seconds"] = round(time.monotonic() - start, 3)
+        logger.debug("Vision batch finished: %s", stats)
+        return {"results": results, "stats": stats}
+
 _vision_analyzer_logic = GeminiVisionAnalyzerToolLogic()
 
+
+def get_vision_analyzer_logic() -> GeminiVisionAnalyzerToolLogic:
+    """Shared analyzer instance, e.g. for tools that hand over in-memory screenshots."""
+    return _vision_analyzer_logic
+
 # Definieren der Input-Schema-Klasse für das Tool
 class GeminiVisionAnalyzerInput(BaseModel):
     """Input schema für GeminiVisionAnalyzerTool."""
@@ -179,11 +516,12 @@ class GeminiVisionAnalyzerTool(BaseTool):
     """
     args_schema: Type[BaseModel] = GeminiVisionAnalyzerInput
     
+    @trace_tool()
     def _run(self, image_path_or_url: str, prompt: str, max_output_tokens: int = 2048) -> str:
         """
         Führt die Analyse des Bildes durch und gibt das Ergebnis zurück.
         """
-        print(f"--- Debug (Tool Call): 'Gemini Vision Analyzer Tool' called with image: '{image_path_or_url}', prompt: '{prompt[:100]}...' ---")
+        logger.info("'Gemini Vision Analyzer Tool' called with image: '%s', prompt: '%s...'", image_path_or_url, prompt[:100])
         
         if not image_path_or_url or not isinstance(image_path_or_url, str):
             return "TOOL_ERROR (GeminiVision): 'image_path_or_url' argument must be a non-empty string."
@@ -205,6 +543,56 @@ class GeminiVisionAnalyzerTool(BaseTool):
 # Instanz des Tools erstellen, damit es von Agenten importiert und verwendet werden kann
 gemini_vision_analyzer_tool = GeminiVisionAnalyzerTool()
 
+
+class GeminiVisionBatchAnalyzerInput(BaseModel):
+    """Input schema für GeminiVisionBatchAnalyzerTool."""
+    image_paths_or_urls: List[str] = Field(
+        ...,
+        description="Lokale Dateipfade oder öffentlich zugängliche URLs aller zu analysierenden Bilder."
+    )
+    prompts: List[str] = Field(
+        ...,
+        description="Fragen, die für jedes Bild einzeln beantwortet werden."
+    )
+    tokens_per_answer: int = Field(
+        512,
+        description="Token-Budget pro Bild und Frage. Standard ist 512."
+    )
+
+class GeminiVisionBatchAnalyzerTool(BaseTool):
+    name: str = "Gemini Vision Batch Analyzer Tool"
+    description: str = """
+    Analysiert mehrere Bilder (z.B. alle Screens eines Mockups) mit mehreren Fragen in möglichst wenigen Gemini-Anfragen.
+    Verwende dieses Tool statt vieler einzelner Aufrufe des 'Gemini Vision Analyzer Tool', wenn mehrere Bilder
+    oder mehrere Fragen zu prüfen sind. Liefert JSON: pro Bild 'image', 'answers' ({Frage: Antwort}), 'error' und 'cached'.
+    """
+    args_schema: Type[BaseModel] = GeminiVisionBatchAnalyzerInput
+
+    @trace_tool()
+    def _run(self, image_paths_or_urls: List[str], prompts: List[str], tokens_per_answer: int = 512) -> str:
+        """
+        Führt die Batch-Analyse durch und gibt die Ergebnisse pro Bild als JSON zurück.
+        """
+        logger.info("'Gemini Vision Batch Analyzer Tool' called with %s images and %s prompts",
+                    len(image_paths_or_urls) if isinstance(image_paths_or_urls, list) else 'N/A',
+                    len(prompts) if isinstance(prompts, list) else 'N/A')
+
+        if not isinstance(image_paths_or_urls, list) or not image_paths_or_urls or not all(isinstance(i, str) and i for i in image_paths_or_urls):
+            return "TOOL_ERROR (GeminiVision): 'image_paths_or_urls' must be a non-empty list of strings."
+        if not isinstance(prompts, list) or not prompts or not all(isinstance(p, str) and p.strip() for p in prompts):
+            return "TOOL_ERROR (GeminiVision): 'prompts' must be a non-empty list of non-empty strings."
+        if not isinstance(tokens_per_answer, int) or tokens_per_answer <= 0:
+            return "TOOL_ERROR (GeminiVision): 'tokens_per_answer' must be a positive integer."
+
+        results = _vision_analyzer_logic.analyze_images_batch(image_paths_or_urls, prompts, tokens_per_answer=tokens_per_answer)["results"]
+        errors = {result["error"] for result in results}
+        if len(errors) == 1 and None not in errors:
+            # Gleicher Fehler für alle Bilder (z.B. fehlender API-Key): nur einmal melden
+            return errors.pop()
+        return json.dumps(results, ensure_ascii=False, indent=2)
+
+gemini_vision_batch_analyzer_tool = GeminiVisionBatchAnalyzerTool()
+
 if __name__ == '__main__':
     # --- Setup für lokales Testen (ähnlich wie in agents.py) ---
     print("--- Lokaler Test für GeminiVisionAnalyzerTool ---")
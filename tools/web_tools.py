@@ -1,308 +1,886 @@
+import os
+import json
+import time
+import codecs
+import threading
 import requests
 import socket 
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
 from typing import Optional, List, Any, Dict 
 from crewai.tools import tool
-from playwright.sync_api import sync_playwright, Page, Browser, Playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from tools.http_client import CachedHTTPClient, ContentRejectedError, DeadlineExceeded, create_cached_http_client
+from tools.html_extractors import HTMLTextExtractor, get_extractor, charset_from_content_type, sniff_encoding
+from tools.main_content import MainContentSession
+from tools.chunked_summarization import estimate_tokens
+from tools.tracing import trace_tool
+from tools.lazy_imports import lazy_import
+from tools.browser_pool import (BrowserLaunchError, NAVIGATION_PROFILES, default_navigation_profile, format_load_timings,
+                                 get_browser_pool, navigate_page, session_key)
+from tools.browser_actions import DEFAULT_STEP_TIMEOUT_MS, locate, run_actions, validate_actions
+from tools.dom_extraction import build_extraction_specs, extract_elements
+from tools.page_snapshot import DEFAULT_SNAPSHOT_MAX_TOKENS, diff_snapshot_lines, apply_token_budget, resolve_ref_selector, take_snapshot
+from tools.screenshots import (DEFAULT_SCREENSHOT_MAX_WIDTH, SCREENSHOT_DEDUP_DISTANCE, capture_png, content_digest, decode_png, dhash,
+                               downscale, hamming_distance)
+from tools.vision_analyzer_tool import get_vision_analyzer_logic
+from tools.logging_setup import get_logger, truncated
+
+logger = get_logger(__name__)
+
+# Playwright wird erst beim ersten Browser-Tool-Aufruf geladen
+playwright_api = lazy_import("playwright.async_api")
+
+# --- WebScrapingLogic und scrape_website_content_tool ---
+# Content-Types, die der Scraper verarbeitet; alles andere (PDF, Bilder, Video ...) wird vor dem Download abgewiesen
+TEXT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "application/xml", "text/xml")
+DOWNLOAD_CHUNK_BYTES = 16 * 1024
+# Nach erreichtem Textbudget wird nur für den HTTP-Cache weitergelesen, wenn der Body laut Content-Length höchstens so groß ist
+CACHE_READ_ON_MAX_BYTES = 512 * 1024
+EXTRACTION_MODES = ("full", "main")
+
+
+def _max_download_bytes_from_env() -> int:
+    try:
+        return int(float(os.getenv("SCRAPER_MAX_DOWNLOAD_MB", "5")) * 1024 * 1024)
+    except ValueError:
+        logger.warning("Invalid value for SCRAPER_MAX_DOWNLOAD_MB, using 5 MB.")
+        return 5 * 1024 * 1024
+
 
-# --- WebScrapingLogic und scrape_website_content_tool (bleiben unverändert) ---
 class WebScrapingLogic:
-    def scrape_content(self, url: str) -> tuple[str | None, str | None]:
-        print(f"--- Debug (scrape_content): Attempting to scrape URL: {url} ---")
+    def __init__(self, http_client: Optional[CachedHTTPClient] = None, extractor_backend: Optional[str] = None,
+                 max_download_bytes: Optional[int] = None):
+        # Obergrenze der pro Seite gelesenen Bytes; der Speicherbedarf pro Scrape bleibt damit beschränkt
+        self.max_download_bytes = max_download_bytes if max_download_bytes is not None else _max_download_bytes_from_env()
+        self.extraction_mode = os.getenv("SCRAPER_EXTRACTION_MODE", "full").strip().lower()
+        # Gemeinsame Keep-Alive-Session mit Retry/Backoff und bedingten GETs (ETag/Last-Modified)
+        self.http_client = http_client if http_client is not None else create_cached_http_client()
+        # Extractor-Backend: 'lxml' (Streaming, Standard falls installiert), 'selectolax' oder 'bs4'
+        try:
+            self.extractor: HTMLTextExtractor = get_extractor(extractor_backend)
+        except (ValueError, ImportError) as e:
+            logger.debug("%s Falling back to the 'bs4' extractor.", e)
+            self.extractor = get_extractor("bs4")
+
+    def get_http_cache_stats(self) -> Dict[str, int]:
+        """Returns hit/revalidated/miss/bypass counters of the HTTP cache."""
+        return self.http_client.get_stats()
+
+    def scrape_content(self, url: str, timeout: float = 20, extraction_mode: Optional[str] = None,
+                       max_tokens: Optional[int] = None,
+                       deadline: Optional[float] = None) -> tuple[str | None, str | None]:
+        """
+        Fetches `url` and extracts its text.
+
+        Args:
+            extraction_mode (Optional[str]): 'full' (all visible text without script/style/nav/footer/aside/header)
+                or 'main' (content-density based main-article extraction, drops boilerplate such as
+                cookie banners and related links; the output starts with a line reporting the reduction).
+                Defaults to self.extraction_mode (SCRAPER_EXTRACTION_MODE, 'full').
+            max_tokens (Optional[int]): Token budget (~4 characters per token) for the 'main' mode.
+                Defaults to the 15000 character budget.
+            deadline (Optional[float]): time.monotonic() limit for the whole fetch including retries and
+                reading the body (see CachedHTTPClient.open). `timeout` alone only bounds single socket operations.
+        """
+        extraction_mode = extraction_mode or self.extraction_mode
+        logger.debug("Attempting to scrape URL: %s (mode: %s)", url, extraction_mode)
+        if extraction_mode not in EXTRACTION_MODES:
+            return None, f"TOOL_ERROR: Invalid extraction_mode '{extraction_mode}'. Use one of {list(EXTRACTION_MODES)}."
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.9,de;q=0.8',
-            }
-            response = requests.get(url, headers=headers, timeout=20)
-            response.raise_for_status() 
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            for script_or_style in soup(["script", "style", "nav", "footer", "aside", "header"]):
-                if script_or_style:
-                    script_or_style.decompose()
-
-            body = soup.find('body')
-            if body:
-                text = body.get_text(separator='\n', strip=True)
-                text_lines = [line for line in text.splitlines() if line.strip()]
-                clean_text = "\n".join(text_lines)
+            max_raw_text_chars = 15000 
+            # Body wird gestreamt: höchstens max_download_bytes werden gelesen, Nicht-Text wird früh abgewiesen
+            with self.http_client.open(url, timeout=timeout, max_bytes=self.max_download_bytes,
+                                       allowed_content_types=TEXT_CONTENT_TYPES, deadline=deadline) as response:
+                declared_encoding = charset_from_content_type(response.headers.get("Content-Type"))
+                if extraction_mode == "main":
+                    session = MainContentSession(max_raw_text_chars, max_tokens)
+                else:
+                    session = self.extractor.new_session(max_raw_text_chars)
+                decoder = None
+                read_on_for_cache = response.cacheable and _small_body(response.headers.get("Content-Length"),
+                                                                       min(CACHE_READ_ON_MAX_BYTES, self.max_download_bytes))
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    if session.done:
+                        # Textbudget erreicht: abbrechen, außer ein kleiner Rest macht die Seite cachebar
+                        if not read_on_for_cache:
+                            break
+                        continue
+                    if decoder is None:
+                        decoder = codecs.getincrementaldecoder(sniff_encoding(chunk, declared_encoding))(errors="replace")
+                    session.feed(decoder.decode(chunk))
+                if decoder is not None and not session.done:
+                    session.feed(decoder.decode(b"", final=True))
+                extraction = session.close()
+            logger.debug("Fetched %s (cache: %s, %d bytes%s)", url, response.cache_status, response.bytes_read,
+                         ", byte limit reached" if response.truncated else "")
+
+            if extraction["has_body"]:
+                clean_text = extraction["text"]
                 
                 if not clean_text.strip():
-                    print(f"--- Debug (scrape_content): No text after cleaning for URL: {url} ---")
+                    logger.debug("No text after cleaning for URL: %s", url)
                     return None, f"TOOL_ERROR: Could not extract meaningful text content from the page (after cleaning): {url}"
 
-                max_raw_text_chars = 15000 
-                if len(clean_text) > max_raw_text_chars:
-                    clean_text = clean_text[:max_raw_text_chars] + "\n... (Content truncated as it was too long)"
-                print(f"--- Debug (scrape_content): Scraping successful for URL: {url}, text length (possibly truncated): {len(clean_text)} ---")
+                if extraction["truncated"] or response.truncated:
+                    clean_text = clean_text + "\n... (Content truncated as it was too long)"
+                if extraction_mode == "main":
+                    clean_text = _main_content_report(extraction) + "\n" + clean_text
+                logger.debug("Scraping successful for URL: %s (extractor: %s), text length (possibly truncated): %s", url, self.extractor.name, len(clean_text))
                 return clean_text, None
             else:
-                print(f"--- Debug (scrape_content): Could not find body tag for URL: {url} ---")
+                logger.warning("Could not find body tag for URL: %s", url)
                 return None, f"TOOL_ERROR: Could not find body tag in the page: {url}"
 
+        except ContentRejectedError as e:
+            logger.debug("Rejected non-text content for URL %s: %s", url, e)
+            return None, f"TOOL_ERROR: Unsupported content at URL '{url}' ({e.content_type or 'binary data'}). Only HTML/text pages can be scraped."
+        except DeadlineExceeded as e:
+            logger.warning("Deadline exceeded while fetching URL %s: %s", url, e)
+            return None, f"TOOL_ERROR: Deadline exceeded while fetching URL '{url}'."
         except requests.exceptions.Timeout:
-            print(f"--- Debug (scrape_content): Timeout while fetching URL: {url} ---")
+            logger.warning("Timeout while fetching URL: %s", url)
             return None, f"TOOL_ERROR: Timeout while fetching URL '{url}'."
         except requests.exceptions.HTTPError as http_err:
-            print(f"--- Debug (scrape_content): HTTP error for URL {url}: {http_err} ---")
+            logger.warning("HTTP error for URL %s: %s", url, http_err)
             return None, f"TOOL_ERROR: HTTP error {http_err.response.status_code} while fetching URL '{url}'."
         except requests.exceptions.RequestException as e:
-            print(f"--- Debug (scrape_content): General request error for URL {url}: {e} ---")
+            logger.warning("General request error for URL %s: %s", url, e)
             return None, f"TOOL_ERROR: Error fetching URL '{url}': {e}"
         except Exception as e:
-            print(f"--- Debug (scrape_content): Unknown error while scraping URL {url}: {e} ---")
+            logger.exception("Unknown error while scraping URL %s: %s", url, e)
             return None, f"TOOL_ERROR: General error while scraping '{url}': {e}"
 
+    def scrape_many(self, urls: List[str], max_per_host: int = 2, max_total: int = 8,
+                    timeout_per_url: float = 20, extraction_mode: Optional[str] = None,
+                    max_tokens: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Scrapes several URLs concurrently on a thread pool.
+
+        Args:
+            urls (List[str]): URLs to scrape.
+            max_per_host (int): Maximum number of simultaneous requests to the same host.
+            max_total (int): Maximum number of simultaneous requests overall.
+            timeout_per_url (float): Deadline in seconds per URL, including the wait for a free host slot.
+            extraction_mode, max_tokens: See scrape_content.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per URL in input order with 'url', 'status' ('ok' or 'error'),
+            'text', 'error' and 'elapsed_seconds'.
+        """
+        host_semaphores: Dict[str, threading.Semaphore] = {}
+        for url in urls:
+            host = urlparse(url).netloc.lower()
+            if host not in host_semaphores:
+                host_semaphores[host] = threading.Semaphore(max_per_host)
+
+        def scrape_one(url: str) -> Dict[str, Any]:
+            start = time.monotonic()
+            entry: Dict[str, Any] = {"url": url, "status": "error", "text": None, "error": None, "elapsed_seconds": 0.0}
+            parsed = urlparse(url)
+            if parsed.scheme not in ("http", "https") or not parsed.netloc:
+                entry["error"] = f"TOOL_ERROR: Invalid URL '{url}'. Only http(s) URLs are supported."
+                return entry
+            semaphore = host_semaphores[parsed.netloc.lower()]
+            if not semaphore.acquire(timeout=timeout_per_url):
+                entry["error"] = f"TOOL_ERROR: Deadline exceeded while waiting for a free connection slot to '{parsed.netloc}'."
+                entry["elapsed_seconds"] = round(time.monotonic() - start, 3)
+                return entry
+            try:
+                deadline = start + timeout_per_url
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    entry["error"] = f"TOOL_ERROR: Deadline exceeded before fetching URL '{url}'."
+                else:
+                    text, error = self.scrape_content(url, timeout=remaining, extraction_mode=extraction_mode,
+                                                      max_tokens=max_tokens, deadline=deadline)
+                    if error:
+                        entry["error"] = error
+                    elif not text or not text.strip():
+                        entry["error"] = f"TOOL_INFO: Could not extract meaningful text content from URL or content was empty: {url}"
+                    else:
+                        entry["status"] = "ok"
+                        entry["text"] = text
+            finally:
+                semaphore.release()
+            entry["elapsed_seconds"] = round(time.monotonic() - start, 3)
+            return entry
+
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_total, len(urls)))) as executor:
+            # executor.map liefert die Ergebnisse in Eingabereihenfolge
+            return list(executor.map(scrape_one, urls))
+
+def _small_body(content_length: Optional[str], limit: int) -> bool:
+    """True if the Content-Length header is known and at most `limit` bytes."""
+    try:
+        return 0 <= int(content_length) <= limit
+    except (TypeError, ValueError):
+        return False
+
+def _main_content_report(extraction: Dict[str, Any]) -> str:
+    if extraction["fallback"]:
+        return (f"[Main content: no article block found, returning the page text "
+                f"({extraction['main_chars']:,} of {extraction['page_chars']:,} characters)]")
+    return (f"[Main content: {extraction['main_chars']:,} of {extraction['page_chars']:,} page characters kept, "
+            f"{extraction['reduction']:.0%} reduction, ~{estimate_tokens(extraction['text']):,} tokens]")
+
 _web_ops_logic = WebScrapingLogic()
 
 @tool("Scrape Website Content Tool")
-def scrape_website_content_tool(url: str) -> str:
-    """Scrapes main text content from a URL. Args: url (str)."""
-    print(f"--- Debug (Tool Call): 'Scrape Website Content Tool' called with URL: {url} ---")
-    scraped_text, error = _web_ops_logic.scrape_content(url)
+@trace_tool("Scrape Website Content Tool")
+def scrape_website_content_tool(url: str, main_content_only: bool = False, max_tokens: Optional[int] = None) -> str:
+    """
+    Scrapes main text content from a URL.
+    Args:
+        url (str): The URL to scrape.
+        main_content_only (bool): If True, only the main article text is returned (boilerplate such as
+            cookie banners, menus and related links is dropped) and the first line reports the reduction.
+            Use this to save tokens on article/news/documentation pages. Defaults to False.
+        max_tokens (Optional[int]): Optional token budget for the main content.
+    """
+    logger.info("'Scrape Website Content Tool' called with URL: %s (main_content_only=%s, max_tokens=%s)", url, main_content_only, max_tokens)
+    if max_tokens is not None and max_tokens <= 0:
+        return "TOOL_ERROR: 'max_tokens' must be a positive integer."
+    scraped_text, error = _web_ops_logic.scrape_content(url, extraction_mode="main" if main_content_only else None,
+                                                        max_tokens=max_tokens)
     if error: 
-        print(f"--- Debug: Error during scraping of {url}: {error} ---")
+        logger.debug("Error during scraping of %s: %s", url, error)
         return error 
     if not scraped_text or not scraped_text.strip(): 
         error_msg = f"TOOL_INFO: Could not extract meaningful text content from URL or content was empty: {url}"
-        print(f"--- Debug: {error_msg} ---")
+        logger.debug("%s", error_msg)
         return error_msg 
-    print(f"--- Debug: Scraping for {url} successful. Returning raw text (length: {len(scraped_text)}). Agent should summarize this. ---")
+    logger.debug("Scraping for %s successful. Returning raw text (length: %s). Agent should summarize this.", url, len(scraped_text))
     return scraped_text
 
-# --- Playwright Browser Tool (Incorporating Claude's successful fixes) ---
+@tool("Scrape Many Websites Tool")
+@trace_tool("Scrape Many Websites Tool")
+def scrape_many_websites_tool(urls: List[str], max_per_host: int = 2, max_total: int = 8, timeout_per_url: float = 20,
+                              main_content_only: bool = False, max_tokens: Optional[int] = None) -> str:
+    """
+    Scrapes the main text content of several URLs concurrently in one call.
+    Use this instead of calling 'Scrape Website Content Tool' once per URL.
+    Returns a JSON list (in input order) with 'url', 'status' ('ok' or 'error'), 'text', 'error' and 'elapsed_seconds' per URL.
+    Args:
+        urls (List[str]): The URLs to scrape.
+        max_per_host (int): Maximum simultaneous requests to the same host. Defaults to 2.
+        max_total (int): Maximum simultaneous requests overall. Defaults to 8.
+        timeout_per_url (float): Deadline in seconds for each URL. Defaults to 20.
+        main_content_only (bool): Return only the main article text of each page (see 'Scrape Website Content Tool').
+        max_tokens (Optional[int]): Optional token budget per page for the main content.
+    """
+    logger.info("'Scrape Many Websites Tool' called with %s URLs (max_per_host=%s, max_total=%s, timeout_per_url=%s)", len(urls) if isinstance(urls, list) else 'N/A', max_per_host, max_total, timeout_per_url)
+    if not isinstance(urls, list) or not urls or not all(isinstance(u, str) for u in urls):
+        return "TOOL_ERROR: 'urls' must be a non-empty list of URL strings."
+    if max_per_host <= 0 or max_total <= 0 or timeout_per_url <= 0:
+        return "TOOL_ERROR: 'max_per_host', 'max_total' and 'timeout_per_url' must be positive."
+    if max_tokens is not None and max_tokens <= 0:
+        return "TOOL_ERROR: 'max_tokens' must be a positive integer."
+    start = time.monotonic()
+    results = _web_ops_logic.scrape_many(urls, max_per_host=max_per_host, max_total=max_total, timeout_per_url=timeout_per_url,
+                                         extraction_mode="main" if main_content_only else None, max_tokens=max_tokens)
+    ok_count = sum(1 for r in results if r["status"] == "ok")
+    logger.debug("Scraped %s/%s URLs successfully in %.2fs. HTTP cache: %s", ok_count, len(results), time.monotonic() - start, _web_ops_logic.get_http_cache_stats())
+    return json.dumps(results, ensure_ascii=False, indent=2)
 
-_playwright_instance: Optional[Playwright] = None
-_browser_instance: Optional[Browser] = None
-_current_page: Optional[Page] = None
+# --- Playwright Browser Tool (Incorporating Claude's successful fixes) ---
+# Async-Playwright auf eigenem Event-Loop-Thread (tools.browser_pool); jedes Tool führt eine Koroutine dort aus.
 
-def _ensure_browser_is_running(headless_mode: bool = True) -> bool: 
-    """Ensures Playwright is initialized and a browser is launched."""
-    global _playwright_instance, _browser_instance, _current_page
-    
-    if _browser_instance and _browser_instance.is_connected():
-        if not _current_page or _current_page.is_closed():
-            try:
-                _current_page = _browser_instance.new_page()
-                print("--- Debug (Playwright): New page created in existing browser. ---")
-            except Exception as e:
-                print(f"--- Debug (Playwright): Error creating new page: {e}. Restarting browser. ---")
-                # KORRIGIERTE SYNTAX für try-except in if-Block
-                if _browser_instance:
-                    try: 
-                        _browser_instance.close()
-                    except Exception as e_close_browser:
-                        print(f"--- Debug (Playwright): Minor error closing browser during restart: {e_close_browser} ---")
-                if _playwright_instance:
-                    try: 
-                        _playwright_instance.stop()
-                    except Exception as e_stop_pw:
-                        print(f"--- Debug (Playwright): Minor error stopping playwright during restart: {e_stop_pw} ---")
-                _browser_instance, _playwright_instance, _current_page = None, None, None
-                return _ensure_browser_is_running(headless_mode) # Recursive call
-        return True
-
-    try:
-        print(f"--- Debug (Playwright): Initializing Playwright and launching browser (headless={headless_mode})... ---")
-        _playwright_instance = sync_playwright().start()
-        _browser_instance = _playwright_instance.chromium.launch(headless=headless_mode) 
-        _current_page = _browser_instance.new_page()
-        print(f"--- Debug (Playwright): Browser launched (Chromium, headless={headless_mode}) and new page created. ---")
-        return True
-    except Exception as e:
-        print(f"--- Debug (Playwright): CRITICAL - Failed to initialize Playwright or launch browser: {e} ---")
-        if _browser_instance: 
-            try: _browser_instance.close() 
-            except: pass
-        if _playwright_instance: 
-            try: _playwright_instance.stop()
-            except: pass
-        _playwright_instance, _browser_instance, _current_page = None, None, None
-        return False
+def _playwright_message(e: Exception) -> str:
+    return e.message if hasattr(e, 'message') else str(e)
 
 @tool("Navigate Browser Tool")
-def navigate_browser_tool(url: str) -> str:
+@trace_tool("Navigate Browser Tool")
+def navigate_browser_tool(url: str, profile: Optional[str] = None, wait_for_selector: Optional[str] = None) -> str:
     """
     Navigates the browser to the specified URL.
-    Launches a browser and creates a page if one isn't already active.
+    Each agent gets its own browser session (page, cookies, storage); it is created on the first navigation.
+    The result reports the load timings.
     Args:
         url (str): The URL to navigate to.
+        profile (Optional[str]): Navigation profile:
+            'full' (wait for every image/font/script, default),
+            'no-media' (block images, fonts, media and analytics, wait for 'load'),
+            'dom' (wait only for 'domcontentloaded'),
+            'text' (block like 'no-media' and wait only for 'domcontentloaded'; fastest when you only read text).
+        wait_for_selector (Optional[str]): CSS selector; return as soon as this element is visible
+            instead of waiting for the profile's load state.
     """
-    global _current_page
-    print(f"--- Debug (Tool Call): 'Navigate Browser Tool' called with URL: {url} ---")
-    if not _ensure_browser_is_running(headless_mode=True) or not _current_page:
-        return "TOOL_ERROR (Playwright): Browser or page could not be initialized."
-    try:
-        print(f"--- Debug (Playwright): Navigating to {url}...")
-        response = _current_page.goto(url, timeout=30000, wait_until="load") 
+    profile = profile or default_navigation_profile()
+    logger.info("'Navigate Browser Tool' called with URL: %s (profile=%s, wait_for_selector=%s)", url, profile, wait_for_selector)
+    if profile not in NAVIGATION_PROFILES:
+        return f"TOOL_ERROR: Invalid profile '{profile}'. Use one of {list(NAVIGATION_PROFILES)}."
+    pool = get_browser_pool()
+    key = session_key()
+
+    async def navigate() -> str:
+        # Warmer Chromium aus dem Pool, eigener BrowserContext pro Agent (session_key)
+        session = await pool.acquire(key)
+        page = session.page
+        logger.debug("Navigating to %s...", url)
+        response, timings = await navigate_page(page, url, profile, wait_for_selector, timeout_ms=30000,
+                                                blocker=session.blocker)
+        logger.debug("Load timings for %s: %s", url, timings)
         if response and response.ok:
-            title = _current_page.title()
-            print(f"--- Debug (Playwright): Navigation to {url} successful. Page title: '{title}'. Current URL: {_current_page.url} ---")
-            return f"Successfully navigated to {url}. Page title: '{title}'"
-        else:
-            status = response.status if response else "Unknown"
-            print(f"--- Debug (Playwright): Navigation to {url} failed. Status: {status} ---")
-            return f"TOOL_ERROR (Playwright): Failed to navigate to {url}. Status: {status}"
-    except PlaywrightTimeoutError as te:
+            title = await page.title()
+            logger.debug("Navigation to %s successful. Page title: '%s'. Current URL: %s", url, title, page.url)
+            return f"Successfully navigated to {url}. Page title: '{title}'. Load timings: {format_load_timings(timings)}"
+        status = response.status if response else "Unknown"
+        logger.warning("Navigation to %s failed. Status: %s", url, status)
+        return f"TOOL_ERROR (Playwright): Failed to navigate to {url}. Status: {status}"
+
+    try:
+        return pool.run(navigate())
+    except BrowserLaunchError as e:
+        logger.critical("Failed to initialize Playwright or launch browser: %s", e)
+        return f"TOOL_ERROR (Playwright): Browser or page could not be initialized: {e}"
+    except playwright_api.TimeoutError as te:
         return f"TOOL_ERROR (Playwright): Timeout error during navigation to {url}: {str(te)}"
-    except PlaywrightError as e:
-        return f"TOOL_ERROR (Playwright): Navigation error for {url}: {e.message if hasattr(e, 'message') else str(e)}"
+    except playwright_api.Error as e:
+        return f"TOOL_ERROR (Playwright): Navigation error for {url}: {_playwright_message(e)}"
     except Exception as e:
         return f"TOOL_ERROR (Playwright): Unexpected error during navigation to {url}: {e}"
 
 @tool("Click Element Tool")
+@trace_tool("Click Element Tool")
 def click_element_tool(selector: str, expected_navigation_url_pattern: Optional[str] = None) -> str:
     """
     Clicks on an element specified by a CSS selector or text content.
     If navigation is expected, waits for the URL to match a pattern or for page load.
     Args:
-        selector (str): CSS selector (e.g., 'a.my-link') or text selector (e.g., 'text=More information...', 'role=link,name=More information...').
+        selector (str): CSS selector (e.g., 'a.my-link'), text selector (e.g., 'text=More information...', 'role=link,name=More information...')
+            or an element ref from 'Page Snapshot Tool' (e.g., 'ref=e5').
         expected_navigation_url_pattern (Optional[str]): Glob pattern for the expected URL after click (e.g., "**/iana.org/**").
     """
-    global _current_page
-    print(f"--- Debug (Tool Call): 'Click Element Tool' called with selector: '{selector}', expected URL pattern: '{expected_navigation_url_pattern}' ---")
-    if not _current_page or _current_page.is_closed():
-        return "TOOL_ERROR (Playwright): No active page to click on. Please navigate first."
-    try:
-        element_to_click = None
-        if selector.startswith("text="):
-            text_content = selector.split("=", 1)[1]
-            print(f"--- Debug (Playwright): Attempting to click by text: '{text_content}' ---")
-            element_to_click = _current_page.get_by_text(text_content, exact=True).first
-        elif selector.startswith("role=link,name="):
-            name_content = selector.split("name=", 1)[1]
-            print(f"--- Debug (Playwright): Attempting to click by role=link, name: '{name_content}' ---")
-            element_to_click = _current_page.get_by_role("link", name=name_content).first
-        else:
-            print(f"--- Debug (Playwright): Attempting to click by CSS selector: '{selector}' ---")
-            element_to_click = _current_page.locator(selector).first
-        
-        if not element_to_click or not element_to_click.is_visible(timeout=5000):
-             return f"TOOL_ERROR (Playwright): Element with selector '{selector}' not found or not visible."
-
-        print(f"--- Debug (Playwright): Element found. Clicking on '{selector}'... ---")
-        
-        element_to_click.click(timeout=10000) 
-        
+    logger.info("'Click Element Tool' called with selector: '%s', expected URL pattern: '%s'", selector, expected_navigation_url_pattern)
+    pool = get_browser_pool()
+    key = session_key()
+
+    async def click() -> str:
+        page = await pool.get_page(key)
+        if page is None:
+            return "TOOL_ERROR (Playwright): No active page to click on. Please navigate first."
+        logger.debug("Attempting to click by selector: '%s'", truncated(selector))
+        element_to_click = locate(page, selector)
+
+        if not element_to_click or not await element_to_click.is_visible(timeout=5000):
+            return f"TOOL_ERROR (Playwright): Element with selector '{selector}' not found or not visible."
+
+        logger.debug("Element found. Clicking on '%s'...", selector)
+        await element_to_click.click(timeout=10000)
+
         if expected_navigation_url_pattern:
-            print(f"--- Debug (Playwright): Waiting for URL pattern: '{expected_navigation_url_pattern}' ---")
-            _current_page.wait_for_url(f"**{expected_navigation_url_pattern}**", timeout=15000)
+            logger.debug("Waiting for URL pattern: '%s'", expected_navigation_url_pattern)
+            await page.wait_for_url(f"**{expected_navigation_url_pattern}**", timeout=15000)
         else:
-            print(f"--- Debug (Playwright): Waiting for load state 'domcontentloaded'... ---")
-            _current_page.wait_for_load_state("domcontentloaded", timeout=15000) 
-            
-        current_url_prop = _current_page.url 
-        print(f"--- Debug (Playwright): Click successful. Current page URL: {current_url_prop} ---")
+            logger.debug("Waiting for load state 'domcontentloaded'...")
+            await page.wait_for_load_state("domcontentloaded", timeout=15000)
+
+        current_url_prop = page.url
+        logger.debug("Click successful. Current page URL: %s", current_url_prop)
         return f"Successfully clicked on element matching selector '{selector}'. Current page URL: {current_url_prop}"
-    except PlaywrightTimeoutError as te:
+
+    try:
+        return pool.run(click())
+    except playwright_api.TimeoutError as te:
         return f"TOOL_ERROR (Playwright): Timeout error clicking or waiting after click on '{selector}': {str(te)}"
-    except PlaywrightError as e:
-        return f"TOOL_ERROR (Playwright): Error clicking element '{selector}': {e.message if hasattr(e, 'message') else str(e)}"
+    except playwright_api.Error as e:
+        return f"TOOL_ERROR (Playwright): Error clicking element '{selector}': {_playwright_message(e)}"
     except Exception as e:
         return f"TOOL_ERROR (Playwright): Unexpected error clicking element '{selector}': {e}"
 
 @tool("Get Page Content Tool")
+@trace_tool("Get Page Content Tool")
 def get_page_content_tool(selector: Optional[str] = "h1") -> str:
     """
     Retrieves text content of the first element matching the CSS selector.
     Waits for the element to be visible.
     Args:
-        selector (Optional[str]): CSS selector (e.g., 'h1'). Defaults to 'h1'.
+        selector (Optional[str]): CSS selector (e.g., 'h1') or element ref from 'Page Snapshot Tool' (e.g., 'ref=e5'). Defaults to 'h1'.
     """
-    global _current_page
-    print(f"--- Debug (Tool Call): 'Get Page Content Tool' called with selector: {selector} ---")
-    if not _current_page or _current_page.is_closed():
-        return "TOOL_ERROR (Playwright): No active page. Navigate first."
-    
-    actual_selector = selector if selector else "h1"
-    try:
-        print(f"--- Debug (Playwright): Waiting for selector '{actual_selector}' to be visible... ---")
-        _current_page.wait_for_selector(actual_selector, state="visible", timeout=10000)
-        
-        js_script = f"""() => {{
-            const el = document.querySelector('{actual_selector.replace("'", "\\'")}');
-            return el ? el.textContent : null;
-        }}"""
-        print(f"--- Debug (Playwright): Evaluating JS for selector '{actual_selector}' ---")
-        content = _current_page.evaluate(js_script)
+    logger.info("'Get Page Content Tool' called with selector: %s", selector)
+    pool = get_browser_pool()
+    key = session_key()
+    actual_selector = resolve_ref_selector(selector) if selector else "h1"
+
+    async def get_content() -> str:
+        page = await pool.get_page(key)
+        if page is None:
+            return "TOOL_ERROR (Playwright): No active page. Navigate first."
+        logger.debug("Waiting for selector '%s' to be visible...", actual_selector)
+        await page.wait_for_selector(actual_selector, state="visible", timeout=10000)
 
+        logger.debug("Evaluating JS for selector '%s'", actual_selector)
+        content = await page.evaluate("(sel) => { const el = document.querySelector(sel); return el ? el.textContent : null; }",
+                                      actual_selector)
         if content is not None:
-            print(f"--- Debug (Playwright): Content for '{actual_selector}' (via JS): '{str(content).strip()}' ---")
+            logger.debug("Content for '%s' (via JS): '%s'", actual_selector, truncated(str(content).strip()))
             return str(content).strip()
-        else:
-            print(f"--- Debug (Playwright): JS evaluation returned null for '{actual_selector}', trying locator... ---")
-            element = _current_page.locator(actual_selector).first
-            if element.count() > 0: 
-                content = element.text_content(timeout=5000)
-                if content is not None:
-                    print(f"--- Debug (Playwright): Content for '{actual_selector}' (via locator): '{str(content).strip()}' ---")
-                    return str(content).strip()
-        
-        print(f"--- Debug (Playwright): No text content found for selector '{actual_selector}'. ---")
+
+        logger.debug("JS evaluation returned null for '%s', trying locator...", actual_selector)
+        element = page.locator(actual_selector).first
+        if await element.count() > 0:
+            content = await element.text_content(timeout=5000)
+            if content is not None:
+                logger.debug("Content for '%s' (via locator): '%s'", actual_selector, truncated(str(content).strip()))
+                return str(content).strip()
+
+        logger.debug("No text content found for selector '%s'.", actual_selector)
         return f"TOOL_INFO (Playwright): No text content found for selector '{actual_selector}'."
 
-    except PlaywrightTimeoutError as te:
+    try:
+        return pool.run(get_content())
+    except playwright_api.TimeoutError as te:
         return f"TOOL_ERROR (Playwright): Timeout waiting for element with selector '{actual_selector}': {str(te)}"
-    except PlaywrightError as e:
-        return f"TOOL_ERROR (Playwright): Error getting content for selector '{actual_selector}': {e.message if hasattr(e, 'message') else str(e)}"
+    except playwright_api.Error as e:
+        return f"TOOL_ERROR (Playwright): Error getting content for selector '{actual_selector}': {_playwright_message(e)}"
     except Exception as e:
         return f"TOOL_ERROR (Playwright): Unexpected error getting content for selector '{actual_selector}': {e}"
 
+@tool("Extract Page Elements Tool")
+@trace_tool("Extract Page Elements Tool")
+def extract_page_elements_tool(selectors: Optional[List[str]] = None, named_selectors: Optional[Dict[str, str]] = None,
+                               attributes: Optional[List[str]] = None, all_matches: bool = False,
+                               wait_for_selector: Optional[str] = None, max_text_chars: int = 300) -> str:
+    """
+    Reads many elements of the current page in one call (use this instead of calling
+    'Get Page Content Tool' once per element). Returns JSON with 'url', 'title' and 'elements':
+    per selector 'count', 'visible_count', and for the first match 'visible', 'text', 'value'
+    (form fields), 'checked' (checkboxes) and the requested 'attributes' (with all_matches: 'items').
+    Missing elements have count 0; invalid selectors report an 'error'.
+    Args:
+        selectors (Optional[List[str]]): CSS selectors or refs from 'Page Snapshot Tool', e.g. ['h1', 'nav a', 'ref=e5']. Prefix 'all:' to get every match.
+        named_selectors (Optional[Dict[str, str]]): Named selectors, e.g. {'title': 'h1', 'error': '.alert-danger'}; results use the names.
+        attributes (Optional[List[str]]): Attributes to return per element, e.g. ['href', 'disabled', 'aria-label'].
+        all_matches (bool): Return every match (up to 20 per selector) instead of the first one. Defaults to False.
+        wait_for_selector (Optional[str]): Selector to wait for (visible) before extracting.
+        max_text_chars (int): Maximum text length per element. Defaults to 300.
+    """
+    logger.info("'Extract Page Elements Tool' called with %s selectors, named selectors: %s",
+                len(selectors) if isinstance(selectors, list) else 0, list(named_selectors) if isinstance(named_selectors, dict) else None)
+    try:
+        specs = build_extraction_specs(selectors, named_selectors, all_matches)
+    except ValueError as e:
+        return f"TOOL_ERROR: {e}"
+    if max_text_chars <= 0:
+        return "TOOL_ERROR: 'max_text_chars' must be positive."
+    pool = get_browser_pool()
+    key = session_key()
+
+    async def extract() -> str:
+        page = await pool.get_page(key)
+        if page is None:
+            return "TOOL_ERROR (Playwright): No active page. Navigate first."
+        if wait_for_selector:
+            await page.wait_for_selector(wait_for_selector, state="visible", timeout=10000)
+        start = time.perf_counter()
+        elements = await extract_elements(page, specs, attributes, max_text_chars)
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.debug("Extracted %s selectors in one evaluate (%.1f ms).", len(specs), elapsed_ms)
+        return json.dumps({"url": page.url, "title": await page.title(), "elapsed_ms": elapsed_ms, "elements": elements},
+                          ensure_ascii=False, indent=2)
+
+    try:
+        return pool.run(extract())
+    except playwright_api.TimeoutError as te:
+        return f"TOOL_ERROR (Playwright): Timeout waiting for element with selector '{wait_for_selector}': {str(te)}"
+    except playwright_api.Error as e:
+        return f"TOOL_ERROR (Playwright): Error extracting page elements: {_playwright_message(e)}"
+    except Exception as e:
+        return f"TOOL_ERROR (Playwright): Unexpected error extracting page elements: {e}"
+
+@tool("Page Snapshot Tool")
+@trace_tool("Page Snapshot Tool")
+def page_snapshot_tool(root_selector: Optional[str] = None, max_tokens: int = DEFAULT_SNAPSHOT_MAX_TOKENS,
+                       diff: bool = False, include_text: bool = True) -> str:
+    """
+    Returns a compact outline of the current page, one element per line and indented by nesting:
+    landmarks, headings, links, buttons, form fields (with value/checked/disabled state), images and text.
+    Elements carry a stable ref, e.g. 'button "Sign in" [ref=e5]'. Pass 'ref=e5' as the selector of
+    'Click Element Tool', 'Type Text Tool', 'Get Page Content Tool' or 'Extract Page Elements Tool'.
+    Use this to find the right element instead of guessing selectors.
+    Args:
+        root_selector (Optional[str]): Only outline this part of the page (CSS selector or 'ref=eN').
+        max_tokens (int): Token budget of the outline. Defaults to 1500.
+        diff (bool): Only return lines that changed since your last snapshot of the same page
+            (e.g. after clicking or typing). Defaults to False.
+        include_text (bool): Include text blocks (paragraphs, list items, table cells). Defaults to True.
+    """
+    logger.info("'Page Snapshot Tool' called (root_selector=%s, max_tokens=%s, diff=%s)", root_selector, max_tokens, diff)
+    if max_tokens <= 0:
+        return "TOOL_ERROR: 'max_tokens' must be a positive integer."
+    pool = get_browser_pool()
+    key = session_key()
+
+    async def snapshot() -> str:
+        session = await pool.get_session(key)
+        if session is None:
+            return "TOOL_ERROR (Playwright): No active page. Navigate first."
+        snap = await take_snapshot(session.page, root_selector, include_text)
+        if snap.get("error"):
+            return f"TOOL_ERROR (Playwright): {snap['error']}"
+        previous = session.last_snapshot
+        session.last_snapshot = {"url": snap["url"], "root_selector": root_selector, "include_text": include_text,
+                                 "lines": snap["lines"]}
+
+        lines = snap["lines"]
+        header = f"Page snapshot of {snap['url']} ('{snap['title']}'): {snap['node_count']} elements"
+        if diff:
+            comparable = (previous is not None and previous["url"] == snap["url"]
+                          and previous["root_selector"] == root_selector and previous["include_text"] == include_text)
+            if not comparable:
+                header = "No previous snapshot of this page to diff against; full snapshot follows.\n" + header
+            else:
+                lines = diff_snapshot_lines(previous["lines"], snap["lines"])
+                if not lines:
+                    return f"No changes since the last snapshot of {snap['url']}."
+                added = sum(1 for line in lines if line.startswith("+ "))
+                header = (f"Changes since the last snapshot of {snap['url']} ('{snap['title']}'): "
+                          f"{added} added/changed, {len(lines) - added} removed lines ('+' new, '-' gone)")
+
+        kept, dropped = apply_token_budget(lines, max_tokens)
+        if dropped:
+            kept.append(f"... ({dropped} more lines not shown; raise max_tokens or use root_selector)")
+        if snap["truncated"]:
+            kept.append("... (page has more elements than a snapshot covers; use root_selector)")
+        logger.debug("Snapshot of %s: %s lines, %s returned.", snap["url"], len(lines), len(kept))
+        return header + "\n" + "\n".join(kept)
+
+    try:
+        return pool.run(snapshot())
+    except playwright_api.Error as e:
+        return f"TOOL_ERROR (Playwright): Error taking page snapshot: {_playwright_message(e)}"
+    except Exception as e:
+        return f"TOOL_ERROR (Playwright): Unexpected error taking page snapshot: {e}"
+
+@tool("Take Screenshot Tool")
+@trace_tool("Take Screenshot Tool")
+def take_screenshot_tool(full_page: bool = False, selector: Optional[str] = None, max_width: int = DEFAULT_SCREENSHOT_MAX_WIDTH,
+                         analyze_prompt: Optional[str] = None, reference_image_path: Optional[str] = None,
+                         save_path: Optional[str] = None, force: bool = False) -> str:
+    """
+    Takes a screenshot of the current page (viewport or full page) or of one element and optionally
+    analyzes it with the Gemini vision model, e.g. to compare the rendered page against the design mockup.
+    The screenshot is downscaled and handed to the model in memory. If it is pixel-identical to your last
+    screenshot of the same page, no new analysis is made and the previous one is returned; otherwise the
+    result says how much the page changed (perceptual hash distance).
+    Args:
+        full_page (bool): Capture the whole scrollable page instead of the viewport. Defaults to False.
+        selector (Optional[str]): Capture only this element (CSS selector, 'text=...' or 'ref=eN' from 'Page Snapshot Tool').
+        max_width (int): Downscale the screenshot to at most this width in pixels. Defaults to 1024.
+        analyze_prompt (Optional[str]): Prompt for the vision model; without it the screenshot is only captured.
+        reference_image_path (Optional[str]): Local path or URL of a reference image (e.g. the mockup) sent
+            along with the screenshot, so analyze_prompt can ask for differences.
+        save_path (Optional[str]): Also save the downscaled screenshot as PNG under this path.
+        force (bool): Analyze again even if the screenshot is unchanged. Defaults to False.
+    """
+    logger.info("'Take Screenshot Tool' called (full_page=%s, selector=%s, max_width=%s, analyze=%s)", full_page, selector, max_width, bool(analyze_prompt))
+    if max_width <= 0:
+        return "TOOL_ERROR: 'max_width' must be a positive integer."
+    pool = get_browser_pool()
+    key = session_key()
+
+    async def capture() -> Any:
+        session = await pool.get_session(key)
+        if session is None:
+            return None
+        locator = locate(session.page, selector) if selector else None
+        png_bytes = await capture_png(session.page, locator, full_page=full_page and not selector)
+        return session, session.page.url, png_bytes
+
+    try:
+        captured = pool.run(capture())
+    except playwright_api.TimeoutError as te:
+        return f"TOOL_ERROR (Playwright): Timeout taking screenshot of '{selector or 'page'}': {te}"
+    except playwright_api.Error as e:
+        return f"TOOL_ERROR (Playwright): Error taking screenshot: {_playwright_message(e)}"
+    except Exception as e:
+        return f"TOOL_ERROR (Playwright): Unexpected error taking screenshot: {e}"
+    if captured is None:
+        return "TOOL_ERROR (Playwright): No active page. Navigate first."
+    session, url, png_bytes = captured
+
+    # Dekodieren, Verkleinern und Hashen außerhalb des Playwright-Loops, damit andere Seiten weiterladen
+    try:
+        original = decode_png(png_bytes)
+    except Exception as e:
+        return f"TOOL_ERROR: Could not decode screenshot: {e}"
+    image = downscale(original, max_width)
+    image_hash = dhash(image)
+    digest = content_digest(image)
+    target = f"element '{selector}'" if selector else ("full page" if full_page else "viewport")
+    history_key = (url, selector, bool(full_page and not selector))
+    previous = session.screenshot_history.get(history_key)
+    distance = hamming_distance(previous["hash"], image_hash) if previous else None
+    # Analysen nur bei identischen Pixeln wiederverwenden; 64-Bit-dHash übersieht z.B. geänderte Texte
+    identical = previous is not None and previous["digest"] == digest
+    if not identical:
+        session.screenshot_history[history_key] = previous = {"hash": image_hash, "digest": digest, "analyses": {}}
+
+    size = f"{image.width}x{image.height}"
+    if image.size != original.size:
+        size += f" (downscaled from {original.width}x{original.height})"
+    header = f"Screenshot of {url} ({target}): {size}, PNG {len(png_bytes)} bytes captured."
+    if identical:
+        header += " Unchanged since the last screenshot (identical pixels)."
+    elif distance is not None:
+        change = "Slightly changed" if distance <= SCREENSHOT_DEDUP_DISTANCE else "Changed"
+        header += f" {change} since the last screenshot (hash distance {distance}/64)."
+    logger.debug("Screenshot %s of %s: hash=%016x, distance=%s", target, url, image_hash, distance)
+
+    if save_path:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
+            image.save(save_path, format="PNG")
+            header += f" Saved to '{save_path}'."
+        except (OSError, ValueError) as e:
+            return f"TOOL_ERROR: Could not save screenshot to '{save_path}': {e}"
+
+    if not analyze_prompt:
+        return header
+    analysis_key = (analyze_prompt, reference_image_path)
+    if identical and not force and analysis_key in previous["analyses"]:
+        return f"{header} Analysis skipped, previous result for this prompt:\n{previous['analyses'][analysis_key]}"
+    analysis = get_vision_analyzer_logic().analyze_pil_image(image, analyze_prompt, reference_image_source=reference_image_path,
+                                                             original_bytes=len(png_bytes))
+    if analysis["error"]:
+        return f"{header}\n{analysis['error']}"
+    if analysis.get("preprocessing"):
+        header += f" Sent to the vision model: {analysis['preprocessing']}."
+    previous["analyses"][analysis_key] = analysis["analysis_text"]
+    return f"{header}\nAnalysis:\n{analysis['analysis_text']}"
+
 @tool("Type Text Tool")
+@trace_tool("Type Text Tool")
 def type_text_tool(selector: str, text_to_type: str, press_enter: bool = False) -> str:
     """
     Types the given text into an element specified by a CSS selector.
     Optionally presses Enter after typing.
     Args:
-        selector (str): The CSS selector of the input element.
+        selector (str): The CSS selector of the input element or its ref from 'Page Snapshot Tool' (e.g., 'ref=e3').
         text_to_type (str): The text to type into the element.
         press_enter (bool): Whether to press Enter after typing. Defaults to False.
     """
-    global _current_page
-    print(f"--- Debug (Tool Call): 'Type Text Tool' called for selector: {selector}, text: '{text_to_type}' ---")
-    if not _current_page or _current_page.is_closed():
-        return "TOOL_ERROR (Playwright): No active page to type on. Please navigate first."
-    try:
-        element = _current_page.locator(selector)
-        element.fill(text_to_type, timeout=10000) 
+    logger.info("'Type Text Tool' called for selector: %s, text: '%s'", selector, truncated(text_to_type))
+    pool = get_browser_pool()
+    key = session_key()
+
+    async def type_text() -> str:
+        page = await pool.get_page(key)
+        if page is None:
+            return "TOOL_ERROR (Playwright): No active page to type on. Please navigate first."
+        element = page.locator(resolve_ref_selector(selector))
+        await element.fill(text_to_type, timeout=10000)
         if press_enter:
-            element.press("Enter")
+            await element.press("Enter")
         return f"Successfully typed text into element with selector '{selector}'."
-    except PlaywrightError as e:
-        return f"TOOL_ERROR (Playwright): Error typing into element '{selector}': {e.message if hasattr(e, 'message') else str(e)}"
+
+    try:
+        return pool.run(type_text())
+    except playwright_api.Error as e:
+        return f"TOOL_ERROR (Playwright): Error typing into element '{selector}': {_playwright_message(e)}"
     except Exception as e:
         return f"TOOL_ERROR (Playwright): Unexpected error typing into element '{selector}': {e}"
 
+async def _check_route(page: Any, url: str, selector: Optional[str], expected_text: Optional[str],
+                       timeout_ms: int, profile: str) -> Dict[str, Any]:
+    """Loads one route on its own page and collects status, title, load timings and (optionally) the text of `selector`."""
+    start = time.monotonic()
+    entry: Dict[str, Any] = {"url": url, "ok": False, "status": None, "title": None, "text": None,
+                             "error": None, "elapsed_seconds": 0.0, "load_timings": None}
+    try:
+        response, entry["load_timings"] = await navigate_page(page, url, profile, timeout_ms=timeout_ms)
+        entry["status"] = response.status if response else None
+        entry["title"] = await page.title()
+        entry["ok"] = bool(response and response.ok)
+        if selector:
+            element = page.locator(selector).first
+            await element.wait_for(state="visible", timeout=timeout_ms)
+            text = ((await element.text_content()) or "").strip()
+            entry["text"] = text if len(text) <= 500 else text[:500] + "..."
+            if expected_text is not None and expected_text not in text:
+                entry["ok"] = False
+                entry["error"] = f"Expected text '{expected_text}' not found in '{selector}'."
+        if not entry["ok"] and entry["error"] is None:
+            entry["error"] = f"HTTP status {entry['status']}"
+    except playwright_api.TimeoutError as te:
+        entry["error"] = f"Timeout: {str(te).splitlines()[0]}"
+    except playwright_api.Error as e:
+        entry["error"] = _playwright_message(e).splitlines()[0]
+    entry["elapsed_seconds"] = round(time.monotonic() - start, 3)
+    return entry
+
+@tool("Run Browser Actions Tool")
+@trace_tool("Run Browser Actions Tool")
+def run_browser_actions_tool(actions: List[Dict[str, Any]], timeout_per_step: float = DEFAULT_STEP_TIMEOUT_MS / 1000) -> str:
+    """
+    Runs a whole UI scenario (navigate, click, type, assertions ...) in one call and stops at the first failed step.
+    Use this instead of one tool call per UI step. Returns JSON with 'passed', 'failed_step', 'total_ms', 'url'
+    and per step 'status' ('ok', 'failed', 'skipped'), 'elapsed_ms', 'result' and 'error'.
+    Selectors accept CSS, 'text=...', 'role=link,name=...' and 'ref=eN' from 'Page Snapshot Tool'.
+    Args:
+        actions (List[Dict[str, Any]]): Ordered steps, each with an 'action' and its fields:
+            {"action": "navigate", "url": ..., "profile"?: "full"|"no-media"|"dom"|"text", "wait_for_selector"?: ...},
+            {"action": "click", "selector": ..., "expected_url"?: glob part},
+            {"action": "type", "selector": ..., "text": ..., "press_enter"?: true},
+            {"action": "press", "key": "Enter", "selector"?: ...},
+            {"action": "select", "selector": ..., "value": ...}, {"action": "check"|"uncheck", "selector": ...},
+            {"action": "wait_for", "selector": ..., "state"?: "visible"|"hidden"|"attached"} or {"action": "wait_for", "url": ...},
+            {"action": "get_text", "selector": ...},
+            {"action": "assert_text", "selector": ..., "contains"|"equals": ...},
+            {"action": "assert_visible"|"assert_hidden", "selector": ...},
+            {"action": "assert_count", "selector": ..., "count": n},
+            {"action": "assert_url"|"assert_title", "contains"|"equals": ...}.
+            Any step may set "timeout_ms".
+        timeout_per_step (float): Default timeout in seconds per step. Defaults to 10.
+    """
+    logger.info("'Run Browser Actions Tool' called with %s steps", len(actions) if isinstance(actions, list) else 'N/A')
+    error = validate_actions(actions)
+    if error:
+        return f"TOOL_ERROR: {error}"
+    if timeout_per_step <= 0:
+        return "TOOL_ERROR: 'timeout_per_step' must be positive."
+    pool = get_browser_pool()
+    key = session_key()
+
+    async def run_batch() -> Dict[str, Any]:
+        session = await pool.acquire(key)
+        return await run_actions(session, actions, int(timeout_per_step * 1000))
+
+    try:
+        # Obergrenze: jeder Schritt im eigenen Timeout (Navigation mind. 30 s) plus Reserve für den Browserstart
+        report = pool.run(run_batch(), timeout=len(actions) * max(timeout_per_step, 30) + 60)
+    except BrowserLaunchError as e:
+        logger.critical("Failed to initialize Playwright or launch browser: %s", e)
+        return f"TOOL_ERROR (Playwright): Browser or page could not be initialized: {e}"
+    except Exception as e:
+        return f"TOOL_ERROR (Playwright): Unexpected error while running browser actions: {e}"
+    logger.debug("Browser actions: passed=%s, failed_step=%s, %.1f ms", report["passed"], report["failed_step"], report["total_ms"])
+    result = json.dumps(report, ensure_ascii=False, indent=2)
+    if not report["passed"]:
+        failed = report["steps"][report["failed_step"]]
+        return f"TOOL_ERROR (Playwright): Step {failed['index']} ({failed['action']}) failed: {failed['error']}\n{result}"
+    return result
+
+@tool("Check Routes Tool")
+@trace_tool("Check Routes Tool")
+def check_routes_tool(base_url: str, routes: List[str], selector: Optional[str] = None, expected_text: Optional[str] = None,
+                      max_concurrency: int = 4, timeout_per_route: float = 30, profile: Optional[str] = None) -> str:
+    """
+    Checks several routes of a web app concurrently, each on its own browser page
+    (e.g. the app served by 'Start Local HTTP Server Tool' at http://localhost:8088).
+    Use this instead of navigating to each route one after another.
+    Returns a JSON list (in input order) with 'route', 'url', 'ok', 'status', 'title', 'text', 'error',
+    'elapsed_seconds' and 'load_timings' per route.
+    Args:
+        base_url (str): Base URL of the app, e.g. 'http://localhost:8088'.
+        routes (List[str]): Paths or full URLs to check, e.g. ['/', '/index.html', '/about.html'].
+        selector (Optional[str]): CSS selector whose text is returned for every route (e.g. 'h1'); must become visible.
+        expected_text (Optional[str]): Text that must appear in the selector's text for the route to count as ok.
+        max_concurrency (int): Maximum number of pages loading at the same time. Defaults to 4.
+        timeout_per_route (float): Timeout in seconds per route. Defaults to 30.
+        profile (Optional[str]): Navigation profile as in 'Navigate Browser Tool' ('full', 'no-media', 'dom', 'text').
+            'text' is the fastest choice when only titles/texts are checked.
+    """
+    logger.info("'Check Routes Tool' called for %s with %s routes (selector=%s, max_concurrency=%s)", base_url, len(routes) if isinstance(routes, list) else 'N/A', selector, max_concurrency)
+    if not isinstance(routes, list) or not routes or not all(isinstance(r, str) for r in routes):
+        return "TOOL_ERROR: 'routes' must be a non-empty list of paths or URLs."
+    if max_concurrency <= 0 or timeout_per_route <= 0:
+        return "TOOL_ERROR: 'max_concurrency' and 'timeout_per_route' must be positive."
+    profile = profile or default_navigation_profile()
+    if profile not in NAVIGATION_PROFILES:
+        return f"TOOL_ERROR: Invalid profile '{profile}'. Use one of {list(NAVIGATION_PROFILES)}."
+    urls = [urljoin(base_url.rstrip("/") + "/", route.lstrip("/")) if not urlparse(route).scheme else route for route in routes]
+    pool = get_browser_pool()
+    key = session_key()
+    timeout_ms = int(timeout_per_route * 1000)
+
+    async def check_all() -> List[Any]:
+        return await pool.map_pages(key, urls, lambda page, url: _check_route(page, url, selector, expected_text, timeout_ms, profile),
+                                    max_concurrency=max_concurrency)
+
+    start = time.monotonic()
+    try:
+        # Obergrenze: alle Routen nacheinander im Timeout plus Reserve für den Browserstart
+        raw_results = pool.run(check_all(), timeout=timeout_per_route * len(urls) + 60)
+    except BrowserLaunchError as e:
+        logger.critical("Failed to initialize Playwright or launch browser: %s", e)
+        return f"TOOL_ERROR (Playwright): Browser or page could not be initialized: {e}"
+    except Exception as e:
+        return f"TOOL_ERROR (Playwright): Unexpected error while checking routes: {e}"
+
+    results = []
+    for route, url, result in zip(routes, urls, raw_results):
+        if isinstance(result, BaseException):
+            result = {"url": url, "ok": False, "status": None, "title": None, "text": None,
+                      "error": f"{type(result).__name__}: {result}", "elapsed_seconds": None, "load_timings": None}
+        results.append({"route": route, **result})
+    logger.debug("Checked %s/%s routes ok in %.2fs.", sum(1 for r in results if r["ok"]), len(results), time.monotonic() - start)
+    return json.dumps(results, ensure_ascii=False, indent=2)
+
 @tool("Close Browser Tool")
-def close_browser_tool() -> str:
+@trace_tool("Close Browser Tool")
+def close_browser_tool(shutdown_browser: bool = False) -> str:
     """
-    Closes the Playwright browser instance if it is running.
+    Closes your browser session (its context with cookies, storage and pages).
     This should be called at the end of all browser interactions to free up resources.
+    The shared Chromium stays running for the next navigation unless shutdown_browser is True.
+    Args:
+        shutdown_browser (bool): Also stop the shared Chromium for all agents. Defaults to False.
     """
-    global _playwright_instance, _browser_instance, _current_page
-    print("--- Debug (Tool Call): 'Close Browser Tool' called. ---")
-    closed_something = False
-    if _browser_instance:
-        try:
-            _browser_instance.close()
-            print("--- Debug (Playwright): Browser instance closed. ---")
-            closed_something = True
-        except Exception as e:
-            print(f"--- Debug (Playwright): Error closing browser instance: {e} ---")
-        _browser_instance = None
-        _current_page = None 
+    logger.info("'Close Browser Tool' called (shutdown_browser=%s).", shutdown_browser)
+    pool = get_browser_pool()
+    key = session_key()
+    try:
+        if shutdown_browser:
+            closed_something = pool.shutdown()
+        else:
+            closed_something = pool.run(pool.release(key))
+    except Exception as e:
+        logger.error("Error closing browser session '%s': %s", key, e)
+        return f"TOOL_ERROR (Playwright): Error closing browser session: {e}"
+    if not closed_something:
+        return "Playwright browser was not running or already closed."
+    if shutdown_browser:
+        return "Playwright browser session closed and browser stopped successfully."
+    return "Playwright browser session closed successfully."
+
+if __name__ == '__main__':
+    # --- Lokaler Test für den parallelen Scraper gegen einen lokalen http.server ---
+    import functools
+    import http.server
+    import tempfile
 
-    if _playwright_instance:
+    print("--- Lokaler Test für Scrape Many Websites Tool ---")
+    page_count = 25
+    with tempfile.TemporaryDirectory() as site_dir:
+        for i in range(page_count):
+            with open(f"{site_dir}/page_{i}.html", "w", encoding="utf-8") as f:
+                f.write(f"<html><head><script>var x = {i};</script></head><body><nav>Menu</nav>"
+                        f"<h1>Page {i}</h1><p>Content of test page number {i}.</p></body></html>")
+
+        class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=site_dir))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
         try:
-            _playwright_instance.stop()
-            print("--- Debug (Playwright): Playwright instance stopped. ---")
-            closed_something = True
-        except Exception as e:
-            print(f"--- Debug (Playwright): Error stopping Playwright instance: {e} ---")
-        _playwright_instance = None
-        
-    return "Playwright browser session closed successfully." if closed_something else "Playwright browser was not running or already closed."
+            test_urls = [f"{base_url}/page_{i}.html" for i in range(page_count)] + [f"{base_url}/missing.html", "not-a-url"]
+            test_logic = WebScrapingLogic(http_client=CachedHTTPClient(cache=None))
+            results = test_logic.scrape_many(test_urls, max_per_host=4, max_total=8, timeout_per_url=10)
 
+            assert [r["url"] for r in results] == test_urls, "Results must be in input order"
+            for i in range(page_count):
+                assert results[i]["status"] == "ok", results[i]
+                assert f"Content of test page number {i}." in results[i]["text"]
+                assert "Menu" not in results[i]["text"] and "var x" not in results[i]["text"]
+            assert results[page_count]["status"] == "error" and "404" in results[page_count]["error"]
+            assert results[page_count + 1]["status"] == "error" and "Invalid URL" in results[page_count + 1]["error"]
+            print(f"Ergebnis: {page_count} Seiten korrekt geladen, Fehlerfälle korrekt gemeldet.")
+        finally:
+            server.shutdown()
+            server.server_close()
+    print("--- Lokaler Test für Scrape Many Websites Tool abgeschlossen. ---")